@@ -2,11 +2,21 @@
 from flask import Flask, jsonify
 from flask_cors import CORS
 from .config import Config
-from .extensions import bcrypt
+from .extensions import bcrypt, init_db_routing, LAST_WRITE_HEADER
+from .utils.responses import init_responses
+from .utils.admission import init_admission
 from .blueprints.auth import bp as auth_bp
 from .blueprints.crud import bp as crud_bp
 from .services.predict import bp as predict_bp
 from .blueprints.notifications import bp as notif_bp
+from .blueprints.export import bp as export_bp
+from .blueprints.stats import bp as stats_bp
+from .blueprints.jobs import bp as jobs_bp
+from .blueprints.events import bp as events_bp
+from .blueprints.search import bp as search_bp
+from .blueprints.analytics import bp as analytics_bp
+from .blueprints.changes import bp as changes_bp
+from .blueprints.batch import bp as batch_bp
 
 
 # Application factory pattern - creates and configures Flask app
@@ -15,15 +25,30 @@ def create_app():
     # Load configuration from Config class
     app.config.from_object(Config)
     # Enable CORS for API routes
-    CORS(app, resources={r"/api/*": {"origins": Config.CORS_ORIGINS}})
+    CORS(app, resources={r"/api/*": {"origins": Config.CORS_ORIGINS, "expose_headers": [LAST_WRITE_HEADER]}})
     # Initialize bcrypt for password hashing
     bcrypt.init_app(app)
+    # Compact JSON and negotiated gzip/brotli compression for large responses
+    init_responses(app)
+    # Read-your-writes tracking for replica routing and the shared cache
+    init_db_routing(app)
+    # Concurrency limits per endpoint class; saturated classes answer 503 with Retry-After
+    init_admission(app)
 
     # Register all blueprints (route modules)
     app.register_blueprint(auth_bp)  # Authentication endpoints
     app.register_blueprint(crud_bp)  # CRUD operations
-    app.register_blueprint(predict_bp)  # Prediction endpoints
+    if Config.ENABLE_PREDICT:
+        app.register_blueprint(predict_bp)  # Prediction endpoints
     app.register_blueprint(notif_bp)  # Notification endpoints
+    app.register_blueprint(export_bp)  # CSV/Parquet exports
+    app.register_blueprint(stats_bp)  # Precomputed state statistics
+    app.register_blueprint(jobs_bp)  # Background jobs
+    app.register_blueprint(events_bp)  # Live dashboard updates (SSE)
+    app.register_blueprint(search_bp)  # Fuzzy search
+    app.register_blueprint(analytics_bp)  # Coverage analytics
+    app.register_blueprint(changes_bp)  # Delta sync feed
+    app.register_blueprint(batch_bp)  # Transactional batches of CRUD calls
 
     # Health check endpoint
     @app.get("/api/health")
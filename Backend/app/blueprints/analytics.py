@@ -0,0 +1,67 @@
+# Analytics blueprint - drill-down reads over precomputed rollups
+from flask import Blueprint, request, jsonify
+from sqlalchemy import select, func, case
+from ..extensions import SessionLocal, replica_read
+from ..models.models import VaccinationCoverage
+from ..utils.auth import require_auth
+
+# Create blueprint for analytics routes
+bp = Blueprint("analytics", __name__, url_prefix="/api/analytics")
+
+# Coverage dimensions usable in ?group_by= and as equality filters
+COVERAGE_DIMENSIONS = ("state", "age_band", "vaccine_type", "doses")
+
+
+# Vaccination coverage from the vaccination_coverage rollup.
+# ?group_by=state,age_band picks the breakdown (default state; empty for one total row) and
+# ?state=, ?age_band=, ?vaccine_type=, ?doses= drill down into a slice.
+@bp.get("/coverage")
+@require_auth(["admin", "manager"])
+@replica_read
+def coverage():
+    raw = request.args.get("group_by", "state")
+    group_by = [d for d in raw.split(",") if d]
+    unknown = [d for d in group_by if d not in COVERAGE_DIMENSIONS]
+    if unknown:
+        return jsonify({"error": f"Unknown dimension(s): {', '.join(unknown)}"}), 400
+    dims = [getattr(VaccinationCoverage, d) for d in group_by]
+
+    total = func.sum(VaccinationCoverage.patients)
+    vaccinated = func.sum(case((VaccinationCoverage.doses >= 1, VaccinationCoverage.patients), else_=0))
+    fully = func.sum(case((VaccinationCoverage.doses >= 2, VaccinationCoverage.patients), else_=0))
+    stmt = select(*dims, total, vaccinated, fully)
+    for d in COVERAGE_DIMENSIONS:
+        if d in request.args:
+            value = request.args[d]
+            if d == "doses":
+                try:
+                    value = int(value)
+                except ValueError:
+                    return jsonify({"error": "doses must be a number"}), 400
+            stmt = stmt.where(getattr(VaccinationCoverage, d) == value)
+    if dims:
+        stmt = stmt.group_by(*dims).order_by(*dims)
+
+    with SessionLocal() as s:
+        rows = s.execute(stmt).all()
+        refreshed_at = s.scalar(select(func.max(VaccinationCoverage.refreshed_at)))
+
+    out = []
+    for row in rows:
+        n, v, f = (int(x or 0) for x in row[len(dims):])
+        if not n:
+            continue
+        item = dict(zip(group_by, row[:len(dims)]))
+        item.update({
+            "patients": n,
+            "vaccinated": v,
+            "fully_vaccinated": f,
+            "coverage": round(v / n, 4),
+            "full_coverage": round(f / n, 4),
+        })
+        out.append(item)
+    return jsonify({
+        "group_by": group_by,
+        "refreshed_at": refreshed_at.isoformat() if refreshed_at else None,
+        "rows": out,
+    })
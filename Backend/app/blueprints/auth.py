@@ -1,9 +1,11 @@
 # Authentication blueprint - handles user registration and login
 from flask import Blueprint, request, jsonify
-from sqlalchemy import select
 from ..extensions import SessionLocal, bcrypt
 from ..models.models import User, UserRole, Patient
+from ..models.queries import USER_BY_EMAIL
 from ..utils.auth import generate_jwt
+from ..services.events import publish_metrics
+from ..services.changes import log_change
 import uuid
 import re
 
@@ -46,16 +48,19 @@ def register():
         return jsonify({"error": password_error}), 400
     
     with SessionLocal() as session:
-        if session.scalar(select(User).where(User.email == data["email"])):
+        if session.scalar(USER_BY_EMAIL, {"email": data["email"]}):
             return jsonify({"error":"Email exists"}), 400
         hashed = bcrypt.generate_password_hash(data["password"]).decode()
         user = User(first_name=data["first_name"], last_name=data["last_name"], name=data["name"], email=data["email"], password=hashed, role=UserRole(data["role"]))
         session.add(user)
         # If role is user, create a Patient row with same UUID
         session.flush()
+        log_change(session, User, "insert", user.id)
         if user.role == UserRole.user:
             patient = Patient(id=user.id, first_name=user.first_name, last_name=user.last_name, name=user.name, contact=data.get("contact",""), dob=data.get("dob","2000-01-01"))
             session.add(patient)
+            log_change(session, Patient, "insert", user.id)
+            publish_metrics(session, {"patients": 1})
         session.commit()
         token = generate_jwt(user.id, user.role.value)
         return jsonify({"token": token, "user": {"id": str(user.id), "email": user.email, "role": user.role.value}})
@@ -65,7 +70,7 @@ def register():
 def login():
     data = request.get_json() or {}
     with SessionLocal() as session:
-        user = session.scalar(select(User).where(User.email == data.get("email")))
+        user = session.scalar(USER_BY_EMAIL, {"email": data.get("email")})
         if not user:
             return jsonify({"error":"Invalid credentials"}), 401
         if not bcrypt.check_password_hash(user.password, data.get("password","")):
@@ -0,0 +1,89 @@
+# Batch blueprint - runs several CRUD operations in one request and one database transaction
+from flask import Blueprint, request, jsonify, current_app
+from ..config import Config
+from ..extensions import SessionLocal, get_engine
+from ..utils.auth import require_auth
+
+# Create blueprint for batch routes
+bp = Blueprint("batch", __name__, url_prefix="/api/batch")
+
+# Blueprints whose routes may appear in a batch
+BATCH_BLUEPRINTS = ("crud",)
+BATCH_MODES = ("atomic", "best_effort")
+
+
+# Run one operation through the normal routing, error handlers and role checks, reusing the
+# batch's verified user; returns (status, JSON body)
+def _run(op: dict, user: dict) -> tuple:
+    method = str(op.get("method", "GET")).upper()
+    path = op.get("path")
+    if not isinstance(path, str) or not path.startswith("/api/"):
+        return 400, {"error": "path must be an /api/ URL"}
+    with current_app.test_request_context(path, method=method, json=op.get("body")):
+        if request.routing_exception is not None:
+            return getattr(request.routing_exception, "code", 404), {"error": "No such route"}
+        if request.blueprint not in BATCH_BLUEPRINTS:
+            return 400, {"error": "Route is not allowed in a batch"}
+        request.user = user
+        try:
+            resp = current_app.full_dispatch_request()
+        except Exception:
+            current_app.logger.exception("batch operation failed: %s %s", method, path)
+            return 500, {"error": "Internal error"}
+        return resp.status_code, resp.get_json(silent=True)
+
+
+# Run the posted operations in order: [{"method": "POST", "path": "/api/users", "body": {...}}, ...].
+# mode "atomic" (default) commits only if every operation succeeds and stops at the first
+# failure; "best_effort" rolls back just the failed operations (each runs in a savepoint) and
+# commits the rest. The token is verified once; each operation still checks its own roles.
+@bp.post("")
+@require_auth(["admin", "manager", "user"])
+def run_batch():
+    data = request.get_json(silent=True) or {}
+    ops = data.get("operations")
+    mode = data.get("mode", "atomic")
+    if mode not in BATCH_MODES:
+        return jsonify({"error": f"mode must be one of {', '.join(BATCH_MODES)}"}), 400
+    if not isinstance(ops, list) or not ops or not all(isinstance(op, dict) for op in ops):
+        return jsonify({"error": "operations must be a non-empty list of objects"}), 400
+    if len(ops) > Config.BATCH_MAX_OPERATIONS:
+        return jsonify({"error": f"At most {Config.BATCH_MAX_OPERATIONS} operations per batch"}), 400
+
+    user = request.user
+    results = []
+    s = SessionLocal()
+    # Later operations must read earlier ones' uncommitted rows, so everything uses the primary
+    s._read_bind = get_engine()
+    s.info["batch"] = True
+    committed = False
+    try:
+        for op in ops:
+            pending = len(s.info.get("pending_events", ()))
+            savepoint = s.begin_nested()
+            status, body = _run(op, user)
+            if status < 400:
+                savepoint.commit()
+                results.append({"status": status, "body": body})
+                continue
+            savepoint.rollback()
+            # Drop in-process events queued by the rolled-back operation
+            if "pending_events" in s.info:
+                del s.info["pending_events"][pending:]
+            results.append({"status": status, "body": body})
+            if mode == "atomic":
+                break
+        failed = any(r["status"] >= 400 for r in results)
+        s.info.pop("batch", None)
+        if mode == "atomic" and failed:
+            s.rollback()
+        else:
+            s.commit()
+            committed = True
+    finally:
+        s.info.pop("batch", None)
+        s.close()
+
+    # Operations after an atomic failure never ran
+    results += [{"status": None, "body": None}] * (len(ops) - len(results))
+    return jsonify({"committed": committed, "mode": mode, "results": results}), 200 if committed else 400
@@ -0,0 +1,44 @@
+# Changes blueprint - delta sync for the admin management screens
+from flask import Blueprint, request, jsonify
+from ..extensions import SessionLocal
+from ..services.changes import CHANGE_TABLES, changes_since, head_cursor, cursor_expired
+from ..utils.auth import require_auth
+
+# Create blueprint for change feed routes
+bp = Blueprint("changes", __name__, url_prefix="/api/changes")
+
+MAX_LIMIT = 5000
+
+
+# Rows inserted, updated or deleted since ?since=<cursor>, limited to ?tables= (comma-separated,
+# default every table the caller's role can list). Without ?since= only the current cursor is
+# returned: take it before loading the full tables, then sync from it. Served from the primary
+# so a sync right after a write sees that write. A cursor older than the retained history is
+# answered with 410 and the client reloads in full.
+@bp.get("")
+@require_auth(["admin", "manager", "user"])
+def changes():
+    role = request.user.get("role")
+    visible = [t for t, spec in CHANGE_TABLES.items() if role in spec["roles"]]
+    if request.args.get("tables"):
+        wanted = request.args["tables"].split(",")
+        unknown = [t for t in wanted if t not in CHANGE_TABLES]
+        if unknown:
+            return jsonify({"error": f"Unknown table(s): {', '.join(unknown)}"}), 400
+        denied = [t for t in wanted if t not in visible]
+        if denied:
+            return jsonify({"error": f"Forbidden table(s): {', '.join(denied)}"}), 403
+        visible = wanted
+    try:
+        since = int(request.args["since"]) if request.args.get("since") else None
+        limit = max(1, min(int(request.args.get("limit", 1000)), MAX_LIMIT))
+    except ValueError:
+        return jsonify({"error": "since and limit must be numbers"}), 400
+
+    with SessionLocal() as s:
+        if since is None:
+            return jsonify({"changes": [], "cursor": head_cursor(s), "has_more": False})
+        if cursor_expired(s, since):
+            return jsonify({"error": "Cursor expired; reload the tables"}), 410
+        items, cursor, has_more = changes_since(s, since, visible, limit)
+    return jsonify({"changes": items, "cursor": cursor, "has_more": has_more})
@@ -1,11 +1,21 @@
 # Flask and SQLAlchemy imports
 from flask import Blueprint, request, jsonify
-from sqlalchemy import select, func
-from ..extensions import SessionLocal
+from sqlalchemy import select, func, insert
+from sqlalchemy.exc import IntegrityError
+from ..extensions import SessionLocal, replica_read
 from ..models.models import User, Patient, Location, CaseRecord, Vaccination, StateStat, UserRole
+from ..models.queries import PATIENT_BY_ID, PATIENT_PROFILE, FIRST_DOSE_TYPE, FIRST_DOSE_TYPE_EXCLUDING, SIBLING_FIRST_DOSE_TYPE
 from ..utils.auth import require_auth
+from ..utils.responses import rows_response
+from ..utils.writes import PayloadError, validate_payload, insert_row, update_row, update_row_with_old, delete_row, row_to_dict
+from ..services.state_stats import case_key, record_case_change, remove_cases, move_location_cases
+from ..services.events import publish_metrics, case_status_delta
+from ..services.changes import log_change, log_cascade, log_patient_cascade
+from ..services.cache import cached, invalidate_on_commit
+from ..services.inbox import reminders_for
 import uuid
 import re
+from datetime import date, datetime
 
 # Validation functions for user input
 def validate_password(password: str) -> tuple[bool, str]:
@@ -25,6 +35,16 @@ def validate_email(email: str) -> tuple[bool, str]:
 # Flask blueprint for CRUD operations with /api prefix
 bp = Blueprint("crud", __name__, url_prefix="/api")
 
+# Payloads that do not match the table schema are client errors
+@bp.errorhandler(PayloadError)
+def payload_error(ex):
+    return jsonify({"error": str(ex)}), 400
+
+# Foreign key and check constraint violations (unknown patient, bad status, ...)
+@bp.errorhandler(IntegrityError)
+def integrity_error(ex):
+    return jsonify({"error": "Invalid or conflicting data"}), 400
+
 # Generic helpers
 
 # Convert SQLAlchemy model to dictionary, removing sensitive fields
@@ -39,15 +59,53 @@ def to_dict(obj):
         d.pop('password')
     return d
 
+# Column names exposed by to_dict, used for columnar list responses
+def table_columns(model):
+    return [c.key for c in model.__table__.columns if c.key != 'password']
+
+# Convert a query-string value to the Python type of a column
+def coerce_arg(col, raw: str):
+    ptype = col.type.python_type
+    if ptype is date:
+        return date.fromisoformat(raw)
+    if ptype is datetime:
+        return datetime.fromisoformat(raw)
+    return ptype(raw)
+
+# Build a SELECT filtered by query-string args shared by list and export endpoints:
+# ?<column>=<value> for equality, ?<column>_from= / ?<column>_to= for date ranges.
+# Raises ValueError on malformed values.
+def filtered_select(model, args, columns=None):
+    stmt = select(*columns) if columns else select(model)
+    for col in model.__table__.columns:
+        if col.key == 'password':
+            continue
+        try:
+            if col.key in args:
+                stmt = stmt.where(col == coerce_arg(col, args[col.key]))
+            if col.type.python_type in (date, datetime):
+                if f"{col.key}_from" in args:
+                    stmt = stmt.where(col >= coerce_arg(col, args[f"{col.key}_from"]))
+                if f"{col.key}_to" in args:
+                    stmt = stmt.where(col <= coerce_arg(col, args[f"{col.key}_to"]))
+        except (ValueError, TypeError):
+            raise ValueError(f"Invalid value for filter '{col.key}'")
+    return stmt
+
 # User Management Endpoints
 
 # Get all users - accessible by admin and manager
 @bp.get("/users")
 @require_auth(["admin", "manager"])
+@replica_read
 def list_users():
+    try:
+        stmt = filtered_select(User, request.args)
+    except ValueError as ex:
+        return jsonify({"error": str(ex)}), 400
     with SessionLocal() as s:
-        rows = s.scalars(select(User)).all()
-        return jsonify([to_dict(r) for r in rows])
+        rows = s.scalars(stmt).all()
+        return rows_response([to_dict(r) for r in rows], table_columns(User))
 
 # Create new user - admin only
 @bp.post("/users")
@@ -73,43 +131,34 @@ def create_user():
     if not password_valid:
         return jsonify({"error": password_error}), 400
 
+    # contact/dob are only used for the auto-created patient record
+    user_data = validate_payload(User, {k: data[k] for k in required_fields})
+    user_data["password"] = bcrypt.generate_password_hash(password).decode()
+
     with SessionLocal() as s:
-        # Check if email already exists
-        if s.scalar(select(User).where(User.email == data["email"])):
+        try:
+            # The unique email constraint replaces a separate existence check
+            row = insert_row(s, User, user_data)
+        except IntegrityError:
             return jsonify({"error": "Email already exists"}), 400
-            
-        if "password" in data:
-            data["password"] = bcrypt.generate_password_hash(data["password"]).decode()
-
-        # Create user
-        # Manually create the user object to avoid passing extra fields from the request
-        user_data = {
-            "first_name": data["first_name"],
-            "last_name": data["last_name"],
-            "name": data["name"],
-            "email": data["email"],
-            "password": data["password"],
-            "role": data["role"],
-        }
-        row = User(**user_data)
-        s.add(row)
-        s.flush()
-        
-        # Auto-create patient for role 'user' if not exists
-        if row.role == UserRole.user and not s.get(Patient, row.id):
-            patient_data = {
+        log_change(s, User, "insert", row.id)
+
+        # Auto-create patient for role 'user' (a new user id never has one yet)
+        if row.role == UserRole.user:
+            patient_data = validate_payload(Patient, {
                 "id": row.id,
                 "first_name": row.first_name,
                 "last_name": row.last_name,
                 "name": row.name,
                 "contact": data.get("contact", ""),
                 "dob": data.get("dob", "2000-01-01")
-            }
-            s.add(Patient(**patient_data))
+            }, writable=("id",))
+            s.execute(insert(Patient).values(**patient_data))
+            log_change(s, Patient, "insert", row.id)
+            publish_metrics(s, {"patients": 1})
             
         s.commit()
-        s.refresh(row)
-        return jsonify(to_dict(row)), 201
+        return jsonify(row_to_dict(row)), 201
 
 # Update user - admin can update all fields, manager can only update role
 @bp.put("/users/<uuid:uid>")
@@ -119,57 +168,52 @@ def update_user(uid):
     data = request.get_json() or {}
     current_role = request.user.get("role")
     
+    # Managers can only update role field, admins can update everything
+    if current_role == "manager":
+        if "role" not in data:
+            return jsonify({"error": "Managers can only update user roles"}), 403
+        values = validate_payload(User, {"role": data["role"]}, partial=True)
+    else:
+        # Admin can update everything including password
+        if "password" in data:
+            # Validate password before hashing
+            password_valid, password_error = validate_password(data["password"])
+            if not password_valid:
+                return jsonify({"error": password_error}), 400
+        
+        # Validate email if being updated
+        if "email" in data:
+            email_valid, email_error = validate_email(data["email"])
+            if not email_valid:
+                return jsonify({"error": email_error}), 400
+        values = validate_payload(User, data, partial=True)
+        if "password" in values:
+            values["password"] = bcrypt.generate_password_hash(values["password"]).decode()
+    
     with SessionLocal() as s:
-        row = s.get(User, uid)
+        try:
+            row = update_row(s, User, uid, values)
+        except IntegrityError:
+            return jsonify({"error": "Email already exists"}), 400
         if not row:
             return jsonify({"error":"Not found"}), 404
-        
-        # Managers can only update role field, admins can update everything
-        if current_role == "manager":
-            if "role" not in data:
-                return jsonify({"error": "Managers can only update user roles"}), 403
-            # Only allow role updates for managers
-            if "role" in data:
-                try:
-                    row.role = UserRole(data["role"])
-                except ValueError:
-                    return jsonify({"error": "Invalid role"}), 400
-        else:
-            # Admin can update everything including password
-            if "password" in data:
-                # Validate password before hashing
-                password_valid, password_error = validate_password(data["password"])
-                if not password_valid:
-                    return jsonify({"error": password_error}), 400
-                data["password"] = bcrypt.generate_password_hash(data["password"]).decode()
-            
-            # Validate email if being updated
-            if "email" in data:
-                email_valid, email_error = validate_email(data["email"])
-                if not email_valid:
-                    return jsonify({"error": email_error}), 400
-            for k,v in data.items():
-                if k == "role":
-                    try:
-                        setattr(row, k, UserRole(v))
-                    except ValueError:
-                        return jsonify({"error": "Invalid role"}), 400
-                else:
-                    setattr(row, k, v)
-        
+        log_change(s, User, "update", uid)
         s.commit()
-        s.refresh(row)
-        return jsonify(to_dict(row))
+        return jsonify(row_to_dict(row))
 
 # Delete user - admin only
 @bp.delete("/users/<uuid:uid>")
 @require_auth(["admin"])
 def delete_user(uid):
     with SessionLocal() as s:
-        row = s.get(User, uid)
-        if not row:
+        # The linked patient and its case records go with the user (ON DELETE CASCADE)
+        remove_cases(s, CaseRecord.patient_id == uid)
+        log_patient_cascade(s, uid)
+        log_cascade(s, Patient, Patient.id == uid)
+        if not delete_row(s, User, uid):
             return jsonify({"error":"Not found"}), 404
-        s.delete(row)
+        log_change(s, User, "delete", uid)
+        publish_metrics(s, refresh=True)
         s.commit()
         return jsonify({"ok": True})
 
@@ -184,40 +228,41 @@ def promote_user(uid):
         return jsonify({"error": "Invalid role"}), 400
     
     with SessionLocal() as s:
-        row = s.get(User, uid)
+        row, old = update_row_with_old(s, User, uid, {"role": UserRole(target_role)}, ("role",))
         if not row:
             return jsonify({"error": "Not found"}), 404
+        log_change(s, User, "update", row.id)
         
-        old_role = row.role.value
-        row.role = UserRole(target_role)
+        old_role = UserRole(old[0]).value
         
         # Create patient record when demoting admin/manager to user
         if old_role in ["admin", "manager"] and target_role == "user":
-            existing_patient = s.get(Patient, row.id)
-            if not existing_patient:
-                patient = Patient(
+            if not s.scalar(PATIENT_BY_ID, {"id": row.id}):
+                s.execute(insert(Patient).values(
                     id=row.id,
                     first_name=row.first_name,
                     last_name=row.last_name,
                     name=row.name,
                     contact="",
-                    dob="2000-01-01"
-                )
-                s.add(patient)
+                    dob=date(2000, 1, 1)
+                ))
+                log_change(s, Patient, "insert", row.id)
+                publish_metrics(s, {"patients": 1})
         
         # Remove patient record when promoting user to admin/manager
         if old_role == "user" and target_role in ["admin", "manager"]:
-            existing_patient = s.get(Patient, row.id)
-            if existing_patient:
-                s.delete(existing_patient)
+            remove_cases(s, CaseRecord.patient_id == row.id)
+            log_patient_cascade(s, row.id)
+            if delete_row(s, Patient, row.id):
+                log_change(s, Patient, "delete", row.id)
+                publish_metrics(s, refresh=True)
         
         # If demoting admin to manager or manager to admin, no patient record changes needed
         
         s.commit()
-        s.refresh(row)
         return jsonify({
             "ok": True,
-            "user": to_dict(row),
+            "user": row_to_dict(row),
             "message": f"User role changed from {old_role} to {target_role}"
         })
 
@@ -226,83 +271,131 @@ def promote_user(uid):
 # List all patients - admin only (patients access their own via /me)
 @bp.get("/patients")
 @require_auth(["admin"])  # admins list all; patients can fetch self via /me
-
+@replica_read
 def list_patients():
+    try:
+        stmt = filtered_select(Patient, request.args)
+    except ValueError as ex:
+        return jsonify({"error": str(ex)}), 400
     with SessionLocal() as s:
-        rows = s.scalars(select(Patient)).all()
-        return jsonify([to_dict(r) for r in rows])
+        rows = s.scalars(stmt).all()
+        return rows_response([to_dict(r) for r in rows], table_columns(Patient))
+
 
 # Get specific patient by ID - admin only
 @bp.get("/patients/<uuid:pid>")
 @require_auth(["admin"])
 def get_patient(pid):
     with SessionLocal() as s:
-        row = s.get(Patient, pid)
+        row = s.scalar(PATIENT_BY_ID, {"id": pid})
         if not row:
             return jsonify({"error":"Not found"}), 404
         return jsonify(to_dict(row))
 
+
 # Get current user's patient record - users and admins
 @bp.get("/patients/me")
 @require_auth(["user","admin"])
 def get_my_patient():
     user_id = request.user.get("sub")
     with SessionLocal() as s:
-        row = s.get(Patient, uuid.UUID(user_id))
+        row = s.scalar(PATIENT_BY_ID, {"id": uuid.UUID(user_id)})
         if not row:
             return jsonify({"error":"Not found"}), 404
         return jsonify(to_dict(row))
 
+
+# One screen's worth of patient data: the patient with case records (and their locations),
+# vaccinations (oldest first) and the reminders the notification sweep would create today
+def patient_profile(s, pid):
+    p = s.scalar(PATIENT_PROFILE, {"id": pid})
+    if not p:
+        return None
+    cases, vax = p.case_records, p.vaccinations
+    latest = (cases[0].diag_date, cases[0].status) if cases else None
+    reminders = reminders_for(len(vax), vax[0].date if vax else None, latest, date.today())
+    return {
+        **to_dict(p),
+        "case_records": [{**to_dict(c), "location": to_dict(c.location)} for c in cases],
+        "vaccinations": [to_dict(v) for v in vax],
+        "reminders": [{**r, "due_date": r["due_date"].isoformat()} for r in reminders],
+    }
+
+
+# Get a patient's full profile by ID - admin only
+@bp.get("/patients/<uuid:pid>/profile")
+@require_auth(["admin"])
+@replica_read
+def get_patient_profile(pid):
+    with SessionLocal() as s:
+        profile = patient_profile(s, pid)
+        if not profile:
+            return jsonify({"error":"Not found"}), 404
+        return jsonify(profile)
+
+
+# Get the current user's full profile - users and admins
+@bp.get("/patients/me/profile")
+@require_auth(["user","admin"])
+@replica_read
+def get_my_profile():
+    with SessionLocal() as s:
+        profile = patient_profile(s, uuid.UUID(request.user.get("sub")))
+        if not profile:
+            return jsonify({"error":"Not found"}), 404
+        return jsonify(profile)
+
+
 # Update current user's patient record - users and admins
 @bp.put("/patients/me")
 @require_auth(["user","admin"])  # allow patient to update own info
 def update_my_patient():
     user_id = request.user.get("sub")
-    data = request.get_json() or {}
+    values = validate_payload(Patient, request.get_json() or {}, partial=True)
     with SessionLocal() as s:
-        row = s.get(Patient, uuid.UUID(user_id))
+        row = update_row(s, Patient, uuid.UUID(user_id), values)
         if not row:
             return jsonify({"error":"Not found"}), 404
-        for k,v in data.items():
-            setattr(row, k, v)
+        log_change(s, Patient, "update", row.id)
         s.commit()
-        return jsonify(to_dict(row))
+        return jsonify(row_to_dict(row))
 
 # Create new patient - admin only
 @bp.post("/patients")
 @require_auth(["admin"])
 def create_patient():
-    data = request.get_json() or {}
+    values = validate_payload(Patient, request.get_json() or {}, writable=("id",))
     with SessionLocal() as s:
-        p = Patient(**data)
-        s.add(p)
+        p = insert_row(s, Patient, values)
+        log_change(s, Patient, "insert", p.id)
+        publish_metrics(s, {"patients": 1})
         s.commit()
-        s.refresh(p)
-        return jsonify(to_dict(p)), 201
+        return jsonify(row_to_dict(p)), 201
 
 # Update patient by ID - admin only
 @bp.put("/patients/<uuid:pid>")
 @require_auth(["admin"])
 def update_patient(pid):
-    data = request.get_json() or {}
+    values = validate_payload(Patient, request.get_json() or {}, partial=True)
     with SessionLocal() as s:
-        p = s.get(Patient, pid)
+        p = update_row(s, Patient, pid, values)
         if not p:
             return jsonify({"error":"Not found"}), 404
-        for k,v in data.items():
-            setattr(p, k, v)
+        log_change(s, Patient, "update", pid)
         s.commit()
-        return jsonify(to_dict(p))
+        return jsonify(row_to_dict(p))
 
 # Delete patient by ID - admin only
 @bp.delete("/patients/<uuid:pid>")
 @require_auth(["admin"])
 def delete_patient(pid):
     with SessionLocal() as s:
-        p = s.get(Patient, pid)
-        if not p:
+        remove_cases(s, CaseRecord.patient_id == pid)
+        log_patient_cascade(s, pid)
+        if not delete_row(s, Patient, pid):
             return jsonify({"error":"Not found"}), 404
-        s.delete(p)
+        log_change(s, Patient, "delete", pid)
+        publish_metrics(s, refresh=True)
         s.commit()
         return jsonify({"ok": True})
 
@@ -311,46 +404,58 @@ def delete_patient(pid):
 # List all locations - admin and users can view
 @bp.get("/locations")
 @require_auth(["admin","user"])
+@replica_read
 def list_locations():
+    try:
+        stmt = filtered_select(Location, request.args)
+    except ValueError as ex:
+        return jsonify({"error": str(ex)}), 400
     with SessionLocal() as s:
-        rows = s.scalars(select(Location)).all()
-        return jsonify([to_dict(r) for r in rows])
+        load = lambda: [to_dict(r) for r in s.scalars(stmt).all()]
+        # The unfiltered list (dropdowns on every screen) is shared by all workers
+        items = cached("locations", load) if set(request.args) <= {"format"} else load()
+        return rows_response(items, table_columns(Location))
+
 
 # Create new location - admin only
 @bp.post("/locations")
 @require_auth(["admin"])
 def create_location():
-    data = request.get_json() or {}
+    values = validate_payload(Location, request.get_json() or {})
     with SessionLocal() as s:
-        row = Location(**data)
-        s.add(row)
+        row = insert_row(s, Location, values)
+        log_change(s, Location, "insert", row.id)
+        invalidate_on_commit(s, "locations")
         s.commit()
-        s.refresh(row)
-        return jsonify(to_dict(row)), 201
+        return jsonify(row_to_dict(row)), 201
 
 # Update location by ID - admin only
 @bp.put("/locations/<uuid:rid>")
 @require_auth(["admin"])
 def update_location(rid):
-    data = request.get_json() or {}
+    values = validate_payload(Location, request.get_json() or {}, partial=True)
     with SessionLocal() as s:
-        row = s.get(Location, rid)
+        row, old = update_row_with_old(s, Location, rid, values, ("state",))
         if not row:
             return jsonify({"error":"Not found"}), 404
-        for k,v in data.items():
-            setattr(row, k, v)
+        move_location_cases(s, rid, old[0], row.state)
+        log_change(s, Location, "update", rid)
+        invalidate_on_commit(s, "locations")
         s.commit()
-        return jsonify(to_dict(row))
+        return jsonify(row_to_dict(row))
 
 # Delete location by ID - admin only
 @bp.delete("/locations/<uuid:rid>")
 @require_auth(["admin"])
 def delete_location(rid):
     with SessionLocal() as s:
-        row = s.get(Location, rid)
-        if not row:
+        remove_cases(s, CaseRecord.location_id == rid)
+        log_cascade(s, CaseRecord, CaseRecord.location_id == rid)
+        if not delete_row(s, Location, rid):
             return jsonify({"error":"Not found"}), 404
-        s.delete(row)
+        log_change(s, Location, "delete", rid)
+        invalidate_on_commit(s, "locations")
+        publish_metrics(s, refresh=True)
         s.commit()
         return jsonify({"ok": True})
 
@@ -359,46 +464,57 @@ def delete_location(rid):
 # List all case records - admin only
 @bp.get("/case-records")
 @require_auth(["admin"])
+@replica_read
 def list_cases():
+    try:
+        stmt = filtered_select(CaseRecord, request.args)
+    except ValueError as ex:
+        return jsonify({"error": str(ex)}), 400
     with SessionLocal() as s:
-        rows = s.scalars(select(CaseRecord)).all()
-        return jsonify([to_dict(r) for r in rows])
+        rows = s.scalars(stmt).all()
+        return rows_response([to_dict(r) for r in rows], table_columns(CaseRecord))
+
 
 # Create new case record - admin only
 @bp.post("/case-records")
 @require_auth(["admin"])
 def create_case():
-    data = request.get_json() or {}
+    values = validate_payload(CaseRecord, request.get_json() or {})
     with SessionLocal() as s:
-        row = CaseRecord(**data)
-        s.add(row)
+        row = insert_row(s, CaseRecord, values)
+        # Keep per-state daily counters in the same transaction
+        record_case_change(s, None, case_key(row))
+        log_change(s, CaseRecord, "insert", row.id)
+        publish_metrics(s, case_status_delta(None, row.status))
         s.commit()
-        s.refresh(row)
-        return jsonify(to_dict(row)), 201
+        return jsonify(row_to_dict(row)), 201
 
 # Update case record by ID - admin only
 @bp.put("/case-records/<uuid:rid>")
 @require_auth(["admin"])
 def update_case(rid):
-    data = request.get_json() or {}
+    values = validate_payload(CaseRecord, request.get_json() or {}, partial=True)
     with SessionLocal() as s:
-        row = s.get(CaseRecord, rid)
+        row, old = update_row_with_old(s, CaseRecord, rid, values, ("location_id", "diag_date", "status"))
         if not row:
             return jsonify({"error":"Not found"}), 404
-        for k,v in data.items():
-            setattr(row, k, v)
+        record_case_change(s, old, case_key(row))
+        log_change(s, CaseRecord, "update", rid)
+        publish_metrics(s, case_status_delta(old[2], row.status))
         s.commit()
-        return jsonify(to_dict(row))
+        return jsonify(row_to_dict(row))
 
 # Delete case record by ID - admin only
 @bp.delete("/case-records/<uuid:rid>")
 @require_auth(["admin"])
 def delete_case(rid):
     with SessionLocal() as s:
-        row = s.get(CaseRecord, rid)
+        row = delete_row(s, CaseRecord, rid)
         if not row:
             return jsonify({"error":"Not found"}), 404
-        s.delete(row)
+        record_case_change(s, case_key(row), None)
+        log_change(s, CaseRecord, "delete", rid)
+        publish_metrics(s, case_status_delta(row.status, None))
         s.commit()
         return jsonify({"ok": True})
 
@@ -407,83 +523,76 @@ def delete_case(rid):
 # List all vaccinations - admin only
 @bp.get("/vaccinations")
 @require_auth(["admin"])
+@replica_read
 def list_vax():
+    try:
+        stmt = filtered_select(Vaccination, request.args)
+    except ValueError as ex:
+        return jsonify({"error": str(ex)}), 400
     with SessionLocal() as s:
-        rows = s.scalars(select(Vaccination)).all()
-        return jsonify([to_dict(r) for r in rows])
+        rows = s.scalars(stmt).all()
+        return rows_response([to_dict(r) for r in rows], table_columns(Vaccination))
+
+
+# Vaccine type of a patient's first dose, optionally ignoring one vaccination row.
+# patient_id=None means the patient who owns vaccination exclude_id.
+def first_dose_type(s, patient_id, exclude_id=None):
+    if exclude_id is None:
+        return s.scalar(FIRST_DOSE_TYPE, {"patient_id": patient_id})
+    if patient_id is None:
+        return s.scalar(SIBLING_FIRST_DOSE_TYPE, {"exclude_id": exclude_id})
+    return s.scalar(FIRST_DOSE_TYPE_EXCLUDING, {"patient_id": patient_id, "exclude_id": exclude_id})
 
 # Create new vaccination - admin only, enforces same vaccine type for second dose
 @bp.post("/vaccinations")
 @require_auth(["admin"])
 def create_vax():
-    data = request.get_json() or {}
-    patient_id = data.get("patient_id")
-    vaccine_type = data.get("vaccine_type")
-    
-    # Validate required fields
-    if not patient_id or not vaccine_type:
-        return jsonify({"error": "patient_id and vaccine_type are required"}), 400
+    values = validate_payload(Vaccination, request.get_json() or {})
     
     with SessionLocal() as s:
-        # Check for existing vaccinations to enforce vaccine type consistency
-        existing_vax = s.scalars(
-            select(Vaccination).where(Vaccination.patient_id == patient_id)
-            .order_by(Vaccination.date.asc())
-        ).all()
-        
         # If this is a second dose, ensure it matches the first dose vaccine type
-        if len(existing_vax) >= 1:
-            first_vax_type = existing_vax[0].vaccine_type
-            if vaccine_type != first_vax_type:
-                return jsonify({
-                    "error": f"Second dose must be the same vaccine type as first dose ({first_vax_type})"
-                }), 400
+        first_vax_type = first_dose_type(s, values["patient_id"])
+        if first_vax_type and values["vaccine_type"] != first_vax_type:
+            return jsonify({
+                "error": f"Second dose must be the same vaccine type as first dose ({first_vax_type})"
+            }), 400
         
-        row = Vaccination(**data)
-        s.add(row)
+        row = insert_row(s, Vaccination, values)
+        log_change(s, Vaccination, "insert", row.id)
+        publish_metrics(s, {"vaccinations": 1})
         s.commit()
-        s.refresh(row)
-        return jsonify(to_dict(row)), 201
+        return jsonify(row_to_dict(row)), 201
 
 # Update vaccination by ID - admin only, enforces vaccine type consistency
 @bp.put("/vaccinations/<uuid:rid>")
 @require_auth(["admin"])
 def update_vax(rid):
-    data = request.get_json() or {}
+    values = validate_payload(Vaccination, request.get_json() or {}, partial=True)
     with SessionLocal() as s:
-        row = s.get(Vaccination, rid)
-        if not row:
-            return jsonify({"error":"Not found"}), 404
-        
         # Validate vaccine type consistency when updating
-        if "vaccine_type" in data:
-            existing_vax = s.scalars(
-                select(Vaccination).where(Vaccination.patient_id == row.patient_id)
-                .where(Vaccination.id != rid)
-                .order_by(Vaccination.date.asc())
-            ).all()
-            
-            if len(existing_vax) > 0:
-                first_vax_type = existing_vax[0].vaccine_type
-                if data["vaccine_type"] != first_vax_type:
-                    return jsonify({
-                        "error": f"Vaccine type must match first dose ({first_vax_type})"
-                    }), 400
+        if "vaccine_type" in values:
+            first_vax_type = first_dose_type(s, values.get("patient_id"), exclude_id=rid)
+            if first_vax_type and values["vaccine_type"] != first_vax_type:
+                return jsonify({
+                    "error": f"Vaccine type must match first dose ({first_vax_type})"
+                }), 400
         
-        for k,v in data.items():
-            setattr(row, k, v)
+        row = update_row(s, Vaccination, rid, values)
+        if not row:
+            return jsonify({"error":"Not found"}), 404
+        log_change(s, Vaccination, "update", rid)
         s.commit()
-        return jsonify(to_dict(row))
+        return jsonify(row_to_dict(row))
 
 # Delete vaccination by ID - admin only
 @bp.delete("/vaccinations/<uuid:rid>")
 @require_auth(["admin"])
 def delete_vax(rid):
     with SessionLocal() as s:
-        row = s.get(Vaccination, rid)
-        if not row:
+        if not delete_row(s, Vaccination, rid):
             return jsonify({"error":"Not found"}), 404
-        s.delete(row)
+        log_change(s, Vaccination, "delete", rid)
+        publish_metrics(s, {"vaccinations": -1})
         s.commit()
         return jsonify({"ok": True})
 
@@ -492,22 +601,27 @@ def delete_vax(rid):
 # Get dashboard metrics - admin only
 @bp.get("/admin/metrics")
 @require_auth(["admin"])
+@replica_read
 def admin_metrics():
     with SessionLocal() as s:
-        # Count total patients
-        total_patients = s.scalar(select(func.count(Patient.id))) or 0
-        # Count total vaccinations
-        total_vax = s.scalar(select(func.count(Vaccination.id))) or 0
-        # Count active cases
-        active = s.scalar(select(func.count()).select_from(CaseRecord).where(CaseRecord.status=="active")) or 0
-        # Count recovered cases
-        recovered = s.scalar(select(func.count()).select_from(CaseRecord).where(CaseRecord.status=="recovered")) or 0
-        # Count deaths
-        deaths = s.scalar(select(func.count()).select_from(CaseRecord).where(CaseRecord.status=="death")) or 0
-        return jsonify({
-            "patients": int(total_patients),
-            "vaccinations": int(total_vax),
-            "active": int(active),
-            "recovered": int(recovered),
-            "deaths": int(deaths)
-        })
+        return jsonify(cached("metrics", lambda: compute_metrics(s)))
+
+# Dashboard counters, also sent as the initial snapshot on the event stream
+def compute_metrics(s) -> dict:
+    # Count total patients
+    total_patients = s.scalar(select(func.count(Patient.id))) or 0
+    # Count total vaccinations
+    total_vax = s.scalar(select(func.count(Vaccination.id))) or 0
+    # Count active cases
+    active = s.scalar(select(func.count()).select_from(CaseRecord).where(CaseRecord.status=="active")) or 0
+    # Count recovered cases
+    recovered = s.scalar(select(func.count()).select_from(CaseRecord).where(CaseRecord.status=="recovered")) or 0
+    # Count deaths
+    deaths = s.scalar(select(func.count()).select_from(CaseRecord).where(CaseRecord.status=="death")) or 0
+    return {
+        "patients": int(total_patients),
+        "vaccinations": int(total_vax),
+        "active": int(active),
+        "recovered": int(recovered),
+        "deaths": int(deaths)
+    }
@@ -0,0 +1,133 @@
+# Events blueprint - server-sent event stream for live dashboard metrics and new notifications
+import json
+import queue
+from flask import Blueprint, request, Response, stream_with_context
+from sqlalchemy import text
+from ..config import Config
+from ..extensions import get_engine
+from ..utils.auth import require_auth
+from ..services.events import subscribe, unsubscribe
+from .crud import compute_metrics
+
+# Create blueprint for event stream routes
+bp = Blueprint("events", __name__, url_prefix="/api/events")
+
+
+# Format one SSE frame
+def _frame(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+# Snapshot reads that find deltas arriving meanwhile are retried this often (non-Postgres only)
+SNAPSHOT_ATTEMPTS = 3
+
+
+# Postgres snapshot text "xmin:xmax:xip,..." as (xmin, xmax, in-progress txids)
+def _parse_snapshot(value: str) -> tuple:
+    xmin, xmax, xip = value.split(":")
+    return int(xmin), int(xmax), {int(t) for t in xip.split(",") if t}
+
+
+# Whether a snapshot already counts the writes of transaction `txid`
+def _seen(version: tuple, txid: int) -> bool:
+    xmin, xmax, xip = version
+    return txid < xmin or (txid < xmax and txid not in xip)
+
+
+# Dashboard metrics counted on the primary, with the Postgres snapshot they were counted in
+# (None elsewhere). Never served from the shared cache or a replica, which may both lag.
+def _read_metrics() -> tuple:
+    engine = get_engine()
+    if engine.dialect.name == "postgresql":
+        # REPEATABLE READ: the version and every count come from one snapshot
+        with engine.connect().execution_options(isolation_level="REPEATABLE READ") as conn:
+            version = _parse_snapshot(conn.scalar(text("SELECT pg_current_snapshot()::text")))
+            return compute_metrics(conn), version
+    with engine.connect() as conn:
+        return compute_metrics(conn), None
+
+
+def _drain(q: queue.Queue) -> list:
+    events = []
+    while True:
+        try:
+            events.append(q.get_nowait())
+        except queue.Empty:
+            return events
+
+
+# Metrics snapshot for a stream subscribed on `q`, as (snapshot, version, held events).
+# Postgres deltas carry their txid and are checked against the version as they come. Other
+# deltas are unversioned, and one queued while counting may already be counted: those are
+# dropped and the counts read again. Other events taken off the queue are returned in order.
+def _snapshot(q: queue.Queue) -> tuple:
+    held = []
+    for _ in range(SNAPSHOT_ATTEMPTS):
+        snapshot, version = _read_metrics()
+        if version is not None:
+            break
+        raced = False
+        for evt in _drain(q):
+            if evt.get("type") == "metrics":
+                raced = True
+            else:
+                held.append(evt)
+        if not raced:
+            break
+    return snapshot, version, held
+
+
+# Open an event stream. EventSource cannot send headers, so the JWT may be passed as ?access_token=.
+# Admins get a metrics snapshot followed by deltas (and a new snapshot when a write asks for a
+# refresh); every user gets their own new notifications.
+@bp.get("/stream")
+@require_auth(["admin","user"], allow_query_token=True)
+def stream():
+    role = request.user.get("role")
+    user_id = request.user.get("sub")
+    # Subscribe before reading the snapshot, so a write committed while it is computed arrives as
+    # a delta instead of being lost between the two
+    q = subscribe()
+    state = {"snapshot": None, "version": None, "held": []}
+    if role == "admin":
+        try:
+            state["snapshot"], state["version"], state["held"] = _snapshot(q)
+        except Exception:
+            unsubscribe(q)
+            raise
+
+    def frames(evt: dict):
+        if evt.get("type") == "metrics" and role == "admin":
+            if evt.get("refresh"):
+                state["snapshot"], state["version"], held = _snapshot(q)
+                yield _frame("metrics", {"snapshot": state["snapshot"]})
+                for later in held:
+                    yield from frames(later)
+            elif state["version"] is None or "txid" not in evt or not _seen(state["version"], evt["txid"]):
+                yield _frame("metrics", {"delta": evt.get("delta", {})})
+        elif evt.get("type") == "notification" and evt.get("user_id") == user_id:
+            yield _frame("notification", evt["notification"])
+
+    def generate():
+        try:
+            yield "retry: 5000\n\n"
+            if state["snapshot"] is not None:
+                yield _frame("metrics", {"snapshot": state["snapshot"]})
+            for evt in state.pop("held"):
+                yield from frames(evt)
+            while True:
+                try:
+                    evt = q.get(timeout=Config.SSE_HEARTBEAT_SECONDS)
+                except queue.Empty:
+                    # Comment line keeps proxies from closing an idle connection
+                    yield ": keep-alive\n\n"
+                    continue
+                yield from frames(evt)
+        finally:
+            unsubscribe(q)
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,247 @@
+# Export blueprint - streams table data as CSV or Parquet without buffering it in memory
+import csv
+import io
+import itertools
+import queue
+import threading
+from datetime import date
+from flask import Blueprint, request, jsonify, Response, stream_with_context
+from ..config import Config
+from ..extensions import get_read_engine, replica_read
+from ..models.models import User, Patient, Location, CaseRecord, Vaccination
+from ..utils.auth import require_auth
+from ..utils import parquet
+from ..utils.parquet import load_pyarrow, parquet_schema, batch_table
+from ..services.partitions import PARTITIONED_TABLES, archived_files
+from .crud import filtered_select, table_columns, coerce_arg
+
+# Create blueprint for export routes
+bp = Blueprint("export", __name__, url_prefix="/api/export")
+
+# Exportable tables by URL name (both the API path and the table name are accepted)
+EXPORT_TABLES = {
+    "users": User,
+    "patients": Patient,
+    "locations": Location,
+    "case-records": CaseRecord,
+    "case_records": CaseRecord,
+    "vaccinations": Vaccination,
+}
+
+
+# Postgres drivers whose COPY support _copy_csv uses; other drivers export through a cursor
+COPY_DRIVERS = ("psycopg2", "psycopg")
+
+
+# Stream `COPY (query) TO STDOUT WITH CSV HEADER` from Postgres
+def _copy_csv(eng, stmt):
+    sql = str(stmt.compile(dialect=eng.dialect, compile_kwargs={"literal_binds": True}))
+    copy_sql = f"COPY ({sql}) TO STDOUT WITH CSV HEADER"
+    if eng.dialect.driver == "psycopg":
+        return _copy_csv_psycopg(eng, copy_sql)
+    return _copy_csv_psycopg2(eng, copy_sql)
+
+
+# psycopg 3 reads COPY output as an iterator; closing it early cancels the COPY
+def _copy_csv_psycopg(eng, copy_sql):
+    conn = eng.raw_connection()
+    try:
+        with conn.cursor() as cur:
+            with cur.copy(copy_sql) as copy:
+                for data in copy:
+                    yield bytes(data)
+        conn.rollback()
+    finally:
+        conn.close()
+
+
+# psycopg2 pushes COPY output into a file object, so chunks come from a helper thread
+def _copy_csv_psycopg2(eng, copy_sql):
+    chunks: queue.Queue = queue.Queue(maxsize=16)
+    stop = threading.Event()
+
+    class _QueueWriter:
+        def write(self, data):
+            # Abort COPY if the client went away
+            while not stop.is_set():
+                try:
+                    chunks.put(data, timeout=1)
+                    return
+                except queue.Full:
+                    continue
+            raise IOError("export cancelled")
+
+    def run():
+        conn = eng.raw_connection()
+        try:
+            with conn.cursor() as cur:
+                cur.copy_expert(copy_sql, _QueueWriter())
+            conn.rollback()
+        except Exception as ex:
+            if not stop.is_set():
+                chunks.put(ex)
+        finally:
+            conn.close()
+            if not stop.is_set():
+                chunks.put(None)
+
+    threading.Thread(target=run, daemon=True).start()
+    try:
+        while True:
+            item = chunks.get()
+            if item is None:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stop.set()
+
+
+# Portable CSV streaming through a server-side cursor (used for non-Postgres databases)
+def _cursor_csv(eng, stmt, columns):
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(columns)
+    with eng.connect() as conn:
+        result = conn.execution_options(stream_results=True, yield_per=Config.EXPORT_BATCH_ROWS).execute(stmt)
+        for batch in result.partitions():
+            writer.writerows(batch)
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+    if buf.tell():
+        yield buf.getvalue()
+
+
+# Minimal write-only file object that hands Parquet bytes to the response as they are produced
+class _ChunkSink:
+    def __init__(self):
+        self.parts: list[bytes] = []
+        self.pos = 0
+        self.closed = False
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        self.pos += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.pos
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def writable(self):
+        return True
+
+    def drain(self) -> bytes:
+        out = b"".join(self.parts)
+        self.parts.clear()
+        return out
+
+
+# Stream Parquet one row group per cursor batch, followed by any archived batches
+def _cursor_parquet(eng, stmt, model, columns, archived=()):
+    schema = parquet_schema(model, columns)
+    sink = _ChunkSink()
+    writer = parquet.pq.ParquetWriter(sink, schema, compression="snappy")
+    with eng.connect() as conn:
+        result = conn.execution_options(stream_results=True, yield_per=Config.EXPORT_BATCH_ROWS).execute(stmt)
+        for batch in itertools.chain(result.partitions(), archived):
+            writer.write_table(batch_table(batch, columns, schema))
+            yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+
+# pyarrow dataset filter equivalent to filtered_select for the given query-string args
+def _archive_filter(model, args):
+    import pyarrow.dataset as ds
+    expr = None
+    for col in model.__table__.columns:
+        conds = []
+        if col.key in args:
+            conds.append(ds.field(col.key) == parquet.parquet_value(coerce_arg(col, args[col.key])))
+        if col.type.python_type is date:
+            if f"{col.key}_from" in args:
+                conds.append(ds.field(col.key) >= coerce_arg(col, args[f"{col.key}_from"]))
+            if f"{col.key}_to" in args:
+                conds.append(ds.field(col.key) <= coerce_arg(col, args[f"{col.key}_to"]))
+        for cond in conds:
+            expr = cond if expr is None else expr & cond
+    return expr
+
+
+# Archived rows (see services/partitions.py) matching the export filters, as batches of row
+# tuples; only files for months inside the partition-key date range are opened
+def _archived_batches(model, columns, args):
+    import pyarrow.dataset as ds
+    key = PARTITIONED_TABLES[model.__tablename__][1]
+    col = model.__table__.c[key]
+    if key in args:
+        date_from = date_to = coerce_arg(col, args[key])
+    else:
+        date_from = coerce_arg(col, args[f"{key}_from"]) if f"{key}_from" in args else None
+        date_to = coerce_arg(col, args[f"{key}_to"]) if f"{key}_to" in args else None
+    paths = [path for _, path in archived_files(model.__tablename__, date_from, date_to)]
+    if not paths:
+        return
+    dataset = ds.dataset(paths, format="parquet")
+    for batch in dataset.to_batches(columns=columns, filter=_archive_filter(model, args), batch_size=Config.EXPORT_BATCH_ROWS):
+        if batch.num_rows:
+            yield list(zip(*(batch.column(i).to_pylist() for i in range(len(columns)))))
+
+
+# CSV rows (no header) for archived batches, appended after the live rows
+def _archived_csv(batches):
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    for batch in batches:
+        writer.writerows(batch)
+        yield buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+
+
+# Export a table as CSV (default) or Parquet - admin only, same filters as the list endpoints
+@bp.get("/<table>")
+@require_auth(["admin"])
+@replica_read
+def export_table(table: str):
+    model = EXPORT_TABLES.get(table)
+    if model is None:
+        return jsonify({"error": "Unknown table"}), 404
+    columns = table_columns(model)
+    try:
+        stmt = filtered_select(model, request.args, [model.__table__.c[c] for c in columns])
+    except ValueError as ex:
+        return jsonify({"error": str(ex)}), 400
+
+    # ?include_archived=1 appends rows from months archived out of partitioned tables
+    archived = ()
+    if request.args.get("include_archived") in ("1", "true") and model.__tablename__ in PARTITIONED_TABLES:
+        if not load_pyarrow():
+            return jsonify({"error": "Reading archived data requires pyarrow"}), 406
+        archived = _archived_batches(model, columns, request.args)
+
+    # Exports are pure reads, so a replica serves them when configured
+    eng = get_read_engine()
+    fmt = (request.args.get("format") or "csv").lower()
+    filename = f"{model.__tablename__}.{fmt}"
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+    if fmt == "csv":
+        if eng.dialect.name == "postgresql" and eng.dialect.driver in COPY_DRIVERS:
+            body = _copy_csv(eng, stmt)
+        else:
+            body = _cursor_csv(eng, stmt, columns)
+        body = itertools.chain(body, _archived_csv(archived))
+        return Response(stream_with_context(body), mimetype="text/csv", headers=headers)
+    if fmt == "parquet":
+        if not load_pyarrow():
+            return jsonify({"error": "Parquet export requires pyarrow"}), 406
+        return Response(stream_with_context(_cursor_parquet(eng, stmt, model, columns, archived)), mimetype="application/vnd.apache.parquet", headers=headers)
+    return jsonify({"error": "Unsupported format; use csv or parquet"}), 400
@@ -0,0 +1,70 @@
+# Jobs blueprint - submit background jobs, poll their status and fetch results
+import uuid
+from flask import Blueprint, request, jsonify, url_for
+from ..extensions import SessionLocal
+from ..models.models import Job
+from ..services.jobs import JOB_HANDLERS, enqueue_job, job_to_dict
+from ..utils.auth import require_auth
+
+# Create blueprint for job routes
+bp = Blueprint("jobs", __name__, url_prefix="/api/jobs")
+
+
+# Queue a job in the given session and build the 202 response pointing at its status URL
+def accepted(s, kind: str, payload: dict, user_id=None):
+    job = enqueue_job(s, kind, payload, user_id)
+    s.commit()
+    body = job_to_dict(job)
+    body["status_url"] = url_for("jobs.job_status", jid=job.id)
+    return jsonify(body), 202, {"Location": body["status_url"]}
+
+
+# Owners and admins can see a job; jobs without an owner (scheduled runs) are admin-only
+def _can_view(job: Job) -> bool:
+    return request.user.get("role") == "admin" or (
+        job.created_by is not None and request.user.get("sub") == str(job.created_by)
+    )
+
+
+# Submit a job: {"kind": "...", "payload": {...}}
+@bp.post("")
+@require_auth()
+def submit_job():
+    data = request.get_json() or {}
+    kind = data.get("kind")
+    handler = JOB_HANDLERS.get(kind)
+    if handler is None:
+        return jsonify({"error": "Unknown job kind", "kinds": sorted(JOB_HANDLERS)}), 400
+    if handler["roles"] and request.user.get("role") not in handler["roles"]:
+        return jsonify({"error": "Forbidden"}), 403
+    payload = data.get("payload") or {}
+    if not isinstance(payload, dict):
+        return jsonify({"error": "payload must be an object"}), 400
+    with SessionLocal() as s:
+        return accepted(s, kind, payload, uuid.UUID(request.user["sub"]))
+
+
+# Poll job status
+@bp.get("/<uuid:jid>")
+@require_auth()
+def job_status(jid):
+    with SessionLocal() as s:
+        job = s.get(Job, jid)
+        if not job or not _can_view(job):
+            return jsonify({"error": "Not found"}), 404
+        return jsonify(job_to_dict(job))
+
+
+# Fetch the result of a finished job
+@bp.get("/<uuid:jid>/result")
+@require_auth()
+def job_result(jid):
+    with SessionLocal() as s:
+        job = s.get(Job, jid)
+        if not job or not _can_view(job):
+            return jsonify({"error": "Not found"}), 404
+        if job.status == "failed":
+            return jsonify({"error": job.error, "status": job.status}), 500
+        if job.status != "done":
+            return jsonify({"error": "Job not finished", "status": job.status}), 409
+        return jsonify(job.result)
@@ -1,87 +1,99 @@
 # Notifications blueprint - handles patient and admin notification endpoints
 from flask import Blueprint, request, jsonify
-from sqlalchemy import select
-from datetime import date, timedelta
+from sqlalchemy import select, update
+from datetime import date, datetime
 import uuid
-from ..extensions import SessionLocal
+from ..config import Config
+from ..extensions import SessionLocal, replica_read
 from ..utils.auth import require_auth
-from ..models.models import CaseRecord, Vaccination, Patient
+from ..models.models import Notification
+from ..services.inbox import due_reminders, iter_patient_batches, notification_to_dict
 
 # Create blueprint for notification routes
 bp = Blueprint("notifications", __name__, url_prefix="/api/notifications")
 
 
-# Get current user's notifications - vaccination due and retest reminders
+# Get current user's notifications from the inbox filled by the periodic sweep.
+# ?since=<cursor> returns only newer rows, ?unread=1 only unread ones, ?limit= caps the page.
 @bp.get("/me")
 @require_auth(["user","admin"])
+@replica_read
 def my_notifications():
     user_id = uuid.UUID(request.user.get("sub"))
-    today = date.today()
-    messages: list[dict] = []
+    stmt = select(Notification).where(Notification.user_id == user_id)
+    if request.args.get("since"):
+        try:
+            stmt = stmt.where(Notification.created_at > datetime.fromisoformat(request.args["since"]))
+        except ValueError:
+            return jsonify({"error": "since must be an ISO timestamp"}), 400
+    if request.args.get("unread") in ("1", "true"):
+        stmt = stmt.where(Notification.read_at.is_(None))
+    try:
+        limit = max(1, min(int(request.args.get("limit", 50)), 200))
+    except ValueError:
+        return jsonify({"error": "limit must be a number"}), 400
     with SessionLocal() as s:
-        # Vaccination due: if exactly 1 dose, second due in 6 months. Notify if within 7 days window or overdue.
-        first = s.scalars(
-            select(Vaccination).where(Vaccination.patient_id == user_id).order_by(Vaccination.date.asc())
-        ).all()
-        if len(first) == 1:
-            first_date = first[0].date
-            due_date = first_date + timedelta(days=180)
-            if today >= due_date - timedelta(days=7):
-                status = "overdue" if today > due_date else "due_soon"
-                messages.append({
-                    "type": "vaccination_due",
-                    "title": "Second dose due",
-                    "message": f"Your second COVID-19 dose is {status.replace('_',' ')} on {due_date.isoformat()}.",
-                    "due_date": due_date.isoformat(),
-                })
+        rows = s.scalars(stmt.order_by(Notification.created_at.desc()).limit(limit)).all()
+        messages = [notification_to_dict(n) for n in rows]
+    # Cursor for the next incremental fetch: newest created_at seen (or the one passed in)
+    cursor = messages[0]["created_at"] if messages else request.args.get("since")
+    return jsonify({"notifications": messages, "cursor": cursor})
 
-        # Active case retest reminder: 15 days after diagnosis
-        active = s.scalars(
-            select(CaseRecord).where(CaseRecord.patient_id == user_id).order_by(CaseRecord.diag_date.desc())
-        ).first()
-        if active and active.status == "active":
-            retest_date = active.diag_date + timedelta(days=15)
-            if today >= retest_date - timedelta(days=7):
-                messages.append({
-                    "type": "retest_reminder",
-                    "title": "Retest recommended",
-                    "message": f"Please get tested again on {retest_date.isoformat()} (15 days from diagnosis).",
-                    "retest_date": retest_date.isoformat(),
-                })
 
-    return jsonify({"notifications": messages})
+# Mark one of the current user's notifications as read
+@bp.post("/<uuid:nid>/read")
+@require_auth(["user","admin"])
+def mark_read(nid):
+    user_id = uuid.UUID(request.user.get("sub"))
+    with SessionLocal() as s:
+        updated = s.execute(
+            update(Notification)
+            .where(Notification.id == nid, Notification.user_id == user_id, Notification.read_at.is_(None))
+            .values(read_at=datetime.utcnow())
+        ).rowcount
+        s.commit()
+    return jsonify({"ok": True, "updated": updated})
+
+
+# Mark all of the current user's notifications as read
+@bp.post("/me/read-all")
+@require_auth(["user","admin"])
+def mark_all_read():
+    user_id = uuid.UUID(request.user.get("sub"))
+    with SessionLocal() as s:
+        updated = s.execute(
+            update(Notification)
+            .where(Notification.user_id == user_id, Notification.read_at.is_(None))
+            .values(read_at=datetime.utcnow())
+        ).rowcount
+        s.commit()
+    return jsonify({"ok": True, "updated": updated})
+
+
+# Collect due vaccination and retest reminders for every patient, batch by batch
+def compute_due_items(s, today: date) -> list[dict]:
+    results: list[dict] = []
+    for ids in iter_patient_batches(s, Config.NOTIFICATION_SWEEP_BATCH):
+        for pid, items in due_reminders(s, ids, today).items():
+            for item in items:
+                key = "retest_date" if item["type"] == "retest_reminder" else "due_date"
+                results.append({
+                    "patient_id": str(pid),
+                    "type": item["type"],
+                    key: item["due_date"].isoformat(),
+                })
+    return results
 
 
 # Get all patients with due notifications - admin only
 @bp.get("/admin/due")
 @require_auth(["admin"])
+@replica_read
 def admin_due_notifications():
-    today = date.today()
-    results: list[dict] = []
     with SessionLocal() as s:
-        patients = s.scalars(select(Patient)).all()
-        for p in patients:
-            user_id = p.id
-            # Vaccination due
-            vax = s.scalars(select(Vaccination).where(Vaccination.patient_id == user_id).order_by(Vaccination.date.asc())).all()
-            if len(vax) == 1:
-                due_date = vax[0].date + timedelta(days=180)
-                if today >= due_date - timedelta(days=7):
-                    results.append({
-                        "patient_id": str(user_id),
-                        "type": "vaccination_due",
-                        "due_date": due_date.isoformat(),
-                    })
-            # Retest reminder
-            cr = s.scalars(select(CaseRecord).where(CaseRecord.patient_id == user_id).order_by(CaseRecord.diag_date.desc())).first()
-            if cr and cr.status == "active":
-                retest_date = cr.diag_date + timedelta(days=15)
-                if today >= retest_date - timedelta(days=7):
-                    results.append({
-                        "patient_id": str(user_id),
-                        "type": "retest_reminder",
-                        "retest_date": retest_date.isoformat(),
-                    })
+        # ?async=1 runs the full sweep on the worker instead of in this request
+        if request.args.get("async") in ("1", "true"):
+            from .jobs import accepted
+            return accepted(s, "due_notifications", {}, uuid.UUID(request.user["sub"]))
+        results = compute_due_items(s, date.today())
     return jsonify({"items": results})
-
-
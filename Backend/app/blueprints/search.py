@@ -0,0 +1,153 @@
+# Search blueprint - ranked fuzzy lookup over patients, users and locations.
+# On Postgres matching and ranking use pg_trgm (GIN trigram indexes from schema.sql);
+# other databases fall back to case-insensitive substring matching.
+import base64
+import json
+import uuid
+from flask import Blueprint, request, jsonify
+from sqlalchemy import select, literal, func, or_, and_, case, union_all, cast, Float
+from ..extensions import SessionLocal, replica_read
+from ..models.models import User, Patient, Location
+from ..utils.auth import require_auth
+
+# Create blueprint for search routes
+bp = Blueprint("search", __name__, url_prefix="/api/search")
+
+# Searchable kinds: model, matched columns, label/detail columns and roles allowed to see them
+# (same visibility as the corresponding list endpoints in crud.py)
+SEARCH_KINDS = {
+    "patients": {
+        "model": Patient,
+        "columns": ("name", "contact"),
+        "label": "name",
+        "detail": "contact",
+        "roles": {"admin"},
+    },
+    "users": {
+        "model": User,
+        "columns": ("name", "email"),
+        "label": "name",
+        "detail": "email",
+        "roles": {"admin", "manager"},
+    },
+    "locations": {
+        "model": Location,
+        "columns": ("name", "zip"),
+        "label": "name",
+        "detail": "state",
+        "roles": {"admin", "user"},
+    },
+}
+
+MIN_QUERY_LENGTH = 2
+MAX_LIMIT = 100
+
+
+# Escape LIKE wildcards in user input
+def _like_pattern(q: str) -> str:
+    return "%" + q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+# Match condition and relevance score (0..1) of one column for the query
+def _match(col, q: str, dialect: str):
+    contains = col.ilike(_like_pattern(q), escape="\\")
+    if dialect == "postgresql":
+        # % and ILIKE are both served by the gin_trgm_ops index; similarity ranks typos and partials
+        return or_(col.op("%")(q), contains), func.similarity(col, q)
+    lowered, needle = func.lower(col), q.lower()
+    score = case(
+        (lowered == needle, 1.0),
+        (lowered.like(_like_pattern(needle).lstrip("%"), escape="\\"), 0.75),
+        (contains, 0.5),
+        else_=0.0,
+    )
+    return contains, score
+
+
+# One ranked SELECT per kind: (kind, id, label, detail, score)
+def _kind_select(kind: str, q: str, dialect: str):
+    spec = SEARCH_KINDS[kind]
+    table = spec["model"].__table__
+    matches = [_match(table.c[c], q, dialect) for c in spec["columns"]]
+    scores = [m[1] for m in matches]
+    if len(scores) == 1:
+        score = scores[0]
+    else:
+        # greatest() on Postgres, multi-argument max() on SQLite
+        score = func.greatest(*scores) if dialect == "postgresql" else func.max(*scores)
+    return select(
+        literal(kind).label("kind"),
+        table.c.id.label("id"),
+        table.c[spec["label"]].label("label"),
+        table.c[spec["detail"]].label("detail"),
+        cast(score, Float).label("score"),
+    ).where(or_(*(m[0] for m in matches)))
+
+
+def _encode_cursor(row) -> str:
+    raw = json.dumps([row.score, row.kind, str(row.id)]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple:
+    try:
+        score, kind, rid = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return float(score), str(kind), uuid.UUID(rid)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+
+
+# Search ?q= across the kinds visible to the caller's role, best matches first.
+# ?type=patients,users narrows the kinds, ?limit= caps the page and ?cursor= continues
+# from the previous page's next_cursor (keyset paging on score, kind, id).
+@bp.get("")
+@require_auth(["admin", "manager", "user"])
+@replica_read
+def search():
+    q = (request.args.get("q") or "").strip()
+    if len(q) < MIN_QUERY_LENGTH:
+        return jsonify({"error": f"q must be at least {MIN_QUERY_LENGTH} characters"}), 400
+    role = request.user.get("role")
+    visible = [k for k, spec in SEARCH_KINDS.items() if role in spec["roles"]]
+    if request.args.get("type"):
+        wanted = set(request.args["type"].split(","))
+        unknown = wanted - set(SEARCH_KINDS)
+        if unknown:
+            return jsonify({"error": f"Unknown type(s): {', '.join(sorted(unknown))}"}), 400
+        visible = [k for k in visible if k in wanted]
+    if not visible:
+        return jsonify({"results": [], "next_cursor": None})
+    try:
+        limit = max(1, min(int(request.args.get("limit", 20)), MAX_LIMIT))
+    except ValueError:
+        return jsonify({"error": "limit must be a number"}), 400
+    try:
+        after = _decode_cursor(request.args["cursor"]) if request.args.get("cursor") else None
+    except ValueError as ex:
+        return jsonify({"error": str(ex)}), 400
+
+    with SessionLocal() as s:
+        dialect = s.get_bind().dialect.name
+        ranked = union_all(*(_kind_select(k, q, dialect) for k in visible)).subquery()
+        stmt = select(ranked)
+        if after is not None:
+            score, kind, rid = after
+            stmt = stmt.where(or_(
+                ranked.c.score < score,
+                and_(ranked.c.score == score, or_(
+                    ranked.c.kind > kind,
+                    and_(ranked.c.kind == kind, ranked.c.id > rid),
+                )),
+            ))
+        rows = s.execute(
+            stmt.order_by(ranked.c.score.desc(), ranked.c.kind, ranked.c.id).limit(limit + 1)
+        ).all()
+
+    page = rows[:limit]
+    return jsonify({
+        "results": [
+            {"type": r.kind, "id": str(r.id), "label": r.label, "detail": r.detail, "score": round(r.score, 4)}
+            for r in page
+        ],
+        "next_cursor": _encode_cursor(page[-1]) if len(rows) > limit else None,
+    })
@@ -0,0 +1,53 @@
+# State statistics blueprint - per-state dashboards read precomputed daily counters
+from datetime import date
+from flask import Blueprint, request, jsonify
+from sqlalchemy import select, func
+from ..extensions import SessionLocal, replica_read
+from ..models.models import StateDailyStat
+from ..utils.auth import require_auth
+
+# Create blueprint for state statistics routes
+bp = Blueprint("state_stats", __name__, url_prefix="/api/state-stats")
+
+
+# Daily counters, optionally filtered by ?state= and a ?from= / ?to= date range
+@bp.get("/daily")
+@require_auth(["admin", "manager"])
+@replica_read
+def daily_stats():
+    stmt = select(StateDailyStat).order_by(StateDailyStat.state, StateDailyStat.day)
+    try:
+        if request.args.get("state"):
+            stmt = stmt.where(StateDailyStat.state == request.args["state"])
+        if request.args.get("from"):
+            stmt = stmt.where(StateDailyStat.day >= date.fromisoformat(request.args["from"]))
+        if request.args.get("to"):
+            stmt = stmt.where(StateDailyStat.day <= date.fromisoformat(request.args["to"]))
+    except ValueError:
+        return jsonify({"error": "Dates must be YYYY-MM-DD"}), 400
+    with SessionLocal() as s:
+        rows = s.scalars(stmt).all()
+        return jsonify([
+            {"state": r.state, "day": r.day.isoformat(), "active": r.active, "recovered": r.recovered, "deaths": r.deaths}
+            for r in rows
+        ])
+
+
+# Live per-state totals summed from the daily counters
+@bp.get("/summary")
+@require_auth(["admin", "manager"])
+@replica_read
+def summary_stats():
+    with SessionLocal() as s:
+        rows = s.execute(
+            select(
+                StateDailyStat.state,
+                func.sum(StateDailyStat.active),
+                func.sum(StateDailyStat.recovered),
+                func.sum(StateDailyStat.deaths),
+            ).group_by(StateDailyStat.state).order_by(StateDailyStat.state)
+        ).all()
+        return jsonify([
+            {"state": st, "active": int(a or 0), "recovered": int(r or 0), "deaths": int(d or 0), "confirmed": int((a or 0) + (r or 0) + (d or 0))}
+            for st, a, r, d in rows
+        ])
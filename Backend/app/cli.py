@@ -1,15 +1,18 @@
 # Flask CLI commands for database management
 import click
 from flask import Flask
-from .app import create_app
+from .app import app  # Register commands on the app from app.py instead of building a second one
 from .extensions import SessionLocal
+from .services.state_stats import rebuild_state_daily_stats
+from .services.inbox import sweep_notifications
+from .services.coverage import refresh_coverage
+from .services.cache import invalidate
 from .models.models import User, Patient, Location, CaseRecord, Vaccination, UserRole
+from .models.queries import USER_BY_EMAIL
 from datetime import date, timedelta
 import uuid
 from sqlalchemy import select
 
-app = create_app()
-
 # CLI command: Count records in all tables
 @app.cli.command("count")
 def count():
@@ -44,7 +47,7 @@ def seed():
         base_date = date(1995,1,1)
         for idx,(fn,ln) in enumerate(indian_names, start=1):
             email = f"{fn.lower()}.{ln.lower()}@mail.in"
-            user = s.scalar(select(User).where(User.email == email))
+            user = s.scalar(USER_BY_EMAIL, {"email": email})
             if not user:
                 user = User(
                     first_name=fn,
@@ -103,4 +106,94 @@ def seed():
                 if idx % 2 == 0:
                     s.add(Vaccination(patient_id=p.id, date=first_date + timedelta(days=30), vaccine_type=first_vax_type))
         s.commit()
+        # Seeded cases bypass the API, so recompute the per-state counters
+        rebuild_state_daily_stats(s)
+        refresh_coverage(s)
+        s.commit()
+        # Fill notification inboxes for the seeded patients
+        sweep_notifications(s)
+        # Running web workers would otherwise serve the pre-seed lists until the cache TTL
+        invalidate("locations", "metrics")
         print("Seed complete. Admin user is managed via schema.sql migration.")
+
+
+# CLI command: Recompute per-state daily counters from case records
+@app.cli.command("rebuild-state-stats")
+def rebuild_state_stats():
+    """Rebuild state_daily_stats from case_records and locations."""
+    with SessionLocal() as s:
+        n = rebuild_state_daily_stats(s)
+        s.commit()
+        print(f"Rebuilt state_daily_stats: {n} rows.")
+
+
+# CLI command: Recompute the vaccination coverage rollup
+@app.cli.command("refresh-coverage")
+def refresh_coverage_cmd():
+    """Rebuild vaccination_coverage from patients, vaccinations and case records."""
+    with SessionLocal() as s:
+        n = refresh_coverage(s)
+        s.commit()
+        print(f"Refreshed vaccination_coverage: {n} rows.")
+
+
+# CLI command: Compile the prediction CSV into the memory-mapped Arrow dataset
+@app.cli.command("convert-dataset")
+@click.option("--src", default=None, help="CSV to convert (default: PREDICT_CSV_PATH).")
+@click.option("--dest", default=None, help="Arrow file to write (default: PREDICT_DATASET_PATH).")
+def convert_dataset_cmd(src, dest):
+    """Write the state dataset as an Arrow file the prediction service memory-maps."""
+    from .config import Config
+    from .services.dataset import convert_dataset
+    src, dest = src or Config.PREDICT_CSV_PATH, dest or Config.PREDICT_DATASET_PATH
+    rows, states = convert_dataset(src, dest)
+    print(f"Wrote {rows} rows for {states} states to {dest}.")
+
+
+# CLI command: Run background job workers
+@app.cli.command("worker")
+@click.option("--concurrency", "-c", default=None, type=int, help="Worker threads (default: WORKER_CONCURRENCY).")
+@click.option("--poll", default=None, type=float, help="Seconds to sleep when the queue is empty.")
+@click.option("--no-schedule", is_flag=True, help="Do not queue scheduled jobs (e.g. the notification sweep).")
+def worker(concurrency, poll, no_schedule):
+    """Process queued jobs from the jobs table until interrupted."""
+    from .config import Config
+    from .services.jobs import run_workers
+    concurrency = concurrency or Config.WORKER_CONCURRENCY
+    print(f"Starting {concurrency} job worker(s). Press Ctrl+C to stop.")
+    run_workers(concurrency, poll or Config.WORKER_POLL_SECONDS, schedule=not no_schedule)
+
+
+# CLI command: Generate inbox notifications for all patients now
+@app.cli.command("sweep-notifications")
+def sweep_notifications_cmd():
+    """Run the notification sweep once (workers also run it on a schedule)."""
+    with SessionLocal() as s:
+        n = sweep_notifications(s)
+        print(f"Created {n} notifications.")
+
+
+# CLI command: Create monthly partitions ahead of time (Postgres)
+@app.cli.command("ensure-partitions")
+@click.option("--months-ahead", default=None, type=int, help="Months to create past the current one (default: PARTITION_MONTHS_AHEAD).")
+def ensure_partitions_cmd(months_ahead):
+    """Create missing monthly partitions for case_records and vaccinations."""
+    from .services.partitions import ensure_partitions
+    with SessionLocal() as s:
+        created = ensure_partitions(s, months_ahead)
+        s.commit()
+        print(f"Created {len(created)} partitions." + (" " + ", ".join(created) if created else ""))
+
+
+# CLI command: Move old months to Parquet files and drop them from the database
+@app.cli.command("archive-partitions")
+@click.option("--before", default=None, help="Archive months before this date, YYYY-MM-DD (default: ARCHIVE_AFTER_MONTHS ago).")
+@click.option("--dry-run", is_flag=True, help="Only list the months that would be archived.")
+def archive_partitions_cmd(before, dry_run):
+    """Archive old case_records/vaccinations months to compressed Parquet under ARCHIVE_DIR."""
+    from .services.partitions import archive_partitions
+    with SessionLocal() as s:
+        entries = archive_partitions(s, date.fromisoformat(before) if before else None, dry_run=dry_run)
+    for e in entries:
+        print(f"{e['table']} {e['month']}: {e['rows']} rows" + (f" -> {e['file']}" if e["file"] else ""))
+    print(("Would archive" if dry_run else "Archived") + f" {len(entries)} month(s).")
@@ -1,16 +1,229 @@
 # Database and security extensions - initialized once and reused
+import hashlib
+import hmac
+import itertools
+import math
+import os
+import threading
+import time
+from functools import wraps
+from flask import g, has_request_context, request
 from flask_bcrypt import Bcrypt
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, DeclarativeBase, scoped_session
+from sqlalchemy import create_engine, text, event, make_url
+from sqlalchemy.sql.dml import UpdateBase
+from sqlalchemy.orm import sessionmaker, DeclarativeBase, scoped_session, Session
 from .config import Config
 
 # Bcrypt instance for password hashing
 bcrypt = Bcrypt()
-# SQLAlchemy database engine with connection pooling
-engine = create_engine(Config.SQLALCHEMY_DATABASE_URI, pool_pre_ping=True)
+
+# SQLAlchemy database engine with connection pooling - created on first use so that
+# importing the app (CLI commands, worker boot) does not load the DB driver or build pools
+_engine = None
+
+
+def get_engine():
+    global _engine
+    if _engine is None:
+        _engine = create_engine(Config.SQLALCHEMY_DATABASE_URI, **_engine_options(Config.SQLALCHEMY_DATABASE_URI))
+        if _engine.dialect.name == "sqlite":
+            _sqlite_transactions(_engine)
+    return _engine
+
+
+# create_engine options shared by the primary and the replicas
+def _engine_options(url: str) -> dict:
+    options = {"pool_pre_ping": True, "query_cache_size": Config.DB_STATEMENT_CACHE_SIZE}
+    if Config.DB_PREPARE_THRESHOLD is not None:
+        # Server-side prepared statements are a psycopg 3 feature (psycopg2 has no equivalent)
+        if make_url(url).get_driver_name() != "psycopg":
+            raise RuntimeError("DB_PREPARE_THRESHOLD requires a postgresql+psycopg:// URL")
+        options["connect_args"] = {"prepare_threshold": Config.DB_PREPARE_THRESHOLD}
+    return options
+
+
+# pysqlite opens transactions lazily and mishandles SAVEPOINT (used by /api/batch); let
+# SQLAlchemy emit BEGIN itself instead
+def _sqlite_transactions(engine):
+    @event.listens_for(engine, "connect")
+    def _connect(dbapi_connection, _record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def _begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
+
+# Read replicas - one engine (and connection pool) per DATABASE_REPLICA_URLS entry
+_replicas = None
+_replica_lock = threading.Lock()
+_round_robin = itertools.count()
+# engine -> (checked_at, lag_seconds)
+_lag_cache: dict = {}
+# user id -> time of the user's last successful write through this process (read-your-writes)
+_recent_writers: dict[str, float] = {}
+# Response header with the time of a successful write, as "<time>.<signature>". Clients send it
+# back on later requests, so whichever worker or host serves them still keeps their reads on the
+# primary. The signature binds the time to the user, so a client cannot extend its own window.
+LAST_WRITE_HEADER = "X-Last-Write"
+
+# Replication delay on a Postgres standby; 0 when fully replayed, NULL on a primary
+_LAG_SQL = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+
+
+def get_replica_engines() -> list:
+    global _replicas
+    if _replicas is None:
+        with _replica_lock:
+            if _replicas is None:
+                _replicas = [create_engine(url, **_engine_options(url)) for url in Config.DATABASE_REPLICA_URLS]
+    return _replicas
+
+
+# Cached replica lag in seconds; unreachable replicas report infinity
+def _replica_lag(eng) -> float:
+    now = time.monotonic()
+    checked_at, lag = _lag_cache.get(eng, (0.0, 0.0))
+    if eng in _lag_cache and now - checked_at < Config.REPLICA_LAG_CHECK_SECONDS:
+        return lag
+    if eng.dialect.name != "postgresql":
+        lag = 0.0
+    else:
+        try:
+            with eng.connect() as conn:
+                lag = float(conn.scalar(_LAG_SQL) or 0.0)
+        except Exception:
+            lag = math.inf
+    _lag_cache[eng] = (now, lag)
+    return lag
+
+
+def _write_signature(sub: str, stamp: str) -> str:
+    return hmac.new(Config.JWT_SECRET.encode(), f"{sub}:{stamp}".encode(), hashlib.sha256).hexdigest()[:32]
+
+
+# Signed LAST_WRITE_HEADER value for a write by `sub` at time `t`
+def sign_last_write(sub: str, t: float) -> str:
+    stamp = f"{t:.3f}"
+    return f"{stamp}.{_write_signature(sub, stamp)}"
+
+
+# Write time from the LAST_WRITE_HEADER the client echoed back, or None unless it was signed
+# for this user
+def _echoed_write(sub: str | None) -> float | None:
+    stamp, _, sig = request.headers.get(LAST_WRITE_HEADER, "").rpartition(".")
+    if not (sub and stamp and hmac.compare_digest(sig, _write_signature(sub, stamp))):
+        return None
+    try:
+        return float(stamp)
+    except ValueError:
+        return None
+
+
+# True while the current user is inside the read-your-writes window after a write, going by
+# this process's record or the LAST_WRITE_HEADER the client echoed back
+def recently_wrote() -> bool:
+    sub = (getattr(request, "user", None) or {}).get("sub")
+    stamps = [_recent_writers.get(sub), _echoed_write(sub)]
+    now = time.time()
+    return any(t is not None and 0 <= now - t < Config.READ_YOUR_WRITES_SECONDS for t in stamps)
+
+
+# Engine for reads in the current context: a healthy replica inside @replica_read handlers,
+# otherwise the primary
+def get_read_engine():
+    if not (has_request_context() and g.get("db_read_only")) or recently_wrote():
+        return get_engine()
+    candidates = [e for e in get_replica_engines() if _replica_lag(e) <= Config.REPLICA_MAX_LAG_SECONDS]
+    if not candidates:
+        return get_engine()
+    if Config.REPLICA_BALANCE == "least_connections":
+        return min(candidates, key=lambda e: e.pool.checkedout())
+    return candidates[next(_round_robin) % len(candidates)]
+
+
+# Mark a handler as read-only so its queries may be served by a replica
+def replica_read(fn):
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        g.db_read_only = True
+        return fn(*args, **kwargs)
+    return wrapper
+
+
+# after_request hook - remember users who just wrote so their next reads stay on the primary,
+# and hand the write time to the client for requests that land on other workers
+def _track_writes(response):
+    if request.method not in ("GET", "HEAD", "OPTIONS") and response.status_code < 400:
+        sub = (getattr(request, "user", None) or {}).get("sub")
+        if sub:
+            now = time.time()
+            _recent_writers[sub] = now
+            response.headers[LAST_WRITE_HEADER] = sign_last_write(sub, now)
+            if len(_recent_writers) > 10000:
+                cutoff = now - Config.READ_YOUR_WRITES_SECONDS
+                for k in [k for k, t in _recent_writers.items() if t < cutoff]:
+                    _recent_writers.pop(k, None)
+    return response
+
+
+# Register read-your-writes tracking on the app (used by replica routing and the shared cache)
+def init_db_routing(app):
+    app.after_request(_track_writes)
+
+
+# Forked workers (gunicorn with preload_app) must not share the parent's pooled connections:
+# drop them in the child without closing the parent's sockets, and start with fresh state
+def reset_after_fork():
+    global _replica_lock
+    for eng in [_engine, *(_replicas or ())]:
+        if eng is not None:
+            eng.dispose(close=False)
+    _replica_lock = threading.Lock()
+    _lag_cache.clear()
+    _recent_writers.clear()
+    SessionLocal.registry.clear()
+
+
+# Session that picks its engine lazily: flushes and INSERT/UPDATE/DELETE always go to the
+# primary; reads use the engine chosen once per session by get_read_engine()
+class LazySession(Session):
+    _read_bind = None
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self._flushing or isinstance(clause, UpdateBase):
+            return get_engine()
+        if self._read_bind is None:
+            self._read_bind = get_read_engine() if Config.DATABASE_REPLICA_URLS else get_engine()
+        return self._read_bind
+
+    # Inside /api/batch (info["batch"] set) handlers' commits only flush and their close keeps
+    # the session open; the batch commits or rolls back once at the end
+    def commit(self):
+        if self.info.get("batch"):
+            self.flush()
+            return
+        super().commit()
+
+    # scoped_session reuses the instance per thread, so re-pick the read engine next time
+    def close(self):
+        if self.info.get("batch"):
+            return
+        super().close()
+        self._read_bind = None
+
+
 # Thread-safe database session factory
-SessionLocal = scoped_session(sessionmaker(bind=engine, autoflush=False, autocommit=False))
+SessionLocal = scoped_session(sessionmaker(class_=LazySession, autoflush=False, autocommit=False))
+
 
 # Base class for all SQLAlchemy models
 class Base(DeclarativeBase):
     pass
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=reset_after_fork)
@@ -1,3 +1,3 @@
 # Export all models for convenient importing
-from .models import User, Patient, Location, CaseRecord, Vaccination, StateStat
-__all__ = ["User", "Patient", "Location", "CaseRecord", "Vaccination", "StateStat"]
+from .models import User, Patient, Location, CaseRecord, Vaccination, StateStat, StateDailyStat, VaccinationCoverage, Job, Notification, ChangeLog
+__all__ = ["User", "Patient", "Location", "CaseRecord", "Vaccination", "StateStat", "StateDailyStat", "VaccinationCoverage", "Job", "Notification", "ChangeLog"]
@@ -1,7 +1,7 @@
 # SQLAlchemy database models for COVID-19 DBMS
 import uuid
 from datetime import datetime, date
-from sqlalchemy import Column, String, DateTime, Enum, ForeignKey, Date, Integer, CheckConstraint, Text
+from sqlalchemy import Column, String, DateTime, Enum, ForeignKey, Date, Integer, BigInteger, CheckConstraint, Text, UniqueConstraint, JSON, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from ..extensions import Base
@@ -36,6 +36,14 @@ class Patient(Base):
     contact: Mapped[str] = mapped_column(String, nullable=False)
     dob: Mapped[date] = mapped_column(Date, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
+    # Read-only relationships for eager loading (selectinload); writes go through the columns.
+    # lazy="raise" turns an accidental per-row lazy load into an error instead of N+1 queries.
+    case_records: Mapped[list["CaseRecord"]] = relationship(
+        order_by="CaseRecord.diag_date.desc()", viewonly=True, lazy="raise"
+    )
+    vaccinations: Mapped[list["Vaccination"]] = relationship(
+        order_by="Vaccination.date", viewonly=True, lazy="raise"
+    )
 
 # Location table - stores hospital/clinic locations across India
 class Location(Base):
@@ -48,26 +56,31 @@ class Location(Base):
     state: Mapped[str] = mapped_column(String, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
 
-# Case record table - tracks COVID-19 case records for patients
+# Case record table - tracks COVID-19 case records for patients.
+# Range-partitioned by month on diag_date in Postgres (see schema.sql), so the partition key
+# is part of the primary key.
 class CaseRecord(Base):
     __tablename__ = "case_records"
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     patient_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("patients.id", ondelete="CASCADE"), nullable=False)
     location_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("locations.id", ondelete="CASCADE"), nullable=False)
-    diag_date: Mapped[date] = mapped_column(Date, nullable=False)
+    diag_date: Mapped[date] = mapped_column(Date, primary_key=True)  # Partition key
     status: Mapped[str] = mapped_column(String, nullable=False)
     # Database constraint - status must be one of these values
     __table_args__ = (
         CheckConstraint("status IN ('active','recovered','death')", name="status_check"),
+        {"postgresql_partition_by": "RANGE (diag_date)"},
     )
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
+    location: Mapped["Location"] = relationship(viewonly=True, lazy="raise")
 
-# Vaccination table - tracks patient vaccination records
+# Vaccination table - tracks patient vaccination records.
+# Range-partitioned by month on date in Postgres, like case_records.
 class Vaccination(Base):
     __tablename__ = "vaccinations"
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     patient_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("patients.id", ondelete="CASCADE"), nullable=False)
-    date: Mapped[date] = mapped_column(Date, nullable=False)
+    date: Mapped[date] = mapped_column(Date, primary_key=True)  # Partition key
     # Vaccine type enum - defines available vaccine types
     class VaccineType(str, enum.Enum):
         covaxin = "covaxin"
@@ -79,6 +92,7 @@ class Vaccination(Base):
     # Database constraint - vaccine type must be one of the allowed values
     __table_args__ = (
         CheckConstraint("vaccine_type IN ('covaxin','covishield','sputnik')", name="vaccine_type_check"),
+        {"postgresql_partition_by": "RANGE (date)"},
     )
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
 
@@ -94,3 +108,99 @@ class StateStat(Base):
     managed_by_user_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="SET NULL"))  # Optional admin/manager assignment
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
+
+# Per-state, per-day case counters - maintained incrementally from case_records writes
+class StateDailyStat(Base):
+    __tablename__ = "state_daily_stats"
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    state: Mapped[str] = mapped_column(String, nullable=False)
+    day: Mapped[date] = mapped_column(Date, nullable=False)  # Diagnosis date of the counted cases
+    active: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    recovered: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    deaths: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # One row per state and day; also the conflict target for incremental upserts
+    __table_args__ = (
+        UniqueConstraint("state", "day", name="state_daily_stats_state_day_key"),
+    )
+
+# Vaccination coverage rollup - patient counts per state, age band, vaccine type and dose count.
+# Rebuilt in one transaction by `flask refresh-coverage` (and the scheduled worker job).
+class VaccinationCoverage(Base):
+    __tablename__ = "vaccination_coverage"
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    state: Mapped[str] = mapped_column(String, nullable=False)  # State of the patient's latest case, or "Unknown"
+    age_band: Mapped[str] = mapped_column(String, nullable=False)  # e.g. "18-44", from dob at refresh time
+    vaccine_type: Mapped[str] = mapped_column(String, nullable=False)  # "none" for unvaccinated patients
+    doses: Mapped[int] = mapped_column(Integer, nullable=False)  # 0, 1, 2 or 3 (= 3 or more)
+    patients: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    refreshed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    # One row per dimension combination; the leading state column serves state drill-downs
+    __table_args__ = (
+        UniqueConstraint("state", "age_band", "vaccine_type", "doses", name="vaccination_coverage_dims_key"),
+    )
+
+# Background job table - work queued by the API and executed by `flask worker`
+class Job(Base):
+    __tablename__ = "jobs"
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    kind: Mapped[str] = mapped_column(String, nullable=False)  # Handler name, e.g. "forecast"
+    status: Mapped[str] = mapped_column(String, nullable=False, default="queued")
+    payload: Mapped[dict] = mapped_column(JSON, nullable=False, default=dict)
+    result: Mapped[dict | None] = mapped_column(JSON)
+    error: Mapped[str | None] = mapped_column(Text)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    created_by: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True))  # Submitting user (from JWT)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
+    started_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    # Database constraint - job lifecycle states
+    __table_args__ = (
+        CheckConstraint("status IN ('queued','running','done','failed')", name="job_status_check"),
+        Index("idx_jobs_status_created", "status", "created_at"),
+    )
+
+# Notification inbox - reminders generated by the periodic sweep, one row per user and reminder
+class Notification(Base):
+    __tablename__ = "notifications"
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    type: Mapped[str] = mapped_column(String, nullable=False)  # vaccination_due | retest_reminder
+    title: Mapped[str] = mapped_column(String, nullable=False)
+    message: Mapped[str] = mapped_column(Text, nullable=False)
+    due_date: Mapped[date | None] = mapped_column(Date)
+    # Identifies the reminder (type + due date) so repeated sweeps do not duplicate it
+    dedupe_key: Mapped[str] = mapped_column(String, nullable=False)
+    read_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
+    __table_args__ = (
+        UniqueConstraint("user_id", "dedupe_key", name="notifications_user_dedupe_key"),
+        Index("idx_notifications_user_created", "user_id", "created_at"),
+    )
+
+# Change log - one row per insert/update/delete on the admin-managed tables, so screens can
+# fetch only what changed since their last sync (GET /api/changes). On Postgres it is filled
+# by triggers from schema.sql; on other databases by the API write paths.
+class ChangeLog(Base):
+    __tablename__ = "change_log"
+    # Increasing cursor; SQLite only auto-increments INTEGER primary keys
+    id: Mapped[int] = mapped_column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    # Writing transaction's id, the cursor on Postgres (set by the column default there)
+    txid: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    table_name: Mapped[str] = mapped_column(String, nullable=False)
+    row_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    op: Mapped[str] = mapped_column(String, nullable=False)  # insert | update | delete
+    changed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
+    __table_args__ = (
+        CheckConstraint("op IN ('insert','update','delete')", name="change_log_op_check"),
+        Index("idx_change_log_changed_at", "changed_at"),
+        Index("idx_change_log_txid", "txid"),
+        # Never reuse ids of pruned entries as cursors
+        {"sqlite_autoincrement": True},
+    )
+
+
+# Cursor position up to which change_log has been pruned (a single row with id 1)
+class ChangeLogPruned(Base):
+    __tablename__ = "change_log_pruned"
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, default=1)
+    through: Mapped[int] = mapped_column(BigInteger, nullable=False)
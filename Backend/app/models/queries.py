@@ -0,0 +1,66 @@
+# Hot statements, built once at import. Executing the same statement object with new parameter
+# values skips select() construction entirely, and its cache key hits SQLAlchemy's compiled
+# cache, so a call costs parameter binding plus the round trip.
+from sqlalchemy import select, func, bindparam
+from sqlalchemy.orm import selectinload, joinedload
+from .models import User, Patient, CaseRecord, Vaccination
+
+# Login and registration: user by email (unique index on users.email)
+USER_BY_EMAIL = select(User).where(User.email == bindparam("email"))
+
+# Patient by primary key (patients are read in several handlers)
+PATIENT_BY_ID = select(Patient).where(Patient.id == bindparam("id"))
+
+# Patient profile: the patient, then all case records joined to their locations, then all
+# vaccinations - three queries however many records the patient has
+PATIENT_PROFILE = PATIENT_BY_ID.options(
+    selectinload(Patient.case_records).joinedload(CaseRecord.location),
+    selectinload(Patient.vaccinations),
+)
+
+# Vaccine type of a patient's first dose, optionally ignoring one vaccination row
+FIRST_DOSE_TYPE = (
+    select(Vaccination.vaccine_type)
+    .where(Vaccination.patient_id == bindparam("patient_id"))
+    .order_by(Vaccination.date.asc())
+    .limit(1)
+)
+FIRST_DOSE_TYPE_EXCLUDING = (
+    select(Vaccination.vaccine_type)
+    .where(Vaccination.patient_id == bindparam("patient_id"), Vaccination.id != bindparam("exclude_id"))
+    .order_by(Vaccination.date.asc())
+    .limit(1)
+)
+# Same, for the patient who owns vaccination :exclude_id (updates that do not move the dose)
+SIBLING_FIRST_DOSE_TYPE = (
+    select(Vaccination.vaccine_type)
+    .where(
+        Vaccination.patient_id == select(Vaccination.patient_id).where(Vaccination.id == bindparam("exclude_id")).scalar_subquery(),
+        Vaccination.id != bindparam("exclude_id"),
+    )
+    .order_by(Vaccination.date.asc())
+    .limit(1)
+)
+
+# Reminder sweep, per batch of patient ids: dose count and first dose date per patient
+DOSES_BY_PATIENT = (
+    select(Vaccination.patient_id, func.count(), func.min(Vaccination.date))
+    .where(Vaccination.patient_id.in_(bindparam("ids", expanding=True)))
+    .group_by(Vaccination.patient_id)
+)
+
+# Reminder sweep: latest case (diag_date, status) per patient via a window function
+_ranked_cases = (
+    select(
+        CaseRecord.patient_id,
+        CaseRecord.diag_date,
+        CaseRecord.status,
+        func.row_number().over(partition_by=CaseRecord.patient_id, order_by=CaseRecord.diag_date.desc()).label("rn"),
+    )
+    .where(CaseRecord.patient_id.in_(bindparam("ids", expanding=True)))
+    .subquery()
+)
+LATEST_CASE_BY_PATIENT = (
+    select(_ranked_cases.c.patient_id, _ranked_cases.c.diag_date, _ranked_cases.c.status)
+    .where(_ranked_cases.c.rn == 1)
+)
@@ -0,0 +1,156 @@
+# Shared cache - small computed results (locations list, dashboard metrics) kept once per host in
+# SHARED_CACHE_DIR, so every web worker reads the same copy instead of warming its own. One worker
+# computes a missing entry while the others wait for it; entries expire after their TTL and are
+# dropped when a write that changes them commits. Values are stored as JSON (never pickled) in a
+# directory that must belong to this user and not be writable by anyone else.
+import json
+import logging
+import os
+import stat
+import time
+from contextlib import contextmanager
+from datetime import date, datetime
+from flask import has_request_context
+from sqlalchemy import event
+from ..config import Config
+from ..extensions import LazySession, recently_wrote
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock, concurrent misses compute twice
+    fcntl = None
+
+log = logging.getLogger(__name__)
+
+_MISS = object()
+
+
+def _path(name: str, suffix: str = "json") -> str:
+    return os.path.join(Config.SHARED_CACHE_DIR, f"{name}.{suffix}")
+
+
+def _mtime(path: str) -> float:
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return 0.0
+
+
+# Create the cache directory if needed; False (cache bypassed) when it is not a directory owned
+# by this user or is writable by group/others, since another local user could then plant entries
+def _safe_dir() -> bool:
+    folder = Config.SHARED_CACHE_DIR
+    try:
+        os.makedirs(folder, mode=0o700, exist_ok=True)
+        st = os.lstat(folder)
+    except OSError as ex:
+        log.warning("shared cache disabled: %s", ex)
+        return False
+    if not stat.S_ISDIR(st.st_mode) or st.st_mode & 0o022 or (hasattr(os, "getuid") and st.st_uid != os.getuid()):
+        log.warning("shared cache disabled: %s must be a directory owned by this user and not group/world-writable", folder)
+        return False
+    return True
+
+
+# JSON with dates and datetimes tagged so they come back as the same types
+def _encode(value):
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    if isinstance(value, date):
+        return {"__date__": value.isoformat()}
+    raise TypeError(f"{type(value).__name__} is not cacheable")
+
+
+def _decode(obj: dict):
+    if "__datetime__" in obj:
+        return datetime.fromisoformat(obj["__datetime__"])
+    if "__date__" in obj:
+        return date.fromisoformat(obj["__date__"])
+    return obj
+
+
+def _read(name: str, ttl: float):
+    path = _path(name)
+    written = _mtime(path)
+    if not written or time.time() - written > ttl:
+        return _MISS
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f, object_hook=_decode)
+    except (OSError, ValueError):
+        return _MISS
+
+
+# Exclusive per-entry lock across processes and threads (flock on a side file)
+@contextmanager
+def _locked(name: str):
+    if fcntl is None:
+        yield
+        return
+    with open(_path(name, "lock"), "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+# Cached value of `name`, calling compute() on a miss. Requests inside the caller's
+# read-your-writes window skip the cached copy (and refresh it).
+def cached(name: str, compute, ttl: float | None = None):
+    ttl = Config.SHARED_CACHE_TTL_SECONDS if ttl is None else ttl
+    if not _safe_dir():
+        return compute()
+    fresh = has_request_context() and recently_wrote()
+    if not fresh:
+        value = _read(name, ttl)
+        if value is not _MISS:
+            return value
+    with _locked(name):
+        if not fresh:
+            # Another worker may have filled it while we waited for the lock
+            value = _read(name, ttl)
+            if value is not _MISS:
+                return value
+        started = time.time()
+        value = compute()
+        # Keep a value computed across an invalidation out of the cache
+        if _mtime(_path(name, "stale")) < started:
+            tmp = _path(name, f"{os.getpid()}.tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(value, f, default=_encode)
+            os.replace(tmp, _path(name))
+    return value
+
+
+# Drop cached entries now
+def invalidate(*names: str):
+    if not os.path.isdir(Config.SHARED_CACHE_DIR) or not _safe_dir():
+        return
+    for name in names:
+        with open(_path(name, "stale"), "a"):
+            os.utime(_path(name, "stale"))
+        try:
+            os.remove(_path(name))
+        except FileNotFoundError:
+            pass
+
+
+# Drop cached entries once the session's transaction commits (inside /api/batch, once the
+# whole batch commits rather than at each operation's savepoint)
+def invalidate_on_commit(s, *names: str):
+    s.info.setdefault("stale_caches", set()).update(names)
+
+
+@event.listens_for(LazySession, "after_commit")
+def _invalidate_committed(session):
+    if session.info.get("batch"):
+        return
+    invalidate(*session.info.pop("stale_caches", ()))
+
+
+@event.listens_for(LazySession, "after_rollback")
+def _drop_stale(session):
+    if session.info.get("batch"):
+        return
+    session.info.pop("stale_caches", None)
@@ -0,0 +1,143 @@
+# Change log - row-level insert/update/delete history of the admin-managed tables, read back
+# as a cursor-based delta feed. On Postgres, triggers (schema.sql) write the log for every
+# writer, including cascading deletes and direct Supabase clients; on other databases the API
+# write paths call log_change/log_cascade instead.
+#
+# A cursor N means every change up to position N has been delivered. On Postgres the position
+# is the writing transaction's id, and only transactions below the oldest one still running
+# (the snapshot xmin) are served, so a transaction that commits late is never skipped and
+# writers never wait on each other. Elsewhere the position is the entry id (SQLite commits
+# one writer at a time, so ids become visible in order).
+from datetime import date, datetime, timedelta
+from sqlalchemy import select, insert, delete, literal, func, text
+from ..models.models import User, Patient, Location, CaseRecord, Vaccination, ChangeLog, ChangeLogPruned
+from ..utils.writes import row_to_dict
+
+# Synced tables and the roles that may read them (same visibility as the list endpoints)
+CHANGE_TABLES = {
+    "users": {"model": User, "roles": {"admin", "manager"}},
+    "patients": {"model": Patient, "roles": {"admin"}},
+    "locations": {"model": Location, "roles": {"admin", "user"}},
+    "case_records": {"model": CaseRecord, "roles": {"admin"}},
+    "vaccinations": {"model": Vaccination, "roles": {"admin"}},
+}
+_TABLE_NAMES = {spec["model"]: name for name, spec in CHANGE_TABLES.items()}
+
+
+def _logged_by_triggers(s) -> bool:
+    return s.get_bind().dialect.name == "postgresql"
+
+
+# Column holding an entry's cursor position
+def _position(s):
+    return ChangeLog.txid if _logged_by_triggers(s) else ChangeLog.id
+
+
+# Log one row change (no-op on Postgres, where triggers already did)
+def log_change(s, model, op: str, row_id):
+    if _logged_by_triggers(s):
+        return
+    s.execute(insert(ChangeLog).values(table_name=_TABLE_NAMES[model], row_id=row_id, op=op, changed_at=datetime.utcnow()))
+
+
+# Tombstones for rows a cascading delete is about to remove, as one INSERT ... SELECT.
+# Call before the parent row is deleted.
+def log_cascade(s, model, *criteria):
+    if _logged_by_triggers(s):
+        return
+    table = model.__table__
+    s.execute(insert(ChangeLog).from_select(
+        ["table_name", "row_id", "op", "changed_at"],
+        select(literal(_TABLE_NAMES[model]), table.c.id, literal("delete"), literal(datetime.utcnow())).where(*criteria),
+    ))
+
+
+# Rows of a patient that go with it: case records and vaccinations
+def log_patient_cascade(s, patient_id):
+    log_cascade(s, CaseRecord, CaseRecord.patient_id == patient_id)
+    log_cascade(s, Vaccination, Vaccination.patient_id == patient_id)
+
+
+# Newest position every change up to which is committed; the cursor a client starts from
+# before loading full tables
+def head_cursor(s) -> int:
+    if _logged_by_triggers(s):
+        return s.scalar(text("SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint")) - 1
+    return s.scalar(select(func.max(ChangeLog.id))) or s.scalar(select(ChangeLogPruned.through)) or 0
+
+
+# True when changes after `since` may already have been pruned
+def cursor_expired(s, since: int) -> bool:
+    through = s.scalar(select(ChangeLogPruned.through))
+    return through is not None and since < through
+
+
+def _json_row(row) -> dict:
+    d = row_to_dict(row)
+    for k, v in d.items():
+        if isinstance(v, (date, datetime)):
+            d[k] = v.isoformat()
+    return d
+
+
+# Changes after cursor `since` for the given tables, about `limit` log entries. Pages end on
+# a position boundary, so one transaction larger than `limit` comes back whole.
+# Several changes to one row collapse into its latest; inserts and updates carry the current
+# row and deletes are tombstones. Returns (changes, next cursor, has_more).
+def changes_since(s, since: int, tables: list[str], limit: int) -> tuple:
+    head = head_cursor(s)
+    pos = _position(s)
+    query = (
+        select(pos.label("pos"), ChangeLog.table_name, ChangeLog.row_id, ChangeLog.op)
+        .where(ChangeLog.table_name.in_(tables))
+        .order_by(pos, ChangeLog.id)
+    )
+    entries = s.execute(query.where(pos > since, pos <= head).limit(limit + 1)).all()
+    has_more = len(entries) > limit
+    if has_more:
+        # Drop the position the page cut into, or fetch all of it when it is the only one
+        cut = entries[limit].pos
+        entries = [e for e in entries[:limit] if e.pos < cut] or s.execute(query.where(pos == cut)).all()
+        cursor = entries[-1].pos
+    else:
+        # Entries for other tables up to head are skipped too
+        cursor = max(head, since)
+
+    latest: dict = {}
+    for e in entries:
+        latest.pop((e.table_name, e.row_id), None)
+        latest[(e.table_name, e.row_id)] = e.op
+    # Current rows for everything not deleted, one query per table
+    current: dict = {}
+    for name in tables:
+        ids = [rid for (t, rid), op in latest.items() if t == name and op != "delete"]
+        if ids:
+            table = CHANGE_TABLES[name]["model"].__table__
+            for row in s.execute(select(*table.columns).where(table.c.id.in_(ids))).all():
+                current[(name, row.id)] = row
+
+    changes = []
+    for (name, rid), op in latest.items():
+        row = current.get((name, rid))
+        if op == "delete" or row is None:
+            # Deleted after this page's head; the tombstone arrives on a later sync as well
+            changes.append({"table": name, "op": "delete", "id": str(rid)})
+        else:
+            changes.append({"table": name, "op": op, "id": str(rid), "row": _json_row(row)})
+    return changes, cursor, has_more
+
+
+# Drop change-log entries older than `days` (default CHANGE_LOG_RETENTION_DAYS) and raise the
+# pruned watermark, so cursors from before it expire even once the log is empty
+def prune_change_log(s, days: int) -> int:
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    pos = _position(s)
+    through = s.scalar(select(func.max(pos)).where(ChangeLog.changed_at < cutoff))
+    if through is None:
+        return 0
+    mark = s.get(ChangeLogPruned, 1)
+    if mark is None:
+        s.add(ChangeLogPruned(id=1, through=through))
+    else:
+        mark.through = max(mark.through, through)
+    return s.execute(delete(ChangeLog).where(pos <= through)).rowcount
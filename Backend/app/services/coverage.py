@@ -0,0 +1,78 @@
+# Vaccination coverage rollup - one grouped pass over patients, vaccinations, case_records and
+# locations, stored in vaccination_coverage so analytics requests never scan the base tables
+from datetime import date, datetime
+from sqlalchemy import select, func, case, and_, delete, insert, text
+from ..extensions import get_engine
+from ..models.models import Patient, Vaccination, CaseRecord, Location, VaccinationCoverage
+
+# Age bands as (label, minimum age), oldest first
+AGE_BANDS = [("60+", 60), ("45-59", 45), ("18-44", 18), ("0-17", 0)]
+# Dose counts above this are grouped together
+MAX_DOSES = 3
+
+
+# The date `years` years before `today` (Feb 29 falls back to Feb 28)
+def _years_before(today: date, years: int) -> date:
+    try:
+        return today.replace(year=today.year - years)
+    except ValueError:
+        return today.replace(year=today.year - years, day=28)
+
+
+# Age band of a dob column as of `today`, as portable date comparisons (no age() function)
+def age_band(dob_col, today: date):
+    return case(
+        *[(dob_col <= _years_before(today, age), label) for label, age in AGE_BANDS[:-1]],
+        else_=AGE_BANDS[-1][0],
+    )
+
+
+# Recompute the rollup. The grouped query runs first; the swap is a delete + insert of at most
+# states x bands x vaccine types x dose counts rows in the caller's transaction, so readers keep
+# seeing the previous rollup until commit.
+def refresh_coverage(s, today: date | None = None) -> int:
+    today = today or date.today()
+    if s.get_bind().dialect.name == "postgresql":
+        # Overlapping refreshes (CLI and worker) would both insert the same keys; the second
+        # waits here until the first commits. Readers are not blocked.
+        s.execute(text("LOCK TABLE public.vaccination_coverage IN EXCLUSIVE MODE"), bind_arguments={"bind": get_engine()})
+    doses = (
+        select(
+            Vaccination.patient_id,
+            func.count().label("n"),
+            # All doses of a patient share one vaccine type (enforced on write)
+            func.min(Vaccination.vaccine_type).label("vaccine_type"),
+        )
+        .group_by(Vaccination.patient_id)
+        .subquery()
+    )
+    # A patient's state is the location state of their latest case record
+    rn = func.row_number().over(
+        partition_by=CaseRecord.patient_id,
+        order_by=(CaseRecord.diag_date.desc(), CaseRecord.created_at.desc()),
+    ).label("rn")
+    latest = (
+        select(CaseRecord.patient_id, Location.state, rn)
+        .join(Location, Location.id == CaseRecord.location_id)
+        .subquery()
+    )
+    state = func.coalesce(latest.c.state, "Unknown").label("state")
+    band = age_band(Patient.dob, today).label("age_band")
+    vaccine = func.coalesce(doses.c.vaccine_type, "none").label("vaccine_type")
+    dose_count = case((doses.c.n >= MAX_DOSES, MAX_DOSES), else_=func.coalesce(doses.c.n, 0)).label("doses")
+    grouped = (
+        select(state, band, vaccine, dose_count, func.count().label("patients"))
+        .select_from(Patient)
+        .outerjoin(doses, doses.c.patient_id == Patient.id)
+        .outerjoin(latest, and_(latest.c.patient_id == Patient.id, latest.c.rn == 1))
+        .group_by(state, band, vaccine, dose_count)
+    )
+    now = datetime.utcnow()
+    rows = [
+        {"state": st, "age_band": ab, "vaccine_type": vt, "doses": int(n), "patients": int(p), "refreshed_at": now}
+        for st, ab, vt, n, p in s.execute(grouped).all()
+    ]
+    s.execute(delete(VaccinationCoverage))
+    if rows:
+        s.execute(insert(VaccinationCoverage), rows)
+    return len(rows)
@@ -0,0 +1,62 @@
+# Prediction dataset storage - the tab-separated state statistics compiled into an
+# uncompressed Arrow IPC file with a per-state row index. The file is memory-mapped, so every
+# worker process reads the same page-cache pages instead of parsing and holding its own copy.
+import json
+import os
+from ..utils import parquet
+from ..utils.parquet import load_pyarrow
+
+# Schema metadata key holding {state: [first row, row count]}
+STATE_INDEX_KEY = b"state_index"
+
+
+# Parse the text dataset and normalize the state column ("region" in the shipped file)
+def read_csv_dataset(path: str):
+    import pandas as pd
+    # Auto-detect delimiter; normalize columns
+    df = pd.read_csv(path, sep=None, engine="python")
+    cols = {c.strip().lower(): c for c in df.columns}
+    if "state" not in cols and "region" in cols:
+        df = df.rename(columns={cols["region"]: "state"})
+    elif "state" not in df.columns:
+        df["state"] = "Unknown"
+    return df
+
+
+# Compile a CSV dataset into an Arrow file at `dest`: rows grouped by state (stable, so each
+# state's rows keep their daily order; dated history is ordered by date), state stored as a
+# dictionary column and the state -> row range index kept in the schema metadata.
+# Returns (rows, states).
+def convert_dataset(src: str, dest: str) -> tuple:
+    if not load_pyarrow():
+        raise RuntimeError("Converting the dataset requires pyarrow")
+    pa = parquet.pa
+    df = read_csv_dataset(src)
+    df["state"] = df["state"].astype(str)
+    keys = ["state", "date"] if "date" in df.columns else ["state"]
+    df = df.sort_values(keys, kind="stable").reset_index(drop=True)
+    index, start = {}, 0
+    for state, n in df.groupby("state", sort=False).size().items():
+        index[state] = [start, int(n)]
+        start += int(n)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.set_column(
+        table.schema.get_field_index("state"), "state", table.column("state").dictionary_encode()
+    )
+    table = table.replace_schema_metadata({STATE_INDEX_KEY: json.dumps(index).encode()})
+    tmp = dest + ".tmp"
+    # Uncompressed IPC, so readers can map the buffers without decoding
+    with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp, dest)
+    return table.num_rows, len(index)
+
+
+# Map an Arrow dataset file; returns (table, {state: (first row, row count)}).
+# The table's buffers point into the mapping, nothing is read until it is touched.
+def open_dataset(path: str) -> tuple:
+    pa = parquet.pa
+    table = pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+    raw = (table.schema.metadata or {}).get(STATE_INDEX_KEY)
+    index = {k: tuple(v) for k, v in json.loads(raw).items()} if raw else {}
+    return table, index
@@ -0,0 +1,173 @@
+# Event bus - pushes metric deltas and new notifications to server-sent event subscribers.
+# On Postgres events travel through LISTEN/NOTIFY so every web process sees every write over
+# one listener connection each; other databases fall back to in-process delivery.
+import json
+import logging
+import os
+import queue
+import select
+import threading
+import time
+from sqlalchemy import event, text
+from ..extensions import LazySession, get_engine
+from .cache import invalidate_on_commit
+
+log = logging.getLogger(__name__)
+
+CHANNEL = "covid_events"
+
+# Local subscribers: one bounded queue per open stream
+_subscribers: set[queue.Queue] = set()
+_sub_lock = threading.Lock()
+_listener_started = False
+
+
+# Queue an event to go out when the session's transaction commits
+def publish(s, evt: dict):
+    if s.get_bind().dialect.name == "postgresql":
+        # pg_notify is transactional: listeners only see it if the write commits
+        s.execute(
+            text("SELECT pg_notify(:channel, :payload)"),
+            {"channel": CHANNEL, "payload": json.dumps(evt, default=str)},
+            bind_arguments={"bind": get_engine()},  # Same primary transaction as the write
+        )
+    else:
+        s.info.setdefault("pending_events", []).append(evt)
+
+
+# Deliver in-process events once their transaction has committed. Inside /api/batch these
+# hooks also fire for each operation's savepoint; the batch keeps or drops the events itself.
+@event.listens_for(LazySession, "after_commit")
+def _flush_pending(session):
+    if session.info.get("batch"):
+        return
+    pending = session.info.pop("pending_events", None)
+    for evt in pending or ():
+        _dispatch(evt)
+
+
+@event.listens_for(LazySession, "after_rollback")
+def _drop_pending(session):
+    if session.info.get("batch"):
+        return
+    session.info.pop("pending_events", None)
+
+
+# Fan an event out to every local subscriber; slow consumers drop events rather than block
+def _dispatch(evt: dict):
+    with _sub_lock:
+        subs = list(_subscribers)
+    for q in subs:
+        try:
+            q.put_nowait(evt)
+        except queue.Full:
+            pass
+
+
+# Single LISTEN connection per process, reconnecting on failure
+def _listen_loop():
+    while True:
+        conn = None
+        try:
+            conn = get_engine().raw_connection()
+            conn.detach()  # Keep this long-lived connection out of the pool
+            dbapi = conn.driver_connection
+            dbapi.autocommit = True
+            with dbapi.cursor() as cur:
+                cur.execute(f"LISTEN {CHANNEL}")
+            for payload in _notifications(dbapi):
+                try:
+                    _dispatch(json.loads(payload))
+                except ValueError:
+                    log.warning("ignoring malformed event payload")
+        except Exception:
+            log.exception("event listener failed; reconnecting")
+            time.sleep(2)
+        finally:
+            if conn is not None:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+
+
+# Payloads received on a LISTENing DBAPI connection, for psycopg2 and psycopg 3
+def _notifications(dbapi):
+    if not hasattr(dbapi, "poll"):
+        # psycopg 3 (DB_PREPARE_THRESHOLD setups): blocking generator
+        for note in dbapi.notifies():
+            yield note.payload
+        return
+    while True:
+        if select.select([dbapi], [], [], 30) == ([], [], []):
+            continue
+        dbapi.poll()
+        while dbapi.notifies:
+            yield dbapi.notifies.pop(0).payload
+
+
+def _ensure_listener():
+    global _listener_started
+    if _listener_started or get_engine().dialect.name != "postgresql":
+        return
+    with _sub_lock:
+        if not _listener_started:
+            threading.Thread(target=_listen_loop, name="event-listener", daemon=True).start()
+            _listener_started = True
+
+
+# A forked worker has none of the parent's threads or streams; let it start its own listener
+def _reset_after_fork():
+    global _listener_started, _sub_lock
+    _listener_started = False
+    _sub_lock = threading.Lock()
+    _subscribers.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+# Register a subscriber queue; the caller must unsubscribe when the stream closes
+def subscribe(maxsize: int = 256) -> queue.Queue:
+    _ensure_listener()
+    q: queue.Queue = queue.Queue(maxsize=maxsize)
+    with _sub_lock:
+        _subscribers.add(q)
+    return q
+
+
+def unsubscribe(q: queue.Queue):
+    with _sub_lock:
+        _subscribers.discard(q)
+
+
+# Event helpers used by the write paths
+
+# Metric counter changes, e.g. {"active": -1, "recovered": 1}; refresh=True asks streams to send a
+# new snapshot. Either drops the shared /api/admin/metrics snapshot on commit. On Postgres the
+# table triggers publish every delta (writes made straight through Supabase included), so only
+# refreshes go out from here.
+def publish_metrics(s, delta: dict | None = None, refresh: bool = False):
+    delta = {k: v for k, v in (delta or {}).items() if v}
+    if not (delta or refresh):
+        return
+    invalidate_on_commit(s, "metrics")
+    if refresh or s.get_bind().dialect.name != "postgresql":
+        publish(s, {"type": "metrics", "delta": delta, "refresh": refresh})
+
+
+# Case status transition as metric deltas (old/new are status strings or None)
+def case_status_delta(old: str | None, new: str | None) -> dict:
+    names = {"active": "active", "recovered": "recovered", "death": "deaths"}
+    delta: dict[str, int] = {}
+    if old in names:
+        delta[names[old]] = delta.get(names[old], 0) - 1
+    if new in names:
+        delta[names[new]] = delta.get(names[new], 0) + 1
+    return delta
+
+
+# New inbox notification for one user
+def publish_notification(s, user_id, notification: dict):
+    publish(s, {"type": "notification", "user_id": str(user_id), "notification": notification})
@@ -0,0 +1,151 @@
+# Notification inbox - reminder rules, batched evaluation and the periodic sweep
+import logging
+from datetime import date, datetime, timedelta
+from sqlalchemy import select, delete, tuple_
+from ..config import Config
+from ..models.models import Patient, Notification
+from ..models.queries import DOSES_BY_PATIENT, LATEST_CASE_BY_PATIENT
+from .events import publish_notification
+
+log = logging.getLogger(__name__)
+
+# Notification types created by reminders_for (and retracted by the sweep once no longer due)
+REMINDER_TYPES = ("vaccination_due", "retest_reminder")
+
+# Named sweep intervals in seconds
+SWEEP_INTERVALS = {"hourly": 3600, "daily": 86400, "weekly": 7 * 86400}
+
+
+# Configured sweep interval in seconds
+def sweep_interval_seconds() -> int:
+    value = str(Config.NOTIFICATION_SWEEP_INTERVAL).strip().lower()
+    return SWEEP_INTERVALS.get(value) or int(value)
+
+
+# Reminder rules for one patient:
+# - exactly one vaccine dose: second dose due 180 days later, remind from 7 days before
+# - latest case still active: retest 15 days after diagnosis, remind from 7 days before
+# Each reminder is "due_soon" until its due date and "overdue" after it.
+def reminders_for(dose_count: int, first_dose: date | None, latest_case: tuple | None, today: date) -> list[dict]:
+    out: list[dict] = []
+    if dose_count == 1 and first_dose:
+        due_date = first_dose + timedelta(days=180)
+        if today >= due_date - timedelta(days=7):
+            status = "overdue" if today > due_date else "due_soon"
+            out.append({
+                "type": "vaccination_due",
+                "title": "Second dose due",
+                "message": f"Your second COVID-19 dose is {status.replace('_',' ')} on {due_date.isoformat()}.",
+                "due_date": due_date,
+                "status": status,
+            })
+    if latest_case and latest_case[1] == "active":
+        retest_date = latest_case[0] + timedelta(days=15)
+        if today >= retest_date - timedelta(days=7):
+            status = "overdue" if today > retest_date else "due_soon"
+            message = (
+                f"Your retest was due on {retest_date.isoformat()} (15 days from diagnosis). Please get tested."
+                if status == "overdue" else
+                f"Please get tested again on {retest_date.isoformat()} (15 days from diagnosis)."
+            )
+            out.append({
+                "type": "retest_reminder",
+                "title": "Retest recommended",
+                "message": message,
+                "due_date": retest_date,
+                "status": status,
+            })
+    return out
+
+
+# Evaluate reminders for a batch of patients with two grouped queries instead of two per patient
+def due_reminders(s, patient_ids: list, today: date) -> dict:
+    doses = {pid: (n, first) for pid, n, first in s.execute(DOSES_BY_PATIENT, {"ids": patient_ids}).all()}
+    # Latest case per patient via a window function
+    latest = {pid: (d, st) for pid, d, st in s.execute(LATEST_CASE_BY_PATIENT, {"ids": patient_ids}).all()}
+    result = {}
+    for pid in patient_ids:
+        n, first = doses.get(pid, (0, None))
+        items = reminders_for(n, first, latest.get(pid), today)
+        if items:
+            result[pid] = items
+    return result
+
+
+# Yield patient ids in keyset-paged batches so memory stays bounded
+def iter_patient_batches(s, batch_size: int):
+    last = None
+    while True:
+        stmt = select(Patient.id).order_by(Patient.id).limit(batch_size)
+        if last is not None:
+            stmt = stmt.where(Patient.id > last)
+        ids = list(s.scalars(stmt))
+        if not ids:
+            return
+        yield ids
+        last = ids[-1]
+
+
+# Inbox key for a reminder; one notification per reminder type, due date and status, so an
+# unread "due soon" reminder is replaced once it becomes overdue
+def dedupe_key(item: dict) -> str:
+    return f"{item['type']}:{item['due_date'].isoformat()}:{item['status']}"
+
+
+# Generate inbox rows for every patient and delete unread reminders that are no longer due
+# (second dose recorded, case closed, due date moved); returns the number of new notifications
+def sweep_notifications(s, today: date | None = None, batch_size: int | None = None) -> int:
+    today = today or date.today()
+    created = retracted = 0
+    for ids in iter_patient_batches(s, batch_size or Config.NOTIFICATION_SWEEP_BATCH):
+        due = due_reminders(s, ids, today)
+        current = {(pid, dedupe_key(item)) for pid, items in due.items() for item in items}
+        existing = set(s.execute(
+            select(Notification.user_id, Notification.dedupe_key, Notification.read_at.is_(None))
+            .where(Notification.user_id.in_(ids), Notification.type.in_(REMINDER_TYPES))
+        ).all())
+        stale = [(pid, key) for pid, key, unread in existing if unread and (pid, key) not in current]
+        if stale:
+            retracted += s.execute(
+                delete(Notification).where(tuple_(Notification.user_id, Notification.dedupe_key).in_(stale))
+            ).rowcount
+        existing = {(pid, key) for pid, key, _ in existing}
+        # One timestamp per batch keeps ?since= cursors consistent for the whole batch
+        now = datetime.utcnow()
+        new_rows: list[Notification] = []
+        for pid, items in due.items():
+            for item in items:
+                key = dedupe_key(item)
+                if (pid, key) in existing:
+                    continue
+                n = Notification(
+                    user_id=pid, type=item["type"], title=item["title"], message=item["message"],
+                    due_date=item["due_date"], dedupe_key=key, created_at=now,
+                )
+                s.add(n)
+                new_rows.append(n)
+                created += 1
+        s.flush()
+        # Push new reminders to any open dashboards once the batch commits
+        for n in new_rows:
+            publish_notification(s, n.user_id, notification_to_dict(n))
+        s.commit()
+        s.expunge_all()
+    if retracted:
+        log.info("notification sweep retracted %d reminders no longer due", retracted)
+    return created
+
+
+# Serialize an inbox row in the shape the dashboards already use
+def notification_to_dict(n: Notification) -> dict:
+    d = {
+        "id": str(n.id),
+        "type": n.type,
+        "title": n.title,
+        "message": n.message,
+        "read": n.read_at is not None,
+        "created_at": n.created_at.isoformat() if n.created_at else None,
+    }
+    if n.due_date:
+        d["retest_date" if n.type == "retest_reminder" else "due_date"] = n.due_date.isoformat()
+    return d
@@ -0,0 +1,253 @@
+# Background jobs - a job table used as the queue, a handler registry and the worker loop
+import logging
+import threading
+import traceback
+from datetime import datetime, timedelta, date
+from sqlalchemy import select, update, or_, and_, text
+from ..config import Config
+from ..extensions import SessionLocal, get_engine
+from ..models.models import Job
+
+log = logging.getLogger(__name__)
+
+# kind -> {"fn": callable(**payload) -> JSON-serializable result, "roles": allowed submitter roles or None for public,
+#          "every": callable returning the schedule interval in seconds, or None for on-demand jobs}
+JOB_HANDLERS: dict[str, dict] = {}
+
+
+# Decorator to register a function as the handler for a job kind
+def job_handler(kind: str, roles: list[str] | None = None, every=None):
+    def decorator(fn):
+        JOB_HANDLERS[kind] = {"fn": fn, "roles": roles, "every": every}
+        return fn
+    return decorator
+
+
+# Insert a queued job; the caller commits
+def enqueue_job(s, kind: str, payload: dict, user_id=None) -> Job:
+    if kind not in JOB_HANDLERS:
+        raise KeyError(f"Unknown job kind '{kind}'")
+    job = Job(kind=kind, status="queued", payload=payload, created_by=user_id, attempts=0)
+    s.add(job)
+    s.flush()
+    return job
+
+
+# Serialize job status for the API (result is fetched separately)
+def job_to_dict(job: Job) -> dict:
+    return {
+        "id": str(job.id),
+        "kind": job.kind,
+        "status": job.status,
+        "attempts": job.attempts,
+        "error": job.error,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
+
+
+# Claim the oldest runnable job. Postgres skips rows locked by other workers (SKIP LOCKED);
+# the guarded UPDATE keeps claims exclusive on databases without row locks (SQLite).
+def claim_next_job(s):
+    now = datetime.utcnow()
+    stale = now - timedelta(seconds=Config.JOB_STALE_SECONDS)
+    runnable = or_(
+        Job.status == "queued",
+        and_(Job.status == "running", Job.started_at < stale, Job.attempts < Config.JOB_MAX_ATTEMPTS),
+    )
+    row = s.execute(
+        select(Job.id, Job.status, Job.attempts).where(runnable)
+        .order_by(Job.created_at).limit(1).with_for_update(skip_locked=True)
+    ).first()
+    if row is None:
+        s.rollback()
+        return None
+    claimed = s.execute(
+        update(Job)
+        .where(Job.id == row.id, Job.status == row.status, Job.attempts == row.attempts)
+        .values(status="running", started_at=now, attempts=row.attempts + 1)
+    ).rowcount
+    s.commit()
+    return row.id if claimed == 1 else None
+
+
+# Fail running jobs whose worker went away on their last allowed attempt; claim_next_job
+# no longer picks them up, so they would otherwise stay "running" for good
+def fail_abandoned_jobs(s) -> int:
+    now = datetime.utcnow()
+    stale = now - timedelta(seconds=Config.JOB_STALE_SECONDS)
+    n = s.execute(
+        update(Job)
+        .where(Job.status == "running", Job.started_at < stale, Job.attempts >= Config.JOB_MAX_ATTEMPTS)
+        .values(status="failed", finished_at=now, error=f"Abandoned by its worker after {Config.JOB_MAX_ATTEMPTS} attempts")
+    ).rowcount
+    s.commit()
+    if n:
+        log.warning("marked %d abandoned job(s) failed", n)
+    return n
+
+
+# Execute one claimed job and store its result or error. No session is held while the
+# handler runs, so handlers are free to open their own.
+def run_job(job_id):
+    with SessionLocal() as s:
+        job = s.get(Job, job_id)
+        kind, payload = job.kind, dict(job.payload or {})
+    values = {"status": "done", "error": None}
+    try:
+        handler = JOB_HANDLERS.get(kind)
+        if handler is None:
+            raise KeyError(f"Unknown job kind '{kind}'")
+        values["result"] = handler["fn"](**payload)
+    except Exception as ex:
+        log.warning("job %s (%s) failed: %s", job_id, kind, traceback.format_exc())
+        values = {"status": "failed", "error": str(ex)}
+    values["finished_at"] = datetime.utcnow()
+    with SessionLocal() as s:
+        s.execute(update(Job).where(Job.id == job_id).values(**values))
+        s.commit()
+
+
+# One worker thread: claim, run, and sleep when the queue is empty
+def _worker_loop(stop: threading.Event, poll_seconds: float):
+    while not stop.is_set():
+        try:
+            with SessionLocal() as s:
+                job_id = claim_next_job(s)
+            if job_id is None:
+                stop.wait(poll_seconds)
+                continue
+            run_job(job_id)
+        except Exception:
+            log.exception("worker loop error")
+            stop.wait(poll_seconds)
+        finally:
+            SessionLocal.remove()
+
+
+# Queue scheduled jobs that have not run within their interval. The check reads the jobs table
+# on the primary; on Postgres a per-kind transaction lock held until the commit makes check and
+# insert atomic across worker processes.
+def enqueue_due_scheduled_jobs(s):
+    now = datetime.utcnow()
+    postgres = get_engine().dialect.name == "postgresql"
+    for kind, handler in JOB_HANDLERS.items():
+        if not handler["every"]:
+            continue
+        if postgres:
+            s.execute(text("SELECT pg_advisory_xact_lock(hashtext(:kind))"), {"kind": kind}, bind_arguments={"bind": get_engine()})
+        since = now - timedelta(seconds=handler["every"]())
+        recent = s.scalar(
+            select(Job.id).where(Job.kind == kind, Job.created_at > since, Job.status != "failed").limit(1),
+            bind_arguments={"bind": get_engine()},
+        )
+        if recent is None:
+            enqueue_job(s, kind, {})
+            log.info("scheduled job %s queued", kind)
+    s.commit()
+
+
+# Scheduler thread: fails abandoned jobs and checks scheduled jobs once a minute
+def _scheduler_loop(stop: threading.Event):
+    while not stop.is_set():
+        try:
+            with SessionLocal() as s:
+                fail_abandoned_jobs(s)
+                enqueue_due_scheduled_jobs(s)
+        except Exception:
+            log.exception("scheduler error")
+        finally:
+            SessionLocal.remove()
+        stop.wait(60)
+
+
+# Run a pool of worker threads (plus the scheduler) until interrupted
+def run_workers(concurrency: int, poll_seconds: float, schedule: bool = True):
+    stop = threading.Event()
+    threads = [
+        threading.Thread(target=_worker_loop, args=(stop, poll_seconds), name=f"job-worker-{i}", daemon=True)
+        for i in range(max(1, concurrency))
+    ]
+    if schedule:
+        threads.append(threading.Thread(target=_scheduler_loop, args=(stop,), name="job-scheduler", daemon=True))
+    for t in threads:
+        t.start()
+    try:
+        while any(t.is_alive() for t in threads):
+            for t in threads:
+                t.join(timeout=1)
+    except KeyboardInterrupt:
+        stop.set()
+        for t in threads:
+            t.join()
+
+
+# Built-in job kinds
+
+# ARIMA forecast for one state (public, like the synchronous endpoint)
+@job_handler("forecast")
+def _forecast_job(state: str, days: int = 14):
+    from .predict import compute_forecast
+    return compute_forecast(state, int(days))
+
+
+# Full due-notification scan over all patients
+@job_handler("due_notifications", roles=["admin"])
+def _due_notifications_job():
+    from ..blueprints.notifications import compute_due_items
+    with SessionLocal() as s:
+        return {"items": compute_due_items(s, date.today())}
+
+
+# Recompute state_daily_stats from case_records
+@job_handler("rebuild_state_stats", roles=["admin"])
+def _rebuild_state_stats_job():
+    from .state_stats import rebuild_state_daily_stats
+    with SessionLocal() as s:
+        n = rebuild_state_daily_stats(s)
+        s.commit()
+        return {"rows": n}
+
+
+# Periodic inbox sweep (interval from NOTIFICATION_SWEEP_INTERVAL, daily by default)
+def _sweep_interval():
+    from .inbox import sweep_interval_seconds
+    return sweep_interval_seconds()
+
+
+@job_handler("notification_sweep", roles=["admin"], every=_sweep_interval)
+def _notification_sweep_job():
+    from .inbox import sweep_notifications
+    with SessionLocal() as s:
+        return {"created": sweep_notifications(s)}
+
+
+# Daily partition maintenance: keep monthly partitions created ahead of incoming rows
+@job_handler("ensure_partitions", roles=["admin"], every=lambda: 86400)
+def _ensure_partitions_job(months_ahead: int | None = None):
+    from .partitions import ensure_partitions
+    with SessionLocal() as s:
+        created = ensure_partitions(s, months_ahead)
+        s.commit()
+        return {"created": created}
+
+
+# Periodic coverage rollup refresh (COVERAGE_REFRESH_SECONDS, hourly by default)
+@job_handler("refresh_coverage", roles=["admin"], every=lambda: Config.COVERAGE_REFRESH_SECONDS)
+def _refresh_coverage_job():
+    from .coverage import refresh_coverage
+    with SessionLocal() as s:
+        n = refresh_coverage(s)
+        s.commit()
+        return {"rows": n}
+
+
+# Daily change-log pruning (entries older than CHANGE_LOG_RETENTION_DAYS)
+@job_handler("prune_change_log", roles=["admin"], every=lambda: 86400)
+def _prune_change_log_job():
+    from .changes import prune_change_log
+    with SessionLocal() as s:
+        n = prune_change_log(s, Config.CHANGE_LOG_RETENTION_DAYS)
+        s.commit()
+        return {"deleted": n}
@@ -0,0 +1,174 @@
+# Time partitioning - monthly range partitions for case_records and vaccinations on Postgres,
+# and cold archival of old months to compressed Parquet files that exports can still read
+import os
+import re
+from datetime import date
+from sqlalchemy import select, func, text, delete
+from ..config import Config
+from ..extensions import get_engine
+from ..models.models import CaseRecord, Vaccination
+from ..utils import parquet
+from ..utils.parquet import load_pyarrow, parquet_schema, batch_table
+from .events import publish_metrics
+
+# Partitioned tables: table name -> (model, partition key column)
+PARTITIONED_TABLES = {
+    "case_records": (CaseRecord, "diag_date"),
+    "vaccinations": (Vaccination, "date"),
+}
+
+# Archive files are named <YYYY-MM>.parquet (or <YYYY-MM>.<n>.parquet for later batches)
+_ARCHIVE_FILE = re.compile(r"^(\d{4})-(\d{2})(?:\.\d+)?\.parquet$")
+
+
+def month_start(d: date) -> date:
+    return d.replace(day=1)
+
+
+def add_months(d: date, n: int) -> date:
+    years, month = divmod(d.month - 1 + n, 12)
+    return date(d.year + years, month + 1, 1)
+
+
+# Postgres partition name for a month, e.g. case_records_p202401
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month:%Y%m}"
+
+
+def _is_postgres(s) -> bool:
+    return s.get_bind().dialect.name == "postgresql"
+
+
+# Create the monthly partitions for the current month and the next `months_ahead` months,
+# plus a partition for any month that has rows sitting in the DEFAULT partition (those rows
+# are moved into it). Returns the names of newly created partitions; no-op off Postgres.
+def ensure_partitions(s, months_ahead: int | None = None) -> list[str]:
+    if not _is_postgres(s):
+        return []
+    ahead = Config.PARTITION_MONTHS_AHEAD if months_ahead is None else months_ahead
+    this_month = month_start(date.today())
+    created = []
+    for table, (_, key) in PARTITIONED_TABLES.items():
+        months = {add_months(this_month, i) for i in range(ahead + 1)}
+        months |= set(s.scalars(text(f"SELECT DISTINCT date_trunc('month', {key})::date FROM {table}_default")))
+        for month in sorted(months):
+            if s.scalar(
+                text("SELECT public.ensure_month_partition(:table, :key, :month)"),
+                {"table": table, "key": key, "month": month},
+                bind_arguments={"bind": get_engine()},
+            ):
+                created.append(partition_name(table, month))
+    return created
+
+
+def archive_dir(table: str) -> str:
+    return os.path.join(Config.ARCHIVE_DIR, table)
+
+
+# Archived Parquet files of a table as (month, path), oldest first, optionally limited to
+# months that overlap [date_from, date_to]
+def archived_files(table: str, date_from: date | None = None, date_to: date | None = None) -> list[tuple]:
+    folder = archive_dir(table)
+    if not os.path.isdir(folder):
+        return []
+    files = []
+    for name in sorted(os.listdir(folder)):
+        m = _ARCHIVE_FILE.match(name)
+        if not m:
+            continue
+        month = date(int(m.group(1)), int(m.group(2)), 1)
+        if date_from and add_months(month, 1) <= date_from:
+            continue
+        if date_to and month > date_to:
+            continue
+        files.append((month, os.path.join(folder, name)))
+    return files
+
+
+# First day after the newest archived month; live rows (and rebuildable counters) start here
+def archived_before(table: str) -> date | None:
+    files = archived_files(table)
+    return add_months(files[-1][0], 1) if files else None
+
+
+# Stream one month of rows into a zstd-compressed Parquet file next to its final name;
+# returns (temporary path, final path, row count)
+def _write_month(s, table: str, model, key: str, month: date) -> tuple:
+    columns = [c.key for c in model.__table__.columns]
+    schema = parquet_schema(model, columns)
+    col = model.__table__.c[key]
+    stmt = (
+        select(*model.__table__.columns)
+        .where(col >= month, col < add_months(month, 1))
+        .execution_options(yield_per=Config.EXPORT_BATCH_ROWS)
+    )
+    folder = archive_dir(table)
+    os.makedirs(folder, exist_ok=True)
+    path, n = os.path.join(folder, f"{month:%Y-%m}.parquet"), 1
+    while os.path.exists(path):
+        path, n = os.path.join(folder, f"{month:%Y-%m}.{n}.parquet"), n + 1
+    tmp = path + ".tmp"
+    rows = 0
+    writer = parquet.pq.ParquetWriter(tmp, schema, compression="zstd")
+    try:
+        for batch in s.execute(stmt, bind_arguments={"bind": get_engine()}).partitions():
+            writer.write_table(batch_table(batch, columns, schema))
+            rows += len(batch)
+    finally:
+        writer.close()
+    return tmp, path, rows
+
+
+# Move every month older than `before` (default: ARCHIVE_AFTER_MONTHS ago) out of the database:
+# rows are written to Parquet, then the month's partition is detached and dropped (or the rows
+# deleted when the month has no partition of its own). Each month commits separately.
+# Per-state counters are left as they are, so dashboards keep the archived history.
+def archive_partitions(s, before: date | None = None, dry_run: bool = False) -> list[dict]:
+    if not load_pyarrow():
+        raise RuntimeError("Archiving requires pyarrow")
+    cutoff = month_start(before or add_months(date.today(), -Config.ARCHIVE_AFTER_MONTHS))
+    postgres = _is_postgres(s)
+    archived = []
+    for table, (model, key) in PARTITIONED_TABLES.items():
+        col = model.__table__.c[key]
+        oldest = s.scalar(select(func.min(col)).where(col < cutoff))
+        month = month_start(oldest) if oldest else cutoff
+        while month < cutoff:
+            nxt = add_months(month, 1)
+            count = s.scalar(select(func.count()).select_from(model.__table__).where(col >= month, col < nxt))
+            part = partition_name(table, month)
+            has_partition = postgres and s.scalar(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": f"public.{part}"})
+            if count or has_partition:
+                entry = {"table": table, "month": f"{month:%Y-%m}", "rows": count, "file": None}
+                if not dry_run:
+                    tmp, path = None, None
+                    if has_partition:
+                        # Block late writes to the month until it is dropped
+                        s.execute(text(f"LOCK TABLE public.{part} IN SHARE MODE"), bind_arguments={"bind": get_engine()})
+                    if count:
+                        tmp, path, entry["rows"] = _write_month(s, table, model, key, month)
+                        entry["file"] = path
+                    if has_partition:
+                        s.execute(text(f"ALTER TABLE public.{table} DETACH PARTITION public.{part}"), bind_arguments={"bind": get_engine()})
+                        s.execute(text(f"DROP TABLE public.{part}"), bind_arguments={"bind": get_engine()})
+                    else:
+                        if postgres:
+                            # Archived cases stay in the per-state counters, and like a dropped
+                            # partition the deleted rows leave no change-log tombstones
+                            s.execute(text("SELECT set_config('covid.skip_case_counters', 'on', true)"), bind_arguments={"bind": get_engine()})
+                            s.execute(text("SELECT set_config('covid.skip_change_log', 'on', true)"), bind_arguments={"bind": get_engine()})
+                        s.execute(delete(model.__table__).where(col >= month, col < nxt))
+                    # Neither path sends per-row dashboard deltas
+                    publish_metrics(s, refresh=True)
+                    if tmp:
+                        os.replace(tmp, path)
+                    try:
+                        s.commit()
+                    except Exception:
+                        # Keep the database as the only copy if the drop did not commit
+                        if path:
+                            os.remove(path)
+                        raise
+                archived.append(entry)
+            month = nxt
+    return archived
@@ -1,38 +1,114 @@
 # Prediction service - ARIMA-based COVID-19 trend forecasting
-import pandas as pd
-from statsmodels.tsa.arima.model import ARIMA
-import numpy as np
+# pandas, NumPy and statsmodels are imported inside the functions that need them, so
+# importing this module (and booting the app) does not load the scientific stack.
+import logging
+import os
+import threading
+import uuid
 from flask import Blueprint, request, jsonify
 from ..config import Config
+from ..extensions import SessionLocal
+from ..utils.responses import response_format, columns_response, rows_response
+from ..utils.parquet import load_pyarrow
+from ..utils.auth import require_auth
+from .dataset import read_csv_dataset, open_dataset, convert_dataset
+
+log = logging.getLogger(__name__)
 
 # Create blueprint for prediction routes
 bp = Blueprint("predict", __name__, url_prefix="/api/predict")
 
 
+# Loaded prediction dataset, reloaded only when the source file changes
+_dataset = None
+_dataset_key = None
+_dataset_lock = threading.Lock()
+
+
+# Source of the prediction dataset: the compiled Arrow file (`flask convert-dataset`) when it
+# exists, pyarrow is installed and it is not older than the CSV; otherwise the CSV itself
+def dataset_path() -> str:
+    arrow = Config.PREDICT_DATASET_PATH
+    if os.path.exists(arrow) and load_pyarrow():
+        if not os.path.exists(Config.PREDICT_CSV_PATH) or os.path.getmtime(arrow) >= os.path.getmtime(Config.PREDICT_CSV_PATH):
+            return arrow
+    return Config.PREDICT_CSV_PATH
+
+
+# Identity of the current dataset file (path and modification time)
+def dataset_version() -> tuple:
+    path = dataset_path()
+    return path, os.path.getmtime(path)
+
+
+def _load():
+    global _dataset, _dataset_key
+    key = dataset_version()
+    with _dataset_lock:
+        if _dataset_key != key:
+            path = key[0]
+            if path == Config.PREDICT_CSV_PATH:
+                _dataset = (read_csv_dataset(path), None, None)
+            else:
+                table, index = open_dataset(path)
+                # split_blocks keeps numeric columns as views of the mapped buffers
+                _dataset = (table.to_pandas(split_blocks=True), table, index)
+            _dataset_key = key
+        return _dataset
+
+
+# The prediction dataset with a "state" column. Shared between requests: callers must not
+# modify the returned frame in place.
+def load_dataset():
+    return _load()[0]
+
+
+# Rows of one state (case-insensitive); read through the state index when the dataset is the
+# compiled Arrow file. Empty when the state is unknown.
+def state_rows(state: str):
+    df, table, index = _load()
+    if index is None:
+        return df[df["state"].astype(str).str.lower() == state.lower()].copy()
+    match = next((v for k, v in index.items() if k.lower() == state.lower()), None)
+    offset, length = match or (0, 0)
+    # Small per-state copy: the forecast adds columns to it
+    return table.slice(offset, length).to_pandas().copy()
+
+
+# Pre-fork warm-up for the production server (gunicorn.conf.py): compile the Arrow file when it
+# is missing or older than the CSV so every worker maps the same copy, then load the dataset and
+# the default Rt estimates once in the parent; forked workers inherit them.
+def warm_up():
+    from .rt import rt_estimates
+    if load_pyarrow() and dataset_path() == Config.PREDICT_CSV_PATH and os.path.exists(Config.PREDICT_CSV_PATH):
+        try:
+            convert_dataset(Config.PREDICT_CSV_PATH, Config.PREDICT_DATASET_PATH)
+        except OSError as ex:
+            log.warning("could not write %s (%s); workers will parse the CSV", Config.PREDICT_DATASET_PATH, ex)
+    load_dataset()
+    try:
+        rt_estimates()
+    except ValueError as ex:
+        log.warning("Rt estimates not preloaded: %s", ex)
+
+
 # List all available states in the dataset
 @bp.get("/states")
 def list_states():
-    # Auto-detect delimiter; normalize columns
-    df = pd.read_csv(Config.PREDICT_CSV_PATH, sep=None, engine="python")
-    cols = {c.strip().lower(): c for c in df.columns}
-    if "state" not in cols and "region" in cols:
-        df = df.rename(columns={cols["region"]: "state"})
-    elif "state" not in df.columns:
-        df["state"] = "Unknown"
+    df = load_dataset()
     states = sorted(set(df["state"].dropna().astype(str)))
     return jsonify({"states": states})
 
-# Generate ARIMA forecast for a specific state
-@bp.get("/state/<state>")
-def forecast_state(state: str):
-    horizon = int(request.args.get("days", 14))
-    df = pd.read_csv(Config.PREDICT_CSV_PATH, sep=None, engine="python")
+# Fit ARIMA forecasts for a state; usable from requests and background jobs.
+# Raises LookupError for unknown states and ValueError when nothing can be fitted.
+def compute_forecast(state: str, horizon: int) -> dict:
+    import numpy as np
+    import pandas as pd
+    from statsmodels.tsa.arima.model import ARIMA
+    df = state_rows(state)
     cols = {c.strip().lower(): c for c in df.columns}
-    if "state" not in cols and "region" in cols:
-        df = df.rename(columns={cols["region"]: "state"})
-    df = df[df["state"].astype(str).str.lower() == state.lower()].copy()
     if df.empty:
-        return jsonify({"error":"State not found in dataset"}), 404
+        raise LookupError("State not found in dataset")
     # If date exists, aggregate duplicates by (state,date); else synthesize time index per state
     if "date" in df.columns:
         df['date'] = pd.to_datetime(df['date'], errors='coerce')
@@ -73,6 +149,8 @@ def forecast_state(state: str):
     analysis_lines: list[str] = []
     last_date = df['date'].max()
     dates = pd.date_range(last_date + pd.Timedelta(days=1), periods=horizon, freq='D')
+    # ISO dates are formatted once and shared by every series
+    date_strs = [d.date().isoformat() for d in dates]
 
     for label, col in series_map.items():
         if not col:
@@ -100,8 +178,8 @@ def forecast_state(state: str):
                 fit = model.fit()
                 series_fc = fit.forecast(steps=horizon)
 
-            # Format forecast results as date-value pairs
-            results[label] = [{"date": d.date().isoformat(), label: float(v)} for d, v in zip(dates, series_fc)]
+            # Keep plain values; the response shape is chosen once all series are fitted
+            results[label] = [float(v) for v in series_fc]
 
             # Calculate detailed statistics for analysis
             recent = s.tail(min(14, len(s)))
@@ -133,11 +211,87 @@ def forecast_state(state: str):
             continue
 
     if not results:
-        return jsonify({"error":"No valid series to forecast"}), 400
+        raise ValueError("No valid series to forecast")
+
+    return {"state": state, "horizon": horizon, "dates": date_strs, "series": results, "analysis": " ".join(analysis_lines)}
 
+
+# Render a computed forecast in the negotiated wire format
+def forecast_response(fc: dict):
+    fmt = response_format()
+    # Columnar formats send the shared dates once plus one value array per series
+    if fmt == "columnar":
+        return jsonify(fc)
+    if fmt in ("arrow", "msgpack"):
+        return columns_response(fmt, {"date": fc["dates"], **fc["series"]}, {"state": fc["state"], "horizon": fc["horizon"], "analysis": fc["analysis"]})
+    # Default format: date-value pairs per series
     return jsonify({
-        "state": state,
-        "horizon": horizon,
-        "series": results,
-        "analysis": " ".join(analysis_lines)
+        "state": fc["state"],
+        "horizon": fc["horizon"],
+        "series": {label: [{"date": d, label: v} for d, v in zip(fc["dates"], vals)] for label, vals in fc["series"].items()},
+        "analysis": fc["analysis"]
     })
+
+
+# Generate ARIMA forecast for a specific state
+@bp.get("/state/<state>")
+def forecast_state(state: str):
+    horizon = int(request.args.get("days", 14))
+    # ?async=1 queues the fit for `flask worker` and returns 202 with the job id
+    if request.args.get("async") in ("1", "true"):
+        return _queue_forecast(state, horizon)
+    try:
+        fc = compute_forecast(state, horizon)
+    except LookupError as ex:
+        return jsonify({"error": str(ex)}), 404
+    except ValueError as ex:
+        return jsonify({"error": str(ex)}), 400
+    return forecast_response(fc)
+
+
+# Queue a forecast job. Jobs are only visible to their submitter (and admins), so queueing
+# one needs a login even though synchronous forecasts are public.
+@require_auth()
+def _queue_forecast(state: str, horizon: int):
+    from ..blueprints.jobs import accepted
+    with SessionLocal() as s:
+        return accepted(s, "forecast", {"state": state, "days": horizon}, uuid.UUID(request.user["sub"]))
+
+
+# Rt, growth rate and doubling time per state from the vectorized estimator in rt.py.
+# ?state= limits the states (comma-separated), ?days= returns that many most recent days
+# per state (default 1) and ?window= sets the estimation window in days (default 7).
+@bp.get("/rt")
+def reproduction_number():
+    import numpy as np
+    from .rt import rt_estimates
+    try:
+        days = max(1, int(request.args.get("days", 1)))
+        window = max(2, min(int(request.args.get("window", 7)), 28))
+    except ValueError:
+        return jsonify({"error": "days and window must be numbers"}), 400
+    try:
+        est = rt_estimates(window)
+    except ValueError as ex:
+        return jsonify({"error": str(ex)}), 400
+    states = est["states"]
+    rows = np.arange(len(states))
+    if request.args.get("state"):
+        wanted = {x.strip().lower() for x in request.args["state"].split(",")}
+        rows = np.array([i for i, st in enumerate(states) if st.lower() in wanted], dtype=int)
+        if not len(rows):
+            return jsonify({"error": "State not found in dataset"}), 404
+    cols = slice(-days, None)
+    n_days = len(est["dates"][cols])
+    metrics = ("rt", "rt_lower", "rt_upper", "growth_rate", "doubling_time")
+    # Flatten the selected block row-major: one output row per (state, day)
+    data = {
+        "state": [states[i] for i in rows for _ in range(n_days)],
+        "date": [d.isoformat() for d in est["dates"][cols]] * len(rows),
+    }
+    for m in metrics:
+        block = np.round(est[m][rows, cols], 4).ravel()
+        data[m] = [None if np.isnan(v) else float(v) for v in block]
+    columns = ["state", "date", *metrics]
+    items = [dict(zip(columns, vals)) for vals in zip(*(data[c] for c in columns))]
+    return rows_response(items, columns)
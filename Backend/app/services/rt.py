@@ -0,0 +1,133 @@
+# Effective reproduction number (Rt) and growth rates for every state at once.
+# Daily incidence is laid out as a states x days matrix, so the serial-interval convolution,
+# the rolling sums and the log-linear growth fit each run as a single NumPy operation.
+import math
+import threading
+from collections import OrderedDict
+from datetime import date, timedelta
+
+# Serial interval of SARS-CoV-2 (gamma distribution, days) and its truncation
+SERIAL_INTERVAL_MEAN = 4.7
+SERIAL_INTERVAL_SD = 2.9
+SERIAL_INTERVAL_DAYS = 20
+# Gamma prior on Rt (shape, scale) as in Cori et al.
+PRIOR_SHAPE = 1.0
+PRIOR_SCALE = 5.0
+# Lower/upper quantiles reported for Rt
+CREDIBLE_INTERVAL = (0.025, 0.975)
+
+# Estimates per (dataset version, window), least recently used first. Entries for an old CSV
+# version are never hit again and age out.
+RT_CACHE_SIZE = 8
+_cache: OrderedDict = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+# Discretized serial interval weights w[s-1] for s = 1..SERIAL_INTERVAL_DAYS (sums to 1)
+def serial_interval_weights():
+    import numpy as np
+    from scipy.stats import gamma
+    shape = (SERIAL_INTERVAL_MEAN / SERIAL_INTERVAL_SD) ** 2
+    scale = SERIAL_INTERVAL_SD ** 2 / SERIAL_INTERVAL_MEAN
+    cdf = gamma.cdf(np.arange(SERIAL_INTERVAL_DAYS + 1), shape, scale=scale)
+    w = np.diff(cdf)
+    return w / w.sum()
+
+
+# Sum of each trailing `window` days along axis 1 (first window-1 days are partial)
+def _rolling_sum(m, window: int):
+    import numpy as np
+    c = np.cumsum(m, axis=1)
+    out = c.copy()
+    out[:, window:] = c[:, window:] - c[:, :-window]
+    return out
+
+
+# States x days matrix of new cases from the prediction dataset.
+# Returns (states, dates, incidence); cumulative confirmed counts are differenced and
+# negative corrections clipped to zero.
+def incidence_matrix(df):
+    import numpy as np
+    import pandas as pd
+    lower = {c.strip().lower(): c for c in df.columns}
+    col = next((lower[k] for k in ("confirmed", "totalinfected") if k in lower), None)
+    if col is None:
+        raise ValueError("Dataset has no confirmed/totalInfected column")
+    data = pd.DataFrame({"state": df["state"].astype(str), "value": pd.to_numeric(df[col], errors="coerce")})
+    if "date" in df.columns:
+        data["day"] = pd.to_datetime(df["date"], errors="coerce").dt.normalize()
+        data = data.dropna(subset=["day"])
+    else:
+        # Rows are consecutive daily snapshots per state; the last row is today
+        data["day"] = data.groupby("state").cumcount()
+    wide = data.pivot_table(index="state", columns="day", values="value", aggfunc="sum").sort_index(axis=1)
+    cumulative = wide.ffill(axis=1).fillna(0.0).to_numpy(dtype=float)
+    incidence = np.diff(cumulative, axis=1, prepend=cumulative[:, :1])
+    np.clip(incidence, 0.0, None, out=incidence)
+    if "date" in df.columns:
+        dates = [d.date() for d in wide.columns]
+    else:
+        today = date.today()
+        n = len(wide.columns)
+        dates = [today - timedelta(days=n - 1 - i) for i in range(n)]
+    return list(wide.index), dates, incidence
+
+
+# Rt (posterior mean and credible interval), growth rate and doubling time for every state
+# and day, estimated over a trailing `window` days (Cori et al. with a gamma prior).
+# Days without enough history or cases are NaN.
+def estimate_rt(incidence, window: int = 7) -> dict:
+    import numpy as np
+    from numpy.lib.stride_tricks import sliding_window_view
+    from scipy.stats import gamma
+    n_states, n_days = incidence.shape
+    w = serial_interval_weights()
+    s_max = len(w)
+    # Total infectiousness: lam[:, t] = sum_s w[s-1] * I[:, t-s], via lagged windows of I
+    padded = np.concatenate([np.zeros((n_states, s_max)), incidence], axis=1)
+    lagged = sliding_window_view(padded[:, :-1], s_max, axis=1)  # [:, t, j] = I[t - s_max + j]
+    lam = lagged @ w[::-1]
+
+    cases = _rolling_sum(incidence, window)
+    pressure = _rolling_sum(lam, window)
+    shape = PRIOR_SHAPE + cases
+    scale = 1.0 / (1.0 / PRIOR_SCALE + pressure)
+    valid = (pressure > 0) & (np.arange(n_days) >= window)
+    rt = np.where(valid, shape * scale, np.nan)
+    lo, hi = CREDIBLE_INTERVAL
+    rt_lower = np.where(valid, gamma.ppf(lo, shape, scale=scale), np.nan)
+    rt_upper = np.where(valid, gamma.ppf(hi, shape, scale=scale), np.nan)
+
+    # Growth rate: least-squares slope of log(1 + incidence) over the trailing window
+    growth = np.full((n_states, n_days), np.nan)
+    if n_days >= window:
+        x = np.arange(window) - (window - 1) / 2
+        windows = sliding_window_view(np.log1p(incidence), window, axis=1)
+        growth[:, window - 1:] = windows @ x / (x @ x)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        doubling = np.where(growth > 0, math.log(2) / growth, np.nan)
+    return {
+        "rt": rt,
+        "rt_lower": rt_lower,
+        "rt_upper": rt_upper,
+        "growth_rate": growth,
+        "doubling_time": doubling,
+    }
+
+
+# Rt estimates for the current prediction dataset, cached per dataset version and window
+def rt_estimates(window: int = 7) -> dict:
+    from .predict import load_dataset, dataset_version
+    key = (dataset_version(), window)
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+    states, dates, incidence = incidence_matrix(load_dataset())
+    result = {"states": states, "dates": dates, **estimate_rt(incidence, window)}
+    with _cache_lock:
+        _cache[key] = result
+        _cache.move_to_end(key)
+        while len(_cache) > RT_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return result
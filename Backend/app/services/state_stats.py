@@ -0,0 +1,130 @@
+# State statistics aggregation - keeps state_daily_stats in step with case_records. On Postgres
+# the triggers in schema.sql do it for every write (the admin screens also write through
+# Supabase), so the per-write functions below only apply on other databases.
+import uuid
+from collections import defaultdict
+from datetime import date
+from sqlalchemy import select, func, case, delete, insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from ..models.models import CaseRecord, Location, StateDailyStat
+from .partitions import archived_before
+
+# Case status -> counter column on state_daily_stats
+STATUS_COLUMNS = {"active": "active", "recovered": "recovered", "death": "deaths"}
+
+
+# True when database triggers maintain the counters
+def _counted_by_db(s) -> bool:
+    return s.get_bind().dialect.name == "postgresql"
+
+
+# Add (or subtract) counts for one state and day in a single atomic upsert
+def _bump(s, state: str, day: date, deltas: dict[str, int]):
+    if not any(deltas.values()):
+        return
+    values = {"state": state, "day": day, "active": 0, "recovered": 0, "deaths": 0, **deltas}
+    dialect = s.get_bind().dialect.name
+    if dialect not in ("postgresql", "sqlite"):
+        # Fallback for other databases: read-modify-write
+        row = s.scalar(select(StateDailyStat).where(StateDailyStat.state == state, StateDailyStat.day == day).with_for_update())
+        if not row:
+            s.add(StateDailyStat(**values))
+        else:
+            for col, d in deltas.items():
+                setattr(row, col, getattr(row, col) + d)
+        return
+    ins = (pg_insert if dialect == "postgresql" else sqlite_insert)(StateDailyStat).values(**values)
+    s.execute(ins.on_conflict_do_update(
+        index_elements=["state", "day"],
+        set_={col: getattr(StateDailyStat, col) + getattr(ins.excluded, col) for col in deltas},
+    ))
+
+
+# Apply grouped (state, day, status, count) rows with a sign: +1 to add, -1 to remove
+def _apply_grouped(s, rows, sign: int):
+    buckets: dict[tuple, dict[str, int]] = defaultdict(lambda: defaultdict(int))
+    for state, day, status, n in rows:
+        col = STATUS_COLUMNS.get(status)
+        if col:
+            buckets[(state, day)][col] += sign * int(n)
+    for (state, day), deltas in buckets.items():
+        _bump(s, state, day, dict(deltas))
+
+
+# (location_id, diag_date, status) of a case row; request payloads may still hold strings
+def case_key(row) -> tuple:
+    loc = row.location_id if isinstance(row.location_id, uuid.UUID) else uuid.UUID(str(row.location_id))
+    day = row.diag_date if isinstance(row.diag_date, date) else date.fromisoformat(str(row.diag_date))
+    return (loc, day, row.status)
+
+
+# Record a single case insert/update/delete. old/new are (location_id, diag_date, status) or None.
+def record_case_change(s, old: tuple | None, new: tuple | None):
+    if old == new or _counted_by_db(s):
+        return
+    loc_ids = {t[0] for t in (old, new) if t}
+    states = dict(s.execute(select(Location.id, Location.state).where(Location.id.in_(loc_ids))).all())
+    rows = []
+    if old and old[0] in states:
+        rows.append((states[old[0]], old[1], old[2], -1))
+    if new and new[0] in states:
+        rows.append((states[new[0]], new[1], new[2], 1))
+    _apply_grouped(s, rows, 1)
+
+
+# Grouped case counts per (state, day, status) for cases matching the given criteria
+def _grouped_cases(s, *criteria):
+    return s.execute(
+        select(Location.state, CaseRecord.diag_date, CaseRecord.status, func.count())
+        .join(Location, Location.id == CaseRecord.location_id)
+        .where(*criteria)
+        .group_by(Location.state, CaseRecord.diag_date, CaseRecord.status)
+    ).all()
+
+
+# Subtract cases that are about to be removed by a cascading delete (patient, location, user)
+def remove_cases(s, *criteria):
+    if _counted_by_db(s):
+        return
+    _apply_grouped(s, _grouped_cases(s, *criteria), -1)
+
+
+# Move a location's cases between states when the location's state changes
+def move_location_cases(s, location_id, old_state: str, new_state: str):
+    if old_state == new_state or _counted_by_db(s):
+        return
+    rows = s.execute(
+        select(CaseRecord.diag_date, CaseRecord.status, func.count())
+        .where(CaseRecord.location_id == location_id)
+        .group_by(CaseRecord.diag_date, CaseRecord.status)
+    ).all()
+    _apply_grouped(s, [(old_state, d, st, n) for d, st, n in rows], -1)
+    _apply_grouped(s, [(new_state, d, st, n) for d, st, n in rows], 1)
+
+
+# Full recomputation from case_records; the grouped result is at most states x days rows.
+# Days whose cases were archived out of the database keep their existing counters.
+def rebuild_state_daily_stats(s) -> int:
+    boundary = archived_before("case_records")
+    clear = delete(StateDailyStat)
+    counts = [
+        func.count(case((CaseRecord.status == status, 1))).label(col)
+        for status, col in STATUS_COLUMNS.items()
+    ]
+    grouped = (
+        select(Location.state, CaseRecord.diag_date, *counts)
+        .join(Location, Location.id == CaseRecord.location_id)
+        .group_by(Location.state, CaseRecord.diag_date)
+    )
+    if boundary:
+        clear = clear.where(StateDailyStat.day >= boundary)
+        grouped = grouped.where(CaseRecord.diag_date >= boundary)
+    s.execute(clear)
+    rows = [
+        {"state": st, "day": d, "active": a, "recovered": r, "deaths": x}
+        for st, d, a, r, x in s.execute(grouped).all()
+    ]
+    if rows:
+        s.execute(insert(StateDailyStat), rows)
+    return len(rows)
@@ -0,0 +1,145 @@
+# Admission control - per-process concurrency limits by endpoint class, so expensive requests
+# (forecasts, report sweeps, exports) cannot occupy every worker thread while login, health
+# checks and plain CRUD wait behind them. Each class admits up to its limit at once and queues
+# a bounded number of requests for up to ADMISSION_WAIT_SECONDS; beyond that it sheds load with
+# 503 and Retry-After. Per-user token buckets (rate limits) are enforced in utils/auth.py.
+import math
+import threading
+import time
+from flask import request, jsonify
+from ..config import Config
+
+# Blueprint -> endpoint class; blueprints not listed are CRUD reads (GET/HEAD) or writes
+BLUEPRINT_CLASSES = {
+    "auth": "auth",
+    "predict": "predict",
+    "export": "reports",
+    "analytics": "reports",
+    "state_stats": "reports",
+    "events": "stream",
+}
+
+# Individual endpoints that differ from their blueprint; None = never limited
+ENDPOINT_CLASSES = {
+    "health": None,
+    "notifications.admin_due_notifications": "reports",
+    "crud.admin_metrics": "reports",
+}
+
+# Defaults per class: (concurrent requests, queued requests) in each worker process.
+# Event streams are long-lived and mostly idle, so they may use every thread except
+# STREAM_RESERVED_THREADS; they never queue (clients back off and poll instead).
+DEFAULT_LIMITS = {
+    "auth": (8, 16),
+    "read": (8, 16),
+    "write": (4, 8),
+    "predict": (1, 2),
+    "reports": (1, 2),
+    "stream": (max(1, Config.SERVER_THREADS - Config.STREAM_RESERVED_THREADS), 0),
+}
+
+
+# Class of the current request, or None when it is not limited
+def endpoint_class(req) -> str | None:
+    if req.endpoint in ENDPOINT_CLASSES:
+        return ENDPOINT_CLASSES[req.endpoint]
+    if req.blueprint in BLUEPRINT_CLASSES:
+        return BLUEPRINT_CLASSES[req.blueprint]
+    return "read" if req.method in ("GET", "HEAD", "OPTIONS") else "write"
+
+
+# Concurrency limit with a bounded wait queue
+class Gate:
+    def __init__(self, limit: int, queue: int):
+        self.limit = limit
+        self.queue = queue
+        self.active = 0
+        self.waiting = 0
+        self._cond = threading.Condition()
+
+    # True once admitted; False when the queue is full or the wait times out
+    def acquire(self, timeout: float) -> bool:
+        with self._cond:
+            if self.active < self.limit:
+                self.active += 1
+                return True
+            if self.waiting >= self.queue:
+                return False
+            self.waiting += 1
+            try:
+                deadline = time.monotonic() + timeout
+                while self.active >= self.limit:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return False
+                    self._cond.wait(remaining)
+                self.active += 1
+                return True
+            finally:
+                self.waiting -= 1
+
+    def release(self):
+        with self._cond:
+            self.active -= 1
+            self._cond.notify()
+
+
+# "predict=2:4,reports=1" -> {"predict": (2, 4), "reports": (1, None)}; None keeps the default
+def parse_limits(spec: str) -> dict:
+    limits = {}
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        name, _, value = part.partition("=")
+        limit, _, queue = value.partition(":")
+        limits[name.strip()] = (int(limit), int(queue) if queue else None)
+    return limits
+
+
+def _build_gates() -> dict:
+    overrides = parse_limits(Config.ADMISSION_LIMITS)
+    gates = {}
+    for name, (limit, queue) in DEFAULT_LIMITS.items():
+        o_limit, o_queue = overrides.get(name, (limit, queue))
+        gates[name] = Gate(o_limit, queue if o_queue is None else o_queue)
+    return gates
+
+
+_gates = _build_gates()
+
+
+# 503 with Retry-After for a saturated class
+def busy_response(name: str):
+    resp = jsonify({"error": "Server busy, please retry", "class": name})
+    resp.status_code = 503
+    resp.headers["Retry-After"] = str(max(1, math.ceil(Config.ADMISSION_RETRY_AFTER_SECONDS)))
+    return resp
+
+
+# before_request hook - wait for a slot in the request's class or shed it
+def admit():
+    # Operations inside /api/batch run in the batch's slot (their user is already set)
+    if getattr(request, "user", None) is not None:
+        return None
+    name = endpoint_class(request)
+    gate = _gates.get(name)
+    if gate is None:
+        return None
+    if not gate.acquire(Config.ADMISSION_WAIT_SECONDS):
+        return busy_response(name)
+    request.admission_gate = gate
+    return None
+
+
+# teardown_request hook - free the slot (responses using stream_with_context hold it until
+# the stream ends)
+def release(exc=None):
+    gate = getattr(request, "admission_gate", None)
+    if gate is not None:
+        request.admission_gate = None
+        gate.release()
+
+
+# Register admission hooks on the app (no-op when ADMISSION_CONTROL is off)
+def init_admission(app):
+    if Config.ADMISSION_CONTROL:
+        app.before_request(admit)
+        app.teardown_request(release)
@@ -1,5 +1,8 @@
 # JWT authentication utilities
 import datetime as dt
+import math
+import threading
+import time
 import uuid
 from functools import wraps
 from flask import request, jsonify
@@ -18,26 +21,61 @@ def generate_jwt(user_id: uuid.UUID, role: str) -> str:
     return jwt.encode(payload, Config.JWT_SECRET, algorithm="HS256")
 
 
-# Decorator to require authentication and optionally check user role
-def require_auth(roles: list[str] | None = None):
+# Per-user token buckets for this process: user id -> (tokens, monotonic time of last refill)
+_buckets: dict[str, tuple[float, float]] = {}
+_bucket_lock = threading.Lock()
+
+
+# Take one token from the user's bucket; returns 0 when allowed, otherwise the seconds until
+# the next token
+def take_token(user_id: str) -> float:
+    rate, burst = Config.RATE_LIMIT_PER_SECOND, Config.RATE_LIMIT_BURST
+    if rate <= 0:
+        return 0.0
+    now = time.monotonic()
+    with _bucket_lock:
+        tokens, last = _buckets.get(user_id, (burst, now))
+        tokens = min(burst, tokens + (now - last) * rate)
+        if tokens < 1:
+            _buckets[user_id] = (tokens, now)
+            return (1 - tokens) / rate
+        _buckets[user_id] = (tokens - 1, now)
+        if len(_buckets) > 10000:
+            # Forget users whose buckets have refilled anyway
+            for k in [k for k, (t, at) in _buckets.items() if t + (now - at) * rate >= burst]:
+                _buckets.pop(k, None)
+    return 0.0
+
+
+# Decorator to require authentication and optionally check user role.
+# allow_query_token accepts ?access_token= for clients that cannot set headers (EventSource).
+def require_auth(roles: list[str] | None = None, allow_query_token: bool = False):
     def decorator(fn):
         @wraps(fn)
         def wrapper(*args, **kwargs):
-            # Extract token from Authorization header
-            auth_header = request.headers.get("Authorization", "")
-            token = auth_header.split(" ")[-1] if auth_header else None
-            if not token:
-                return jsonify({"error": "Missing token"}), 401
-            try:
-                # Decode and verify JWT token
-                data = jwt.decode(token, Config.JWT_SECRET, algorithms=["HS256"])
-                # Check role authorization if roles are specified
-                if roles and data.get("role") not in roles:
-                    return jsonify({"error": "Forbidden"}), 403
+            # Operations run by /api/batch carry the user verified once for the whole batch
+            data = getattr(request, "user", None)
+            if data is None:
+                # Extract token from Authorization header
+                auth_header = request.headers.get("Authorization", "")
+                token = auth_header.split(" ")[-1] if auth_header else None
+                if not token and allow_query_token:
+                    token = request.args.get("access_token")
+                if not token:
+                    return jsonify({"error": "Missing token"}), 401
+                try:
+                    # Decode and verify JWT token
+                    data = jwt.decode(token, Config.JWT_SECRET, algorithms=["HS256"])
+                except Exception as ex:
+                    return jsonify({"error": "Invalid token", "detail": str(ex)}), 401
                 # Attach user data to request for use in route handlers
                 request.user = data
-            except Exception as ex:
-                return jsonify({"error": "Invalid token", "detail": str(ex)}), 401
+                wait = take_token(str(data.get("sub")))
+                if wait:
+                    return jsonify({"error": "Too many requests"}), 429, {"Retry-After": str(math.ceil(wait))}
+            # Check role authorization if roles are specified
+            if roles and data.get("role") not in roles:
+                return jsonify({"error": "Forbidden"}), 403
             return fn(*args, **kwargs)
         return wrapper
     return decorator
@@ -0,0 +1,52 @@
+# Parquet helpers shared by exports and partition archival (pyarrow is optional)
+import enum
+import uuid
+from datetime import date, datetime
+
+# pyarrow modules, imported on first use
+pa = None
+pq = None
+
+
+# Import pyarrow on first use; False when it is not installed
+def load_pyarrow() -> bool:
+    global pa, pq
+    if pq is None:
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            return False
+        pa, pq = pyarrow, pyarrow.parquet
+    return True
+
+
+# Arrow schema derived from the model columns so every row group has identical types
+def parquet_schema(model, columns):
+    fields = []
+    for name in columns:
+        ptype = model.__table__.c[name].type.python_type
+        if ptype is datetime:
+            fields.append((name, pa.timestamp("us", tz="UTC")))
+        elif ptype is date:
+            fields.append((name, pa.date32()))
+        elif ptype is int:
+            fields.append((name, pa.int64()))
+        else:
+            fields.append((name, pa.string()))
+    return pa.schema(fields)
+
+
+# UUIDs and enums are written as their string form
+def parquet_value(v):
+    if isinstance(v, uuid.UUID):
+        return str(v)
+    if isinstance(v, enum.Enum):
+        return v.value
+    return v
+
+
+# One cursor batch of row tuples as an Arrow table with the given schema
+def batch_table(batch, columns, schema):
+    data = {name: [parquet_value(row[i]) for row in batch] for i, name in enumerate(columns)}
+    return pa.table(data, schema=schema)
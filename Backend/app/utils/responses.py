@@ -0,0 +1,167 @@
+# Response helpers - negotiated compression and compact wire formats
+import enum
+import gzip
+import importlib
+import io
+from datetime import date, datetime
+from flask import g, request, jsonify, Response
+from ..config import Config
+
+# Optional encoders - only used when installed and requested by the client
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Heavy optional encoders (pyarrow, msgpack) are imported on first use; None when not installed
+_optional_modules: dict = {}
+
+
+def _optional(module: str):
+    if module not in _optional_modules:
+        try:
+            _optional_modules[module] = importlib.import_module(module)
+        except ImportError:
+            _optional_modules[module] = None
+    return _optional_modules[module]
+
+ARROW_MIMETYPE = "application/vnd.apache.arrow.stream"
+MSGPACK_MIMETYPE = "application/msgpack"
+COLUMNAR_MIMETYPE = "application/vnd.columnar+json"
+
+# Content types that are worth compressing (already compressed formats are skipped)
+COMPRESSIBLE_MIMETYPES = {"application/json", "text/csv", "text/plain", MSGPACK_MIMETYPE, ARROW_MIMETYPE}
+
+
+# Accept header media types -> wire format, in order of preference on equal quality
+_ACCEPT_FORMATS = {
+    ARROW_MIMETYPE: "arrow",
+    MSGPACK_MIMETYPE: "msgpack",
+    "application/x-msgpack": "msgpack",
+    COLUMNAR_MIMETYPE: "columnar",
+    "application/json": "json",
+}
+
+
+# Pick the wire format from ?format= or the Accept header: json, columnar, arrow or msgpack.
+# Binary and columnar formats must be named explicitly; wildcards (*/*, application/*) that
+# browsers and curl send by default always get JSON.
+def response_format() -> str:
+    fmt = (request.args.get("format") or "").lower()
+    if fmt in ("json", "columnar", "arrow", "msgpack"):
+        return fmt
+    # The body now depends on Accept, so caches must key on it (see vary_on_accept)
+    g.vary_accept = True
+    named = [(q, mt) for mt, q in request.accept_mimetypes if mt.lower() in _ACCEPT_FORMATS and q > 0]
+    if not named:
+        return "json"
+    order = list(_ACCEPT_FORMATS)
+    q, mt = max(named, key=lambda item: (item[0], -order.index(item[1].lower())))
+    return _ACCEPT_FORMATS[mt.lower()]
+
+
+# Convert values that binary encoders cannot handle natively (enums, dates) to plain types
+def _plain(v):
+    if isinstance(v, enum.Enum):
+        return v.value
+    if isinstance(v, (date, datetime)):
+        return v.isoformat()
+    return v
+
+
+# Turn a list of row dicts into {column: [values]} keeping the given column order
+def to_columns(items: list[dict], columns: list[str]) -> dict:
+    return {c: [row.get(c) for row in items] for c in columns}
+
+
+# Encode a columnar payload as Arrow IPC or MessagePack; None if the encoder is not installed
+def _encode_binary(fmt: str, columns: dict, meta: dict | None = None):
+    pa = _optional("pyarrow") if fmt == "arrow" else None
+    msgpack = _optional("msgpack") if fmt == "msgpack" else None
+    if pa is not None:
+        table = pa.table({k: [_plain(v) for v in vals] for k, vals in columns.items()})
+        if meta:
+            table = table.replace_schema_metadata({k: str(v) for k, v in meta.items()})
+        sink = io.BytesIO()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return Response(sink.getvalue(), mimetype=ARROW_MIMETYPE)
+    if msgpack is not None:
+        payload = dict(meta or {})
+        payload["data"] = {k: [_plain(v) for v in vals] for k, vals in columns.items()}
+        return Response(msgpack.packb(payload, default=str), mimetype=MSGPACK_MIMETYPE)
+    return None
+
+
+# Serialize a list endpoint result in the negotiated format
+def rows_response(items: list[dict], columns: list[str]):
+    fmt = response_format()
+    if fmt == "json":
+        return jsonify(items)
+    data = to_columns(items, columns)
+    if fmt == "columnar":
+        return jsonify({"columns": columns, "count": len(items), "data": data})
+    encoded = _encode_binary(fmt, data, {"count": len(items)})
+    if encoded is None:
+        return jsonify({"error": f"Format '{fmt}' is not available on this server"}), 406
+    return encoded
+
+
+# Serialize a table that shares one index column (e.g. forecast dates) in a binary format
+def columns_response(fmt: str, columns: dict, meta: dict | None = None):
+    encoded = _encode_binary(fmt, columns, meta)
+    if encoded is None:
+        return jsonify({"error": f"Format '{fmt}' is not available on this server"}), 406
+    return encoded
+
+
+# Pick the best content-coding the client accepts: brotli when installed, then gzip
+def _pick_encoding() -> str | None:
+    encodings = request.accept_encodings
+    if brotli is not None and encodings.quality("br") > 0:
+        return "br"
+    if encodings.quality("gzip") > 0:
+        return "gzip"
+    return None
+
+
+# after_request hook - compress large buffered responses the client can decode
+def compress_response(response: Response) -> Response:
+    if (
+        response.direct_passthrough
+        or response.is_streamed
+        or response.status_code < 200
+        or response.status_code in (204, 304)
+        or "Content-Encoding" in response.headers
+        or response.mimetype not in COMPRESSIBLE_MIMETYPES
+    ):
+        return response
+    response.vary.add("Accept-Encoding")
+    body = response.get_data()
+    if len(body) < Config.COMPRESS_MIN_BYTES:
+        return response
+    encoding = _pick_encoding()
+    if encoding == "br":
+        body = brotli.compress(body, quality=min(Config.COMPRESS_LEVEL, 11))
+    elif encoding == "gzip":
+        body = gzip.compress(body, compresslevel=Config.COMPRESS_LEVEL)
+    else:
+        return response
+    response.set_data(body)
+    response.headers["Content-Encoding"] = encoding
+    return response
+
+
+# after_request hook - mark responses whose format was negotiated from the Accept header
+def vary_on_accept(response: Response) -> Response:
+    if g.get("vary_accept"):
+        response.vary.add("Accept")
+    return response
+
+
+# Register compression and compact JSON on the app
+def init_responses(app):
+    # Never pretty-print API JSON, even when running with debug=True
+    app.json.compact = True
+    app.after_request(compress_response)
+    app.after_request(vary_on_accept)
@@ -0,0 +1,139 @@
+# Write helpers - validate request payloads against model columns and run each
+# INSERT/UPDATE/DELETE as one statement with RETURNING, so a write is a single round trip
+import enum
+import uuid
+from datetime import date, datetime
+from sqlalchemy import select, insert, update, delete
+
+# Columns the server owns; clients may echo them back but never set them
+READ_ONLY_COLUMNS = ("id", "created_at")
+
+
+# Raised for payloads that do not match the model; handlers turn it into a 400
+class PayloadError(ValueError):
+    pass
+
+
+# Writable columns per model, built once per model
+_schemas: dict = {}
+
+
+def _schema(model) -> dict:
+    if model not in _schemas:
+        _schemas[model] = {c.key: c for c in model.__table__.columns}
+    return _schemas[model]
+
+
+# Convert one JSON value to the Python type of a column
+def _coerce(col, value):
+    if value is None:
+        if not col.nullable:
+            raise PayloadError(f"'{col.key}' cannot be null")
+        return None
+    enum_class = getattr(col.type, "enum_class", None)
+    ptype = enum_class or col.type.python_type
+    if isinstance(value, ptype):
+        return value
+    try:
+        if enum_class is not None:
+            return enum_class(value)
+        if ptype in (date, datetime) and not isinstance(value, str):
+            raise TypeError
+        if ptype is date:
+            # A plain date, or a full timestamp whose date part is kept
+            try:
+                return date.fromisoformat(value)
+            except ValueError:
+                return datetime.fromisoformat(value).date()
+        if ptype is datetime:
+            return datetime.fromisoformat(value)
+        if ptype is uuid.UUID:
+            return uuid.UUID(str(value))
+        if ptype is int and isinstance(value, bool):
+            raise TypeError
+        return ptype(value)
+    except (ValueError, TypeError):
+        raise PayloadError(f"Invalid value for '{col.key}'")
+
+
+# Validate a JSON body against a model's columns and return column -> typed value.
+# partial=True for updates (no required fields); read-only columns are dropped unless
+# listed in writable (e.g. patients.id, which mirrors the user id).
+def validate_payload(model, data, partial: bool = False, writable: tuple = ()) -> dict:
+    if not isinstance(data, dict):
+        raise PayloadError("Request body must be a JSON object")
+    schema = _schema(model)
+    unknown = sorted(k for k in data if k not in schema)
+    if unknown:
+        raise PayloadError(f"Unknown field(s): {', '.join(unknown)}")
+    values = {
+        k: _coerce(schema[k], v)
+        for k, v in data.items()
+        if k not in READ_ONLY_COLUMNS or k in writable
+    }
+    if not partial:
+        missing = [
+            c.key for c in schema.values()
+            if c.key not in values and not c.nullable and c.default is None and c.server_default is None
+        ]
+        if missing:
+            raise PayloadError(f"Missing required field(s): {', '.join(missing)}")
+    if partial and not values:
+        raise PayloadError("No fields to update")
+    return values
+
+
+# INSERT ... RETURNING; returns the new row
+def insert_row(s, model, values: dict):
+    table = model.__table__
+    return s.execute(insert(table).values(**values).returning(*table.columns)).one()
+
+
+# UPDATE ... RETURNING by primary key; returns the updated row or None when it does not exist
+def update_row(s, model, pk, values: dict):
+    table = model.__table__
+    return s.execute(update(table).where(table.c.id == pk).values(**values).returning(*table.columns)).one_or_none()
+
+
+# Like update_row, but also returns the named columns as they were before the update, for
+# callers that maintain counters from old values. On Postgres this is still one statement: a
+# self-join in UPDATE ... FROM reads the pre-update snapshot. Other databases see the new row
+# in the join, so they read the old values first.
+def update_row_with_old(s, model, pk, values: dict, old_columns: tuple) -> tuple:
+    table = model.__table__
+    if s.get_bind().dialect.name != "postgresql":
+        old = s.execute(select(*(table.c[c] for c in old_columns)).where(table.c.id == pk)).one_or_none()
+        if old is None:
+            return None, None
+        return update_row(s, model, pk, values), tuple(old)
+    prev = table.alias("old")
+    stmt = (
+        update(table)
+        .where(table.c.id == pk, prev.c.id == table.c.id)
+        .values(**values)
+        .returning(*table.columns, *(prev.c[c].label(f"old_{c}") for c in old_columns))
+    )
+    row = s.execute(stmt).one_or_none()
+    if row is None:
+        return None, None
+    return row, tuple(row._mapping[f"old_{c}"] for c in old_columns)
+
+
+# DELETE ... RETURNING by primary key; returns the deleted row or None when it did not exist
+def delete_row(s, model, pk):
+    table = model.__table__
+    return s.execute(delete(table).where(table.c.id == pk).returning(*table.columns)).one_or_none()
+
+
+# Plain JSON dict for a returned row (UUIDs and enums as strings, password removed)
+def row_to_dict(row) -> dict:
+    d = {}
+    for k, v in row._mapping.items():
+        if k == "password" or k.startswith("old_"):
+            continue
+        if isinstance(v, uuid.UUID):
+            v = str(v)
+        elif isinstance(v, enum.Enum):
+            v = v.value
+        d[k] = v
+    return d
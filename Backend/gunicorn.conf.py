@@ -0,0 +1,24 @@
+# Production server settings - run from Backend/ with:  gunicorn app.app:app
+# (gunicorn reads ./gunicorn.conf.py automatically). The app is imported and the prediction
+# dataset warmed once in the master, then forked into SERVER_WORKERS processes of SERVER_THREADS
+# threads each; database pools and listener threads are reset in every child
+# (see reset_after_fork in app/extensions.py and app/services/events.py).
+from app.config import Config
+
+bind = Config.SERVER_BIND
+workers = Config.SERVER_WORKERS
+# Threads keep long-lived event streams from tying up a whole worker process
+worker_class = "gthread"
+threads = Config.SERVER_THREADS
+preload_app = True
+# Recycle workers now and then so slow leaks in native libraries stay bounded
+max_requests = 5000
+max_requests_jitter = 500
+accesslog = "-"
+
+
+# Runs in the master after the app is loaded and before the first fork
+def on_starting(server):
+    if Config.ENABLE_PREDICT:
+        from app.services.predict import warm_up
+        warm_up()
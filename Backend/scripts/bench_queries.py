@@ -0,0 +1,104 @@
+# Query benchmark - per-call cost of the hot lookups with and without prebuilt statements
+#
+# Usage (from Backend/):  python scripts/bench_queries.py [--runs 5] [--n 2000]
+# Runs against DATABASE_URL (any database with the schema and at least one user, patient and
+# vaccination, e.g. after `flask seed`). Each lookup is timed as an inline select() built per
+# call, the prebuilt statement from app/models/queries.py, a lambda_stmt and, where it applies,
+# Session.get(). On Postgres the planning time of each statement is reported as well; compare
+# it with and without DB_PREPARE_THRESHOLD set.
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import select, lambda_stmt  # noqa: E402
+from app.extensions import SessionLocal, get_engine  # noqa: E402
+from app.models.models import User, Patient, Vaccination  # noqa: E402
+from app.models.queries import USER_BY_EMAIL, PATIENT_BY_ID, FIRST_DOSE_TYPE  # noqa: E402
+
+
+def scenarios(s, email, patient_id):
+    return {
+        "user by email": {
+            "inline select()": lambda: s.scalar(select(User).where(User.email == email)),
+            "prebuilt": lambda: s.scalar(USER_BY_EMAIL, {"email": email}),
+            "lambda_stmt": lambda: s.scalar(lambda_stmt(lambda: select(User).where(User.email == email))),
+        },
+        "patient by id": {
+            "inline select()": lambda: s.scalar(select(Patient).where(Patient.id == patient_id)),
+            "prebuilt": lambda: s.scalar(PATIENT_BY_ID, {"id": patient_id}),
+            "lambda_stmt": lambda: s.scalar(lambda_stmt(lambda: select(Patient).where(Patient.id == patient_id))),
+            # Identity-map lookup first, SELECT on a miss; shown for reference
+            "Session.get": lambda: s.get(Patient, patient_id),
+        },
+        "first dose type": {
+            "inline select()": lambda: s.scalar(
+                select(Vaccination.vaccine_type).where(Vaccination.patient_id == patient_id)
+                .order_by(Vaccination.date.asc()).limit(1)
+            ),
+            "prebuilt": lambda: s.scalar(FIRST_DOSE_TYPE, {"patient_id": patient_id}),
+            "lambda_stmt": lambda: s.scalar(lambda_stmt(
+                lambda: select(Vaccination.vaccine_type).where(Vaccination.patient_id == patient_id)
+                .order_by(Vaccination.date.asc()).limit(1)
+            )),
+        },
+    }
+
+
+# Median microseconds per call over `runs` timed loops of `n` calls
+def measure(fn, runs: int, n: int) -> float:
+    fn()
+    samples = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        for _ in range(n):
+            fn()
+        samples.append((time.perf_counter() - t0) / n * 1e6)
+    return statistics.median(samples)
+
+
+# Planning time in ms reported by EXPLAIN ANALYZE for a prebuilt statement (Postgres only)
+def planning_ms(s, stmt, params: dict) -> float:
+    compiled = stmt.compile(dialect=s.get_bind().dialect)
+    values = {k: str(v) if isinstance(v, uuid.UUID) else v for k, v in compiled.construct_params(params).items()}
+    plan = s.connection().exec_driver_sql(f"EXPLAIN (ANALYZE, FORMAT JSON) {compiled}", values).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Planning Time"]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--n", type=int, default=2000)
+    args = parser.parse_args()
+
+    with SessionLocal() as s:
+        email = s.scalar(select(User.email).limit(1))
+        patient_id = s.scalar(select(Vaccination.patient_id).limit(1)) or s.scalar(select(Patient.id).limit(1))
+        if email is None or patient_id is None:
+            sys.exit("Need at least one user and patient; run `flask seed` first")
+
+        print(f"database: {get_engine().dialect.name}, {args.runs} runs x {args.n} calls")
+        print(f"{'lookup':18} {'variant':16} {'µs/call':>9}")
+        for lookup, variants in scenarios(s, email, patient_id).items():
+            for variant, fn in variants.items():
+                print(f"{lookup:18} {variant:16} {measure(fn, args.runs, args.n):9.1f}")
+
+        if get_engine().dialect.name == "postgresql":
+            print(f"\n{'statement':18} {'planning ms':>12}")
+            for name, stmt, params in (
+                ("user by email", USER_BY_EMAIL, {"email": email}),
+                ("patient by id", PATIENT_BY_ID, {"id": patient_id}),
+                ("first dose type", FIRST_DOSE_TYPE, {"patient_id": patient_id}),
+            ):
+                print(f"{name:18} {planning_ms(s, stmt, params):12.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# Startup benchmark - cold-boot time and peak memory of the app in fresh interpreters
+#
+# Usage (from Backend/):  python scripts/bench_startup.py [--runs 5]
+# Each scenario runs in a new process so nothing is cached between runs. Compare the
+# "boot" rows before/after changes to app imports; "first forecast" shows what the
+# prediction stack costs when it is actually used.
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Code executed in the child; prints elapsed seconds and peak RSS in MB as JSON
+CHILD = r"""
+import json, resource, sys, time
+t0 = time.perf_counter()
+{body}
+elapsed = time.perf_counter() - t0
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+rss_mb = rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+heavy = [m for m in ("pandas", "numpy", "statsmodels", "pyarrow") if m in sys.modules]
+print(json.dumps({{"seconds": elapsed, "rss_mb": rss_mb, "heavy_modules": heavy}}))
+"""
+
+SCENARIOS = {
+    "boot (import app.app)": "import app.app",
+    "boot CLI (import app.cli)": "import app.cli",
+    "boot CRUD-only (ENABLE_PREDICT=0)": "import app.app",
+    "first forecast": (
+        "from app.app import app\n"
+        "app.test_client().get('/api/predict/state/Kerala?days=7')"
+    ),
+}
+
+
+def run(body: str, env: dict) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", CHILD.format(body=body)],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'scenario':40} {'median s':>9} {'max s':>7} {'peak RSS MB':>12}  heavy modules loaded")
+    for name, body in SCENARIOS.items():
+        env = dict(os.environ)
+        if "ENABLE_PREDICT=0" in name:
+            env["ENABLE_PREDICT"] = "0"
+        results = [run(body, env) for _ in range(args.runs)]
+        secs = [r["seconds"] for r in results]
+        rss = max(r["rss_mb"] for r in results)
+        print(f"{name:40} {statistics.median(secs):9.3f} {max(secs):7.3f} {rss:12.1f}  {', '.join(results[-1]['heavy_modules']) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,12 @@
 
 CREATE EXTENSION IF NOT EXISTS pgcrypto;
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+DROP TABLE IF EXISTS public.change_log CASCADE;
+DROP TABLE IF EXISTS public.change_log_pruned CASCADE;
+DROP TABLE IF EXISTS public.notifications CASCADE;
+DROP TABLE IF EXISTS public.jobs CASCADE;
+DROP TABLE IF EXISTS public.vaccination_coverage CASCADE;
+DROP TABLE IF EXISTS public.state_daily_stats CASCADE;
 DROP TABLE IF EXISTS public.vaccinations CASCADE;
 DROP TABLE IF EXISTS public.case_records CASCADE;
 DROP TABLE IF EXISTS public.patients CASCADE;
@@ -57,25 +64,281 @@ CREATE TABLE public.locations (
   created_at TIMESTAMP WITH TIME ZONE DEFAULT now()
 );
 
--- Create case_records table
+-- Create case_records table, range-partitioned by month on diag_date
+-- (the partition key has to be part of the primary key)
 CREATE TABLE public.case_records (
-  id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+  id UUID NOT NULL DEFAULT gen_random_uuid(),
   patient_id UUID NOT NULL REFERENCES public.patients(id) ON DELETE CASCADE,
   location_id UUID NOT NULL REFERENCES public.locations(id) ON DELETE CASCADE,
   diag_date DATE NOT NULL,
   status TEXT NOT NULL CHECK (status IN ('active', 'recovered', 'death')),
-  created_at TIMESTAMP WITH TIME ZONE DEFAULT now()
-);
+  created_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+  PRIMARY KEY (id, diag_date)
+) PARTITION BY RANGE (diag_date);
 
--- Create vaccinations table
+-- Create vaccinations table, range-partitioned by month on date
 CREATE TABLE public.vaccinations (
-  id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+  id UUID NOT NULL DEFAULT gen_random_uuid(),
   patient_id UUID NOT NULL REFERENCES public.patients(id) ON DELETE CASCADE,
   date DATE NOT NULL,
   vaccine_type TEXT NOT NULL CHECK (vaccine_type IN ('covaxin','covishield','sputnik')),
-  created_at TIMESTAMP WITH TIME ZONE DEFAULT now()
+  created_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+  PRIMARY KEY (id, date)
+) PARTITION BY RANGE (date);
+
+-- Rows outside every monthly partition land here until `flask ensure-partitions` moves them
+CREATE TABLE public.case_records_default PARTITION OF public.case_records DEFAULT;
+CREATE TABLE public.vaccinations_default PARTITION OF public.vaccinations DEFAULT;
+
+-- Create (if missing) the monthly partition <parent>_pYYYYMM holding `month`. The partition is
+-- built detached, filled with that month's rows from the DEFAULT partition and then attached,
+-- so it also works when rows for the month already exist. Returns true when it was created.
+CREATE OR REPLACE FUNCTION public.ensure_month_partition(parent TEXT, key TEXT, month DATE)
+RETURNS BOOLEAN
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  lo DATE := date_trunc('month', month)::date;
+  hi DATE := (date_trunc('month', month) + INTERVAL '1 month')::date;
+  part TEXT := format('%s_p%s', parent, to_char(lo, 'YYYYMM'));
+BEGIN
+  IF to_regclass('public.' || part) IS NOT NULL THEN
+    RETURN false;
+  END IF;
+  EXECUTE format('CREATE TABLE public.%I (LIKE public.%I INCLUDING DEFAULTS INCLUDING CONSTRAINTS)', part, parent);
+  -- Moving rows between partitions is not a change clients need to sync or count
+  PERFORM set_config('covid.skip_change_log', 'on', true);
+  PERFORM set_config('covid.skip_case_counters', 'on', true);
+  EXECUTE format(
+    'WITH moved AS (DELETE FROM public.%I WHERE %I >= %L AND %I < %L RETURNING *) INSERT INTO public.%I SELECT * FROM moved',
+    parent || '_default', key, lo, key, hi, part
+  );
+  PERFORM set_config('covid.skip_change_log', 'off', true);
+  PERFORM set_config('covid.skip_case_counters', 'off', true);
+  EXECUTE format('ALTER TABLE public.%I ATTACH PARTITION public.%I FOR VALUES FROM (%L) TO (%L)', parent, part, lo, hi);
+  -- Partitions are only read through the parent; keep them closed to direct API access
+  EXECUTE format('ALTER TABLE public.%I ENABLE ROW LEVEL SECURITY', part);
+  RETURN true;
+END $$;
+
+-- Monthly partitions for the last year and the next three months
+SELECT public.ensure_month_partition(t.parent, t.key, m::date)
+FROM (VALUES ('case_records', 'diag_date'), ('vaccinations', 'date')) AS t(parent, key)
+CROSS JOIN generate_series(
+  date_trunc('month', CURRENT_DATE - INTERVAL '12 months'),
+  date_trunc('month', CURRENT_DATE + INTERVAL '3 months'),
+  INTERVAL '1 month'
+) AS m;
+
+-- Per-state, per-day case counters kept by the triggers below on every case_records write,
+-- whichever client makes it (full recompute: `flask rebuild-state-stats`)
+CREATE TABLE public.state_daily_stats (
+  id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+  state TEXT NOT NULL,
+  day DATE NOT NULL,
+  active INTEGER NOT NULL DEFAULT 0,
+  recovered INTEGER NOT NULL DEFAULT 0,
+  deaths INTEGER NOT NULL DEFAULT 0,
+  CONSTRAINT state_daily_stats_state_day_key UNIQUE (state, day)
+);
+
+-- Vaccination coverage rollup: patients per state, age band, vaccine type and dose count
+-- (doses capped at 3). Rebuilt in one transaction by `flask refresh-coverage` and the worker,
+-- so `/api/analytics/coverage` reads a few hundred rows instead of scanning vaccinations.
+CREATE TABLE public.vaccination_coverage (
+  id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+  state TEXT NOT NULL,
+  age_band TEXT NOT NULL,
+  vaccine_type TEXT NOT NULL,
+  doses INTEGER NOT NULL CHECK (doses BETWEEN 0 AND 3),
+  patients INTEGER NOT NULL DEFAULT 0,
+  refreshed_at TIMESTAMP WITH TIME ZONE NOT NULL,
+  CONSTRAINT vaccination_coverage_dims_key UNIQUE (state, age_band, vaccine_type, doses)
 );
 
+-- Background job queue consumed by `flask worker` (claimed with FOR UPDATE SKIP LOCKED)
+CREATE TABLE public.jobs (
+  id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+  kind TEXT NOT NULL,
+  status TEXT NOT NULL DEFAULT 'queued' CHECK (status IN ('queued','running','done','failed')),
+  payload JSON NOT NULL DEFAULT '{}',
+  result JSON,
+  error TEXT,
+  attempts INTEGER NOT NULL DEFAULT 0,
+  created_by UUID,
+  created_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+  started_at TIMESTAMP WITH TIME ZONE,
+  finished_at TIMESTAMP WITH TIME ZONE
+);
+
+-- Per-user notification inbox filled by the periodic sweep (`flask sweep-notifications` / worker)
+CREATE TABLE public.notifications (
+  id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+  user_id UUID NOT NULL REFERENCES public.users(id) ON DELETE CASCADE,
+  type TEXT NOT NULL,
+  title TEXT NOT NULL,
+  message TEXT NOT NULL,
+  due_date DATE,
+  dedupe_key TEXT NOT NULL,
+  read_at TIMESTAMP WITH TIME ZONE,
+  created_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+  CONSTRAINT notifications_user_dedupe_key UNIQUE (user_id, dedupe_key)
+);
+
+-- Row-level change history of the admin-managed tables for delta sync (`GET /api/changes`).
+-- Filled by the triggers at the end of this file; pruned after CHANGE_LOG_RETENTION_DAYS.
+-- txid (the writing transaction's id) is the sync cursor: a transaction is only served once
+-- every transaction with a smaller id has finished, so a client that has seen transaction N
+-- can never miss an earlier one that commits late.
+CREATE TABLE public.change_log (
+  id BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+  txid BIGINT NOT NULL DEFAULT (pg_current_xact_id()::text::bigint),
+  table_name TEXT NOT NULL,
+  row_id UUID NOT NULL,
+  op TEXT NOT NULL CONSTRAINT change_log_op_check CHECK (op IN ('insert','update','delete')),
+  changed_at TIMESTAMP WITH TIME ZONE DEFAULT now()
+);
+
+-- Cursor position up to which change_log has been pruned (one row); older cursors get 410
+CREATE TABLE public.change_log_pruned (
+  id INTEGER PRIMARY KEY DEFAULT 1 CHECK (id = 1),
+  through BIGINT NOT NULL
+);
+
+-- Append one change-log row. TG_ARGV[0] is the parent table name (on partitions
+-- TG_TABLE_NAME is the partition). Runs as the owner: change_log is closed to clients, but
+-- their direct writes to the logged tables must still be recorded.
+CREATE OR REPLACE FUNCTION public.log_row_change()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  IF current_setting('covid.skip_change_log', true) = 'on' THEN
+    RETURN NULL;
+  END IF;
+  INSERT INTO public.change_log (table_name, row_id, op)
+  VALUES (TG_ARGV[0], CASE WHEN TG_OP = 'DELETE' THEN OLD.id ELSE NEW.id END, lower(TG_OP));
+  RETURN NULL;
+END $$;
+
+-- Add n cases of one status to a state's counters for a day (n < 0 subtracts). Runs as the
+-- owner: clients writing case records directly have no write access to the counters.
+CREATE OR REPLACE FUNCTION public.bump_state_daily_stats(p_state TEXT, p_day DATE, p_status TEXT, n INTEGER)
+RETURNS VOID
+LANGUAGE sql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+  INSERT INTO public.state_daily_stats AS t (state, day, active, recovered, deaths)
+  SELECT p_state, p_day,
+         CASE WHEN p_status = 'active' THEN n ELSE 0 END,
+         CASE WHEN p_status = 'recovered' THEN n ELSE 0 END,
+         CASE WHEN p_status = 'death' THEN n ELSE 0 END
+  WHERE p_state IS NOT NULL
+  ON CONFLICT (state, day) DO UPDATE
+  SET active = t.active + EXCLUDED.active,
+      recovered = t.recovered + EXCLUDED.recovered,
+      deaths = t.deaths + EXCLUDED.deaths;
+$$;
+
+-- case_records trigger: subtract the old row and add the new one. A case whose location is
+-- already gone was subtracted by the location's delete trigger.
+CREATE OR REPLACE FUNCTION public.count_case_change()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  IF current_setting('covid.skip_case_counters', true) = 'on' THEN
+    RETURN NULL;
+  END IF;
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    PERFORM public.bump_state_daily_stats(
+      (SELECT state FROM public.locations WHERE id = OLD.location_id), OLD.diag_date, OLD.status, -1);
+  END IF;
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    PERFORM public.bump_state_daily_stats(
+      (SELECT state FROM public.locations WHERE id = NEW.location_id), NEW.diag_date, NEW.status, 1);
+  END IF;
+  RETURN NULL;
+END $$;
+
+-- locations trigger: move a location's cases to its new state, or subtract them before the
+-- location (and, by cascade, its cases) is deleted
+CREATE OR REPLACE FUNCTION public.count_location_change()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  r RECORD;
+BEGIN
+  IF TG_OP = 'UPDATE' AND OLD.state IS NOT DISTINCT FROM NEW.state THEN
+    RETURN OLD;
+  END IF;
+  FOR r IN
+    SELECT diag_date, status, count(*)::int AS n
+    FROM public.case_records
+    WHERE location_id = OLD.id
+    GROUP BY diag_date, status
+  LOOP
+    PERFORM public.bump_state_daily_stats(OLD.state, r.diag_date, r.status, -r.n);
+    IF TG_OP = 'UPDATE' THEN
+      PERFORM public.bump_state_daily_stats(NEW.state, r.diag_date, r.status, r.n);
+    END IF;
+  END LOOP;
+  RETURN OLD;
+END $$;
+
+-- Live dashboard deltas: notify the event listeners (on commit) of each change to a counted row.
+-- TG_ARGV[0] is the metric for patients/vaccinations, or 'case_records' for status counts.
+-- The row id keeps equal payloads in one transaction from being merged into one, and txid lets a
+-- stream skip changes its snapshot already counted. Bulk moves and archiving skip it.
+CREATE OR REPLACE FUNCTION public.notify_metrics_change()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  delta JSONB := '{}'::jsonb;
+  old_key TEXT;
+  new_key TEXT;
+BEGIN
+  IF current_setting('covid.skip_case_counters', true) = 'on' THEN
+    RETURN NULL;
+  END IF;
+  IF TG_ARGV[0] = 'case_records' THEN
+    IF TG_OP <> 'INSERT' AND OLD.status IN ('active', 'recovered', 'death') THEN
+      old_key := CASE OLD.status WHEN 'death' THEN 'deaths' ELSE OLD.status END;
+    END IF;
+    IF TG_OP <> 'DELETE' AND NEW.status IN ('active', 'recovered', 'death') THEN
+      new_key := CASE NEW.status WHEN 'death' THEN 'deaths' ELSE NEW.status END;
+    END IF;
+    IF old_key IS NOT DISTINCT FROM new_key THEN
+      RETURN NULL;
+    END IF;
+    IF old_key IS NOT NULL THEN
+      delta := jsonb_build_object(old_key, -1);
+    END IF;
+    IF new_key IS NOT NULL THEN
+      delta := delta || jsonb_build_object(new_key, 1);
+    END IF;
+  ELSE
+    delta := jsonb_build_object(TG_ARGV[0], CASE WHEN TG_OP = 'DELETE' THEN -1 ELSE 1 END);
+  END IF;
+  PERFORM pg_notify('covid_events', jsonb_build_object(
+    'type', 'metrics',
+    'delta', delta,
+    'txid', pg_current_xact_id()::text::bigint,
+    'row', CASE WHEN TG_OP = 'DELETE' THEN OLD.id ELSE NEW.id END
+  )::text);
+  RETURN NULL;
+END $$;
 
 -- Enable Row Level Security
 ALTER TABLE public.users ENABLE ROW LEVEL SECURITY;
@@ -83,6 +346,14 @@ ALTER TABLE public.patients ENABLE ROW LEVEL SECURITY;
 ALTER TABLE public.locations ENABLE ROW LEVEL SECURITY;
 ALTER TABLE public.case_records ENABLE ROW LEVEL SECURITY;
 ALTER TABLE public.vaccinations ENABLE ROW LEVEL SECURITY;
+ALTER TABLE public.case_records_default ENABLE ROW LEVEL SECURITY;
+ALTER TABLE public.vaccinations_default ENABLE ROW LEVEL SECURITY;
+ALTER TABLE public.state_daily_stats ENABLE ROW LEVEL SECURITY;
+ALTER TABLE public.vaccination_coverage ENABLE ROW LEVEL SECURITY;
+ALTER TABLE public.jobs ENABLE ROW LEVEL SECURITY;
+ALTER TABLE public.notifications ENABLE ROW LEVEL SECURITY;
+ALTER TABLE public.change_log ENABLE ROW LEVEL SECURITY;
+ALTER TABLE public.change_log_pruned ENABLE ROW LEVEL SECURITY;
 
 -- RLS Policies for users table
 CREATE POLICY "Admins can view all users"
@@ -169,11 +440,33 @@ CREATE POLICY "Admins can delete vaccinations"
   ON public.vaccinations FOR DELETE
   USING (true);
 
+-- RLS Policies for state_daily_stats table (written only by the backend)
+CREATE POLICY "Everyone can view state daily stats"
+  ON public.state_daily_stats FOR SELECT
+  USING (true);
+
+-- RLS Policies for vaccination_coverage table (written only by the backend)
+CREATE POLICY "Everyone can view vaccination coverage"
+  ON public.vaccination_coverage FOR SELECT
+  USING (true);
 
--- Create indexes for better performance
+-- Create indexes for better performance (on partitioned tables these are created per
+-- partition, so each month's index stays small and old months drop out of memory)
 CREATE INDEX idx_case_records_patient ON public.case_records(patient_id);
 CREATE INDEX idx_case_records_location ON public.case_records(location_id);
 CREATE INDEX idx_vaccinations_patient ON public.vaccinations(patient_id);
+CREATE INDEX idx_jobs_status_created ON public.jobs(status, created_at);
+CREATE INDEX idx_notifications_user_created ON public.notifications(user_id, created_at);
+CREATE INDEX idx_change_log_changed_at ON public.change_log(changed_at);
+CREATE INDEX idx_change_log_txid ON public.change_log(txid);
+
+-- Trigram indexes for /api/search (serve both the % similarity operator and ILIKE '%...%')
+CREATE INDEX idx_patients_name_trgm ON public.patients USING gin (name gin_trgm_ops);
+CREATE INDEX idx_patients_contact_trgm ON public.patients USING gin (contact gin_trgm_ops);
+CREATE INDEX idx_users_name_trgm ON public.users USING gin (name gin_trgm_ops);
+CREATE INDEX idx_users_email_trgm ON public.users USING gin (email gin_trgm_ops);
+CREATE INDEX idx_locations_name_trgm ON public.locations USING gin (name gin_trgm_ops);
+CREATE INDEX idx_locations_zip_trgm ON public.locations USING gin (zip gin_trgm_ops);
 
 -- Optional enumeration lookup table for roles (kept in sync with enum)
 CREATE TABLE IF NOT EXISTS public.roles (
@@ -335,4 +628,65 @@ INSERT INTO public.vaccinations (patient_id, date, vaccine_type)
 SELECT id, (CURRENT_DATE - INTERVAL '179 days')::date, 'covishield'
 FROM (
   SELECT id FROM public.patients ORDER BY id ASC LIMIT 3
-) d;
\ No newline at end of file
+) d;
+
+-- Populate per-state daily counters from the seeded case records
+INSERT INTO public.state_daily_stats (state, day, active, recovered, deaths)
+SELECT l.state,
+       c.diag_date,
+       count(*) FILTER (WHERE c.status = 'active'),
+       count(*) FILTER (WHERE c.status = 'recovered'),
+       count(*) FILTER (WHERE c.status = 'death')
+FROM public.case_records c
+JOIN public.locations l ON l.id = c.location_id
+GROUP BY l.state, c.diag_date;
+
+-- Change-log triggers, created after the seed data so the demo rows do not fill the log.
+-- Cascading deletes fire them on the child tables too, so every tombstone is recorded.
+CREATE TRIGGER users_change_log AFTER INSERT OR UPDATE OR DELETE ON public.users
+  FOR EACH ROW EXECUTE FUNCTION public.log_row_change('users');
+CREATE TRIGGER patients_change_log AFTER INSERT OR UPDATE OR DELETE ON public.patients
+  FOR EACH ROW EXECUTE FUNCTION public.log_row_change('patients');
+CREATE TRIGGER locations_change_log AFTER INSERT OR UPDATE OR DELETE ON public.locations
+  FOR EACH ROW EXECUTE FUNCTION public.log_row_change('locations');
+CREATE TRIGGER case_records_change_log AFTER INSERT OR UPDATE OR DELETE ON public.case_records
+  FOR EACH ROW EXECUTE FUNCTION public.log_row_change('case_records');
+CREATE TRIGGER vaccinations_change_log AFTER INSERT OR UPDATE OR DELETE ON public.vaccinations
+  FOR EACH ROW EXECUTE FUNCTION public.log_row_change('vaccinations');
+
+-- Per-state counter triggers, created after the counters were populated from the seed data
+CREATE TRIGGER case_records_state_stats AFTER INSERT OR UPDATE OR DELETE ON public.case_records
+  FOR EACH ROW EXECUTE FUNCTION public.count_case_change();
+CREATE TRIGGER locations_state_stats_update AFTER UPDATE OF state ON public.locations
+  FOR EACH ROW EXECUTE FUNCTION public.count_location_change();
+CREATE TRIGGER locations_state_stats_delete BEFORE DELETE ON public.locations
+  FOR EACH ROW EXECUTE FUNCTION public.count_location_change();
+
+-- Dashboard delta triggers. Cascading deletes fire them too, so no delete needs a refresh.
+CREATE TRIGGER patients_metrics AFTER INSERT OR DELETE ON public.patients
+  FOR EACH ROW EXECUTE FUNCTION public.notify_metrics_change('patients');
+CREATE TRIGGER vaccinations_metrics AFTER INSERT OR DELETE ON public.vaccinations
+  FOR EACH ROW EXECUTE FUNCTION public.notify_metrics_change('vaccinations');
+CREATE TRIGGER case_records_metrics AFTER INSERT OR UPDATE OF status OR DELETE ON public.case_records
+  FOR EACH ROW EXECUTE FUNCTION public.notify_metrics_change('case_records');
+
+-- Migration check: a client role (not the table owner) can still insert, update and delete a
+-- row through the change-log and counter triggers. The probe row is rolled back.
+DO $$
+DECLARE
+  probe UUID;
+BEGIN
+  IF NOT EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'authenticated') THEN
+    RETURN;
+  END IF;
+  BEGIN
+    SET LOCAL ROLE authenticated;
+    INSERT INTO public.locations (name, address, street, zip, state)
+    VALUES ('trigger check', '-', '-', '-', 'Trigger Check') RETURNING id INTO probe;
+    UPDATE public.locations SET state = 'Trigger Check 2' WHERE id = probe;
+    DELETE FROM public.locations WHERE id = probe;
+    RAISE EXCEPTION USING ERRCODE = 'P0001', MESSAGE = 'trigger check passed';
+  EXCEPTION WHEN SQLSTATE 'P0001' THEN
+    NULL;
+  END;
+END $$;
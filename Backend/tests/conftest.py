@@ -0,0 +1,60 @@
+# Test fixtures - the app runs against a throwaway SQLite database. Config is read from the
+# environment at import time, so it is set before anything from `app` is imported.
+import os
+import sys
+import tempfile
+import uuid
+from datetime import date
+
+_tmp = tempfile.mkdtemp(prefix="covid-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp, 'test.db')}"
+os.environ["DATABASE_REPLICA_URLS"] = ""
+os.environ["SHARED_CACHE_DIR"] = os.path.join(_tmp, "cache")
+os.environ["ADMISSION_CONTROL"] = "0"
+os.environ["RATE_LIMIT_PER_SECOND"] = "0"
+os.environ["ENABLE_PREDICT"] = "0"
+os.environ.setdefault("JWT_SECRET", "test-secret-that-is-long-enough-for-hs256")
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest  # noqa: E402
+from app.extensions import Base, SessionLocal, get_engine  # noqa: E402
+from app.models.models import User, Patient, Location  # noqa: E402
+from app.app import app as flask_app  # noqa: E402
+from app.utils.auth import generate_jwt  # noqa: E402
+
+
+# Fresh tables for every test
+@pytest.fixture(autouse=True)
+def db():
+    Base.metadata.drop_all(get_engine())
+    Base.metadata.create_all(get_engine())
+    yield
+    SessionLocal.remove()
+
+
+@pytest.fixture
+def client():
+    return flask_app.test_client()
+
+
+# Authorization header for a new user id with the given role
+@pytest.fixture
+def auth():
+    def headers(role: str = "admin") -> dict:
+        return {"Authorization": f"Bearer {generate_jwt(str(uuid.uuid4()), role)}"}
+    return headers
+
+
+# A patient (with its user row) and a location to hang case records on
+@pytest.fixture
+def patient_and_location():
+    with SessionLocal() as s:
+        user = User(first_name="Asha", last_name="Rao", name="Asha Rao", email="asha@example.com", password="x", role="user")
+        s.add(user)
+        s.flush()
+        s.add(Patient(id=user.id, first_name="Asha", last_name="Rao", name="Asha Rao", contact="9999999999", dob=date(1990, 1, 1)))
+        loc = Location(name="City Hospital", address="1 Main Rd", street="Main Rd", zip="560001", state="Karnataka")
+        s.add(loc)
+        s.commit()
+        return str(user.id), str(loc.id)
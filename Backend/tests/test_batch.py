@@ -0,0 +1,120 @@
+# POST /api/batch - transaction modes, event delivery, per-operation role checks and the
+# request session afterwards
+import queue
+from sqlalchemy import select, func
+from app.blueprints import crud
+from app.extensions import SessionLocal, get_engine
+from app.models.models import Location, CaseRecord
+from app.services.events import subscribe, unsubscribe
+
+
+def _location(name: str) -> dict:
+    return {"name": name, "address": "1 Main Rd", "street": "Main Rd", "zip": "560001", "state": "Karnataka"}
+
+
+def _count(model) -> int:
+    # A new connection, so only committed rows are counted
+    with get_engine().connect() as conn:
+        return conn.scalar(select(func.count()).select_from(model))
+
+
+def _drain(q) -> list:
+    events = []
+    while True:
+        try:
+            events.append(q.get_nowait())
+        except queue.Empty:
+            return events
+
+
+def test_atomic_failure_rolls_back_every_operation(client, auth):
+    resp = client.post("/api/batch", headers=auth(), json={"operations": [
+        {"method": "POST", "path": "/api/locations", "body": _location("A")},
+        {"method": "POST", "path": "/api/locations", "body": {"name": "missing fields"}},
+        {"method": "POST", "path": "/api/locations", "body": _location("C")},
+    ]})
+    body = resp.get_json()
+    assert resp.status_code == 400
+    assert body["committed"] is False
+    assert [r["status"] for r in body["results"]] == [201, 400, None]
+    assert _count(Location) == 0
+
+
+def test_best_effort_keeps_only_successful_operations(client, auth):
+    resp = client.post("/api/batch", headers=auth(), json={"mode": "best_effort", "operations": [
+        {"method": "POST", "path": "/api/locations", "body": _location("A")},
+        {"method": "POST", "path": "/api/locations", "body": {"name": "missing fields"}},
+        {"method": "POST", "path": "/api/locations", "body": _location("C")},
+    ]})
+    body = resp.get_json()
+    assert resp.status_code == 200
+    assert body["committed"] is True
+    assert [r["status"] for r in body["results"]] == [201, 400, 201]
+    with get_engine().connect() as conn:
+        assert sorted(conn.scalars(select(Location.name))) == ["A", "C"]
+
+
+def test_events_of_rolled_back_operations_are_dropped(client, auth, patient_and_location, monkeypatch):
+    patient_id, location_id = patient_and_location
+    # Fail the second case record after its metrics event has been queued
+    row_to_dict = crud.row_to_dict
+
+    def failing_row_to_dict(row):
+        if getattr(row, "status", None) == "death":
+            raise RuntimeError("boom")
+        return row_to_dict(row)
+
+    monkeypatch.setattr(crud, "row_to_dict", failing_row_to_dict)
+    case = {"patient_id": patient_id, "location_id": location_id, "diag_date": "2024-05-01"}
+    q = subscribe()
+    try:
+        resp = client.post("/api/batch", headers=auth(), json={"mode": "best_effort", "operations": [
+            {"method": "POST", "path": "/api/case-records", "body": {**case, "status": "active"}},
+            {"method": "POST", "path": "/api/case-records", "body": {**case, "status": "death"}},
+        ]})
+        assert [r["status"] for r in resp.get_json()["results"]] == [201, 500]
+        events = [e for e in _drain(q) if e.get("type") == "metrics"]
+        assert [e["delta"] for e in events] == [{"active": 1}]
+
+        # An atomic batch that fails sends nothing at all
+        resp = client.post("/api/batch", headers=auth(), json={"operations": [
+            {"method": "POST", "path": "/api/case-records", "body": {**case, "status": "recovered"}},
+            {"method": "POST", "path": "/api/case-records", "body": {**case, "status": "death"}},
+        ]})
+        assert resp.status_code == 400
+        assert _drain(q) == []
+    finally:
+        unsubscribe(q)
+    assert _count(CaseRecord) == 1
+
+
+def test_operations_still_check_their_own_roles(client, auth):
+    # Managers may call /api/batch, but creating a location is admin-only
+    resp = client.post("/api/batch", headers=auth("manager"), json={"mode": "best_effort", "operations": [
+        {"method": "POST", "path": "/api/locations", "body": _location("A")},
+    ]})
+    assert resp.get_json()["results"][0]["status"] == 403
+    assert _count(Location) == 0
+
+    resp = client.post("/api/batch", headers=auth("user"), json={"operations": [
+        {"method": "GET", "path": "/api/users"},
+    ]})
+    assert resp.status_code == 400
+    assert resp.get_json()["results"][0]["status"] == 403
+
+
+def test_session_commits_and_closes_normally_after_a_batch(client, auth):
+    resp = client.post("/api/batch", headers=auth(), json={"operations": [
+        {"method": "POST", "path": "/api/locations", "body": _location("A")},
+    ]})
+    assert resp.status_code == 200
+
+    s = SessionLocal()
+    assert "batch" not in s.info
+    assert s._read_bind is None
+
+    # A standalone write commits for real and an error no longer leaves the session open
+    assert client.post("/api/locations", headers=auth(), json=_location("B")).status_code == 201
+    assert _count(Location) == 2
+    assert client.post("/api/locations", headers=auth(), json={"name": "missing fields"}).status_code == 400
+    assert not SessionLocal().in_transaction()
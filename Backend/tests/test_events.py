@@ -0,0 +1,62 @@
+# GET /api/events/stream - metrics snapshots against deltas that race them
+import json
+from app.blueprints import events as stream_bp
+from app.services.events import subscribe, unsubscribe, _dispatch
+
+
+def _text(frame) -> str:
+    return frame.decode() if isinstance(frame, bytes) else frame
+
+
+def _data(frame) -> dict:
+    return json.loads(_text(frame).split("data: ", 1)[1])
+
+
+def test_snapshot_version_visibility():
+    version = stream_bp._parse_snapshot("100:105:101,103")
+    assert version == (100, 105, {101, 103})
+    assert stream_bp._seen(version, 99)
+    assert stream_bp._seen(version, 102)
+    assert not stream_bp._seen(version, 101)
+    assert not stream_bp._seen(version, 105)
+    assert stream_bp._parse_snapshot("7:7:") == (7, 7, set())
+
+
+def test_delta_queued_while_counting_is_not_double_counted(monkeypatch):
+    compute = stream_bp.compute_metrics
+    calls = []
+
+    def racing_compute(conn):
+        calls.append(1)
+        metrics = compute(conn)
+        if len(calls) == 1:
+            # Committed between subscribe() and the end of the count: maybe counted, maybe not
+            _dispatch({"type": "metrics", "delta": {"patients": 1}})
+            _dispatch({"type": "notification", "user_id": "u", "notification": {"id": 1}})
+        return metrics
+
+    monkeypatch.setattr(stream_bp, "compute_metrics", racing_compute)
+    q = subscribe()
+    try:
+        snapshot, version, held = stream_bp._snapshot(q)
+    finally:
+        unsubscribe(q)
+    assert len(calls) == 2
+    assert version is None
+    assert snapshot["patients"] == 0
+    assert held == [{"type": "notification", "user_id": "u", "notification": {"id": 1}}]
+    assert q.empty()
+
+
+def test_refresh_sends_a_new_snapshot(client, auth, patient_and_location):
+    resp = client.get("/api/events/stream", headers=auth(), buffered=False)
+    frames = iter(resp.response)
+    try:
+        assert _text(next(frames)).startswith("retry:")
+        assert _data(next(frames)) == {"snapshot": {"patients": 1, "vaccinations": 0, "active": 0, "recovered": 0, "deaths": 0}}
+        _dispatch({"type": "metrics", "delta": {"active": 1}, "refresh": False})
+        assert _data(next(frames)) == {"delta": {"active": 1}}
+        _dispatch({"type": "metrics", "delta": {}, "refresh": True})
+        assert _data(next(frames))["snapshot"]["patients"] == 1
+    finally:
+        resp.close()
@@ -0,0 +1,32 @@
+# Job queue - claiming, and jobs whose worker went away
+from datetime import datetime, timedelta
+from app.config import Config
+from app.extensions import SessionLocal
+from app.models.models import Job
+from app.services.jobs import claim_next_job, fail_abandoned_jobs
+
+
+def _running_job(s, attempts: int) -> Job:
+    started = datetime.utcnow() - timedelta(seconds=Config.JOB_STALE_SECONDS + 60)
+    job = Job(kind="forecast", status="running", payload={}, attempts=attempts, started_at=started)
+    s.add(job)
+    s.commit()
+    return job
+
+
+def test_stale_job_is_retried_until_its_last_attempt():
+    with SessionLocal() as s:
+        retry = _running_job(s, Config.JOB_MAX_ATTEMPTS - 1)
+        assert claim_next_job(s) == retry.id
+        assert fail_abandoned_jobs(s) == 0
+
+
+def test_abandoned_job_on_its_last_attempt_is_failed():
+    with SessionLocal() as s:
+        job = _running_job(s, Config.JOB_MAX_ATTEMPTS)
+        assert claim_next_job(s) is None
+        assert fail_abandoned_jobs(s) == 1
+        s.refresh(job)
+        assert job.status == "failed"
+        assert job.finished_at is not None
+        assert "Abandoned" in job.error
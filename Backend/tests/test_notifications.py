@@ -0,0 +1,47 @@
+# GET /api/notifications/me and the reminder sweep
+from datetime import date, datetime, timedelta
+import uuid
+from sqlalchemy import select, update
+from app.extensions import SessionLocal
+from app.models.models import Notification, Vaccination
+from app.services.inbox import sweep_notifications
+
+
+def test_non_numeric_limit_is_rejected(client, auth):
+    resp = client.get("/api/notifications/me?limit=abc", headers=auth("user"))
+    assert resp.status_code == 400
+    assert client.get("/api/notifications/me?limit=5", headers=auth("user")).status_code == 200
+
+
+def _reminders(user_id) -> list[tuple]:
+    with SessionLocal() as s:
+        return sorted(s.execute(
+            select(Notification.dedupe_key, Notification.read_at.is_(None)).where(Notification.user_id == user_id)
+        ).all())
+
+
+def test_unread_due_soon_reminder_becomes_overdue(patient_and_location):
+    patient_id = uuid.UUID(patient_and_location[0])
+    due = date(2024, 7, 1)
+    with SessionLocal() as s:
+        s.add(Vaccination(patient_id=patient_id, date=due - timedelta(days=180), vaccine_type="covishield"))
+        s.commit()
+        assert sweep_notifications(s, today=due - timedelta(days=3)) == 1
+        assert sweep_notifications(s, today=due + timedelta(days=1)) == 1
+    assert _reminders(patient_id) == [("vaccination_due:2024-07-01:overdue", True)]
+
+
+def test_read_due_soon_reminder_is_kept_when_overdue(patient_and_location):
+    patient_id = uuid.UUID(patient_and_location[0])
+    due = date(2024, 7, 1)
+    with SessionLocal() as s:
+        s.add(Vaccination(patient_id=patient_id, date=due - timedelta(days=180), vaccine_type="covishield"))
+        s.commit()
+        sweep_notifications(s, today=due - timedelta(days=3))
+        s.execute(update(Notification).values(read_at=datetime.utcnow()))
+        s.commit()
+        assert sweep_notifications(s, today=due + timedelta(days=1)) == 1
+    assert _reminders(patient_id) == [
+        ("vaccination_due:2024-07-01:due_soon", False),
+        ("vaccination_due:2024-07-01:overdue", True),
+    ]
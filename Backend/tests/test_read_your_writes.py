@@ -0,0 +1,38 @@
+# Read-your-writes window from the X-Last-Write header
+import time
+from flask import request
+from app.app import app as flask_app
+from app.config import Config
+from app.extensions import LAST_WRITE_HEADER, recently_wrote, sign_last_write
+
+
+def _recent(sub: str, header: str | None) -> bool:
+    headers = {LAST_WRITE_HEADER: header} if header is not None else {}
+    with flask_app.test_request_context(headers=headers):
+        request.user = {"sub": sub}
+        return recently_wrote()
+
+
+def test_signed_write_time_is_honoured_only_for_its_user():
+    now = time.time()
+    assert _recent("alice", sign_last_write("alice", now))
+    assert not _recent("bob", sign_last_write("alice", now))
+    assert not _recent("alice", sign_last_write("alice", now - Config.READ_YOUR_WRITES_SECONDS - 1))
+
+
+def test_unsigned_or_tampered_write_time_is_ignored():
+    now = time.time()
+    assert not _recent("alice", f"{now:.3f}")
+    stamp, sig = sign_last_write("alice", now - 3600).rsplit(".", 1)
+    assert not _recent("alice", f"{now:.3f}.{sig}")
+    assert not _recent("alice", "junk")
+    assert not _recent("alice", None)
+
+
+def test_write_response_carries_a_signed_time(client, auth):
+    body = {"name": "A", "address": "1 Main Rd", "street": "Main Rd", "zip": "560001", "state": "Karnataka"}
+    resp = client.post("/api/locations", headers=auth(), json=body)
+    assert resp.status_code == 201
+    stamp, _, sig = resp.headers[LAST_WRITE_HEADER].rpartition(".")
+    assert float(stamp) <= time.time()
+    assert len(sig) == 32
@@ -0,0 +1,12 @@
+# Negotiated response formats
+
+
+def test_negotiated_lists_vary_on_accept(client, auth):
+    resp = client.get("/api/locations", headers={**auth(), "Accept": "application/vnd.columnar+json"})
+    assert resp.status_code == 200
+    assert "columns" in resp.get_json()
+    assert "Accept" in resp.vary
+
+    # ?format= wins over Accept, so the header does not select the body
+    resp = client.get("/api/locations?format=json", headers=auth())
+    assert "Accept" not in resp.vary
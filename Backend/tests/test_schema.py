@@ -0,0 +1,25 @@
+# supabase/migrations/schema.sql - checks that need no Postgres
+import os
+import re
+
+SCHEMA = os.path.join(os.path.dirname(__file__), "..", "supabase", "migrations", "schema.sql")
+
+
+def _functions() -> dict:
+    with open(SCHEMA) as f:
+        sql = f.read()
+    # Name -> header between the signature and the body
+    return {
+        m.group(1): m.group(2)
+        for m in re.finditer(r"CREATE OR REPLACE FUNCTION public\.(\w+)\(.*?\)(.*?)AS \$\$", sql, re.S)
+    }
+
+
+def test_trigger_functions_run_as_owner():
+    # Clients write the tables directly, but change_log and state_daily_stats have no client
+    # policies, so every trigger function must run as its owner with a pinned search_path
+    triggers = {name: header for name, header in _functions().items() if "RETURNS TRIGGER" in header}
+    assert "log_row_change" in triggers
+    for name, header in triggers.items():
+        assert "SECURITY DEFINER" in header, name
+        assert "SET search_path = public" in header, name
@@ -0,0 +1,16 @@
+# Payload validation - typed column values
+from datetime import date
+import pytest
+from app.models.models import CaseRecord
+from app.utils.writes import PayloadError, validate_payload
+
+
+@pytest.mark.parametrize("value", ["2024-05-01", "2024-05-01T10:00:00", "2024-05-01T10:00:00+05:30"])
+def test_date_accepts_dates_and_timestamps(value):
+    assert validate_payload(CaseRecord, {"diag_date": value}, partial=True) == {"diag_date": date(2024, 5, 1)}
+
+
+@pytest.mark.parametrize("value", ["2024-05-01garbage", "2024-05-01 nonsense", "2024-13-01", "", 20240501])
+def test_date_rejects_anything_else(value):
+    with pytest.raises(PayloadError):
+        validate_payload(CaseRecord, {"diag_date": value}, partial=True)
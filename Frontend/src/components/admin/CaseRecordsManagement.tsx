@@ -1,4 +1,4 @@
-import { useState, useEffect } from "react";
+import { useState, useEffect, useRef } from "react";
 import { Button } from "@/components/ui/button";
 import { Input } from "@/components/ui/input";
 import { Label } from "@/components/ui/label";
@@ -22,6 +22,11 @@ import {
 import { Plus, Pencil, Trash2 } from "lucide-react";
 import { supabase } from "@/integrations/supabase/client";
 import { toast } from "sonner";
+import { changeCursor, fetchChanges, applyChanges } from "@/lib/changes";
+
+const SYNC_TABLES = ["case_records", "patients", "locations"];
+
+const byName = (a: any, b: any) => String(a.name).localeCompare(String(b.name));
 
 interface CaseRecordsManagementProps {
   onUpdate: () => void;
@@ -33,6 +38,7 @@ const CaseRecordsManagement = ({ onUpdate }: CaseRecordsManagementProps) => {
   const [locations, setLocations] = useState<any[]>([]);
   const [isOpen, setIsOpen] = useState(false);
   const [editingRecord, setEditingRecord] = useState<any>(null);
+  const cursor = useRef<number | null>(null);
   const [formData, setFormData] = useState({
     patient_id: "",
     location_id: "",
@@ -45,6 +51,7 @@ const CaseRecordsManagement = ({ onUpdate }: CaseRecordsManagementProps) => {
   }, []);
 
   const loadData = async () => {
+    cursor.current = await changeCursor(SYNC_TABLES);
     const { data: records } = await supabase
       .from("case_records")
       .select(`
@@ -69,6 +76,33 @@ const CaseRecordsManagement = ({ onUpdate }: CaseRecordsManagementProps) => {
     setLocations(locationsData || []);
   };
 
+  // After an edit, fetch only the rows changed since the last load
+  const syncData = async () => {
+    const delta = await fetchChanges(SYNC_TABLES, cursor.current);
+    if (!delta) return loadData();
+    cursor.current = delta.cursor;
+    const nextPatients = applyChanges(patients, delta.changes, "patients").sort(byName);
+    const nextLocations = applyChanges(locations, delta.changes, "locations").sort(byName);
+    const patientsById = new Map(nextPatients.map((p) => [p.id, p]));
+    const locationsById = new Map(nextLocations.map((l) => [l.id, l]));
+    // Same shape as the joined select in loadData
+    const withNames = (record: any) => ({
+      ...record,
+      patients: { name: patientsById.get(record.patient_id)?.name },
+      locations: {
+        name: locationsById.get(record.location_id)?.name,
+        state: locationsById.get(record.location_id)?.state,
+      },
+    });
+    setPatients(nextPatients);
+    setLocations(nextLocations);
+    setCaseRecords((rows) =>
+      applyChanges(rows, delta.changes, "case_records", withNames)
+        .map(withNames)
+        .sort((a, b) => String(b.diag_date).localeCompare(String(a.diag_date)))
+    );
+  };
+
   const handleSubmit = async (e: React.FormEvent<HTMLFormElement>) => {
     e.preventDefault();
 
@@ -98,7 +132,7 @@ const CaseRecordsManagement = ({ onUpdate }: CaseRecordsManagementProps) => {
     setIsOpen(false);
     setEditingRecord(null);
     resetForm();
-    loadData();
+    syncData();
     onUpdate();
   };
 
@@ -113,7 +147,7 @@ const CaseRecordsManagement = ({ onUpdate }: CaseRecordsManagementProps) => {
     }
 
     toast.success("Case record deleted successfully");
-    loadData();
+    syncData();
     onUpdate();
   };
 
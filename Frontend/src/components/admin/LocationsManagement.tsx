@@ -1,4 +1,4 @@
-import { useState, useEffect } from "react";
+import { useState, useEffect, useRef } from "react";
 import { Button } from "@/components/ui/button";
 import { Input } from "@/components/ui/input";
 import { Label } from "@/components/ui/label";
@@ -21,17 +21,24 @@ import {
 import { Plus, Pencil, Trash2 } from "lucide-react";
 import { supabase } from "@/integrations/supabase/client";
 import { toast } from "sonner";
+import { changeCursor, fetchChanges, applyChanges } from "@/lib/changes";
+
+const SYNC_TABLES = ["locations"];
+
+const byNewest = (a: any, b: any) => String(b.created_at).localeCompare(String(a.created_at));
 
 const LocationsManagement = () => {
   const [locations, setLocations] = useState<any[]>([]);
   const [isOpen, setIsOpen] = useState(false);
   const [editingLocation, setEditingLocation] = useState<any>(null);
+  const cursor = useRef<number | null>(null);
 
   useEffect(() => {
     loadLocations();
   }, []);
 
   const loadLocations = async () => {
+    cursor.current = await changeCursor(SYNC_TABLES);
     const { data, error } = await supabase
       .from("locations")
       .select("*")
@@ -45,6 +52,14 @@ const LocationsManagement = () => {
     setLocations(data || []);
   };
 
+  // After an edit, fetch only the rows changed since the last load
+  const syncLocations = async () => {
+    const delta = await fetchChanges(SYNC_TABLES, cursor.current);
+    if (!delta) return loadLocations();
+    cursor.current = delta.cursor;
+    setLocations((rows) => applyChanges(rows, delta.changes, "locations").sort(byNewest));
+  };
+
   const handleSubmit = async (e: React.FormEvent<HTMLFormElement>) => {
     e.preventDefault();
     const formData = new FormData(e.currentTarget);
@@ -82,7 +97,7 @@ const LocationsManagement = () => {
 
     setIsOpen(false);
     setEditingLocation(null);
-    loadLocations();
+    syncLocations();
   };
 
   const handleDelete = async (id: string) => {
@@ -96,7 +111,7 @@ const LocationsManagement = () => {
     }
 
     toast.success("Location deleted successfully");
-    loadLocations();
+    syncLocations();
   };
 
   const openDialog = (location: any = null) => {
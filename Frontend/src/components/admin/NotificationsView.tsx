@@ -1,6 +1,7 @@
 import { useEffect, useState } from "react";
 import { useNavigate } from "react-router-dom";
 import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/card";
+import { authHeaders } from "@/lib/api";
 
 const API_BASE = import.meta.env.VITE_API_BASE || "http://localhost:5000";
 
@@ -10,7 +11,7 @@ const NotificationsView = () => {
 
   useEffect(() => {
     fetch(`${API_BASE}/api/notifications/admin/due`, {
-      headers: { Authorization: `Bearer ${sessionStorage.getItem("jwt") || ""}` },
+      headers: authHeaders(),
     })
       .then((r) => r.json())
       .then((j) => setItems(j.items || []))
@@ -1,4 +1,4 @@
-import { useState, useEffect } from "react";
+import { useState, useEffect, useRef } from "react";
 import { Button } from "@/components/ui/button";
 import { Input } from "@/components/ui/input";
 import { Label } from "@/components/ui/label";
@@ -21,6 +21,10 @@ import {
 import { Plus, Pencil, Trash2 } from "lucide-react";
 const API_BASE = import.meta.env.VITE_API_BASE || "http://localhost:5000";
 import { toast } from "sonner";
+import { changeCursor, fetchChanges, applyChanges } from "@/lib/changes";
+import { authHeaders, noteWrite } from "@/lib/api";
+
+const SYNC_TABLES = ["patients"];
 
 interface PatientsManagementProps {
   onUpdate: () => void;
@@ -30,15 +34,17 @@ const PatientsManagement = ({ onUpdate }: PatientsManagementProps) => {
   const [patients, setPatients] = useState<any[]>([]);
   const [isOpen, setIsOpen] = useState(false);
   const [editingPatient, setEditingPatient] = useState<any>(null);
+  const cursor = useRef<number | null>(null);
 
   useEffect(() => {
     loadPatients();
   }, []);
 
   const loadPatients = async () => {
+    cursor.current = await changeCursor(SYNC_TABLES);
     try {
       const res = await fetch(`${API_BASE}/api/patients`, {
-        headers: { Authorization: `Bearer ${sessionStorage.getItem("jwt") || ""}` },
+        headers: authHeaders(),
       });
       const data = await res.json();
       setPatients(data || []);
@@ -47,6 +53,14 @@ const PatientsManagement = ({ onUpdate }: PatientsManagementProps) => {
     }
   };
 
+  // After an edit, fetch only the rows changed since the last load
+  const syncPatients = async () => {
+    const delta = await fetchChanges(SYNC_TABLES, cursor.current);
+    if (!delta) return loadPatients();
+    cursor.current = delta.cursor;
+    setPatients((rows) => applyChanges(rows, delta.changes, "patients"));
+  };
+
   const handleSubmit = async (e: React.FormEvent<HTMLFormElement>) => {
     e.preventDefault();
     const formData = new FormData(e.currentTarget);
@@ -66,21 +80,22 @@ const PatientsManagement = ({ onUpdate }: PatientsManagementProps) => {
 
     try {
       if (isEdit) {
-        // Editing a patient (still via /api/patients/PID)
-        const res = await fetch(`${API_BASE}/api/patients/${editingPatient.id}`, {
+        // Editing a patient (still via /api/patients/PID) - only patient columns are accepted
+        const { email, password, role, ...patientFields } = patientData;
+        const res = noteWrite(await fetch(`${API_BASE}/api/patients/${editingPatient.id}`, {
           method: "PUT",
-          headers: { "Content-Type": "application/json", Authorization: `Bearer ${sessionStorage.getItem("jwt") || ""}` },
-          body: JSON.stringify(patientData),
-        });
+          headers: { "Content-Type": "application/json", ...authHeaders() },
+          body: JSON.stringify(patientFields),
+        }));
         if (!res.ok) throw new Error();
         toast.success("Patient updated successfully");
       } else {
         // Create both user and patient via /api/users
-        const res = await fetch(`${API_BASE}/api/users`, {
+        const res = noteWrite(await fetch(`${API_BASE}/api/users`, {
           method: "POST",
-          headers: { "Content-Type": "application/json", Authorization: `Bearer ${sessionStorage.getItem("jwt") || ""}` },
+          headers: { "Content-Type": "application/json", ...authHeaders() },
           body: JSON.stringify(patientData),
-        });
+        }));
         if (!res.ok) {
           const msg = await res.text();
           throw new Error(msg);
@@ -93,7 +108,7 @@ const PatientsManagement = ({ onUpdate }: PatientsManagementProps) => {
     }
     setIsOpen(false);
     setEditingPatient(null);
-    loadPatients();
+    syncPatients();
     onUpdate && onUpdate();
   };
 
@@ -101,17 +116,17 @@ const PatientsManagement = ({ onUpdate }: PatientsManagementProps) => {
     if (!confirm("Are you sure you want to delete this patient?")) return;
 
     try {
-      const res = await fetch(`${API_BASE}/api/patients/${id}`, {
+      const res = noteWrite(await fetch(`${API_BASE}/api/patients/${id}`, {
         method: "DELETE",
-        headers: { Authorization: `Bearer ${sessionStorage.getItem("jwt") || ""}` },
-      });
+        headers: authHeaders(),
+      }));
       if (!res.ok) throw new Error();
       toast.success("Patient deleted successfully");
     } catch {
       toast.error("Failed to delete patient");
       return;
     }
-    loadPatients();
+    syncPatients();
     onUpdate();
   };
 
@@ -1,4 +1,4 @@
-import { useState, useEffect } from "react";
+import { useState, useEffect, useRef } from "react";
 import { Button } from "@/components/ui/button";
 import { Input } from "@/components/ui/input";
 import { Label } from "@/components/ui/label";
@@ -22,6 +22,9 @@ import {
 import { Plus, Pencil, Trash2 } from "lucide-react";
 import { supabase } from "@/integrations/supabase/client";
 import { toast } from "sonner";
+import { changeCursor, fetchChanges, applyChanges } from "@/lib/changes";
+
+const SYNC_TABLES = ["vaccinations", "patients"];
 
 interface VaccinationsManagementProps {
   onUpdate: () => void;
@@ -32,6 +35,7 @@ const VaccinationsManagement = ({ onUpdate }: VaccinationsManagementProps) => {
   const [patients, setPatients] = useState<any[]>([]);
   const [isOpen, setIsOpen] = useState(false);
   const [editingVaccination, setEditingVaccination] = useState<any>(null);
+  const cursor = useRef<number | null>(null);
   const [formData, setFormData] = useState({
     patient_id: "",
     date: "",
@@ -43,6 +47,7 @@ const VaccinationsManagement = ({ onUpdate }: VaccinationsManagementProps) => {
   }, []);
 
   const loadData = async () => {
+    cursor.current = await changeCursor(SYNC_TABLES);
     const { data: vaxData } = await supabase
       .from("vaccinations")
       .select(`
@@ -60,6 +65,25 @@ const VaccinationsManagement = ({ onUpdate }: VaccinationsManagementProps) => {
     setPatients(patientsData || []);
   };
 
+  // After an edit, fetch only the rows changed since the last load
+  const syncData = async () => {
+    const delta = await fetchChanges(SYNC_TABLES, cursor.current);
+    if (!delta) return loadData();
+    cursor.current = delta.cursor;
+    const nextPatients = applyChanges(patients, delta.changes, "patients").sort((a, b) =>
+      String(a.name).localeCompare(String(b.name))
+    );
+    const patientsById = new Map(nextPatients.map((p) => [p.id, p]));
+    // Same shape as the joined select in loadData
+    const withName = (vax: any) => ({ ...vax, patients: { name: patientsById.get(vax.patient_id)?.name } });
+    setPatients(nextPatients);
+    setVaccinations((rows) =>
+      applyChanges(rows, delta.changes, "vaccinations", withName)
+        .map(withName)
+        .sort((a, b) => String(b.date).localeCompare(String(a.date)))
+    );
+  };
+
   const handleSubmit = async (e: React.FormEvent<HTMLFormElement>) => {
     e.preventDefault();
 
@@ -89,7 +113,7 @@ const VaccinationsManagement = ({ onUpdate }: VaccinationsManagementProps) => {
     setIsOpen(false);
     setEditingVaccination(null);
     resetForm();
-    loadData();
+    syncData();
     onUpdate();
   };
 
@@ -104,7 +128,7 @@ const VaccinationsManagement = ({ onUpdate }: VaccinationsManagementProps) => {
     }
 
     toast.success("Vaccination deleted successfully");
-    loadData();
+    syncData();
     onUpdate();
   };
 
@@ -1,13 +1,32 @@
 export const API_BASE = import.meta.env.VITE_API_BASE || "http://localhost:5000";
 
+// Signed time of this session's last write, as reported by the server. Sending it back unchanged
+// keeps our reads on the primary database for a few seconds, whichever server process answers.
+const LAST_WRITE = "X-Last-Write";
+
+// Authorization plus the last-write stamp, for requests made with fetch directly
+export function authHeaders(): Record<string, string> {
+  const headers: Record<string, string> = { Authorization: `Bearer ${sessionStorage.getItem("jwt") || ""}` };
+  const lastWrite = sessionStorage.getItem(LAST_WRITE);
+  if (lastWrite) headers[LAST_WRITE] = lastWrite;
+  return headers;
+}
+
+// Remember the last-write stamp of a response (set on successful writes)
+export function noteWrite(res: Response): Response {
+  const stamp = res.headers.get(LAST_WRITE);
+  if (stamp) sessionStorage.setItem(LAST_WRITE, stamp);
+  return res;
+}
+
 export async function api<T = any>(path: string, options: RequestInit = {}): Promise<T> {
   const token = sessionStorage.getItem("jwt");
   const headers: Record<string, string> = {
     "Content-Type": "application/json",
     ...(options.headers as Record<string, string> | undefined),
   };
-  if (token) headers["Authorization"] = `Bearer ${token}`;
-  const res = await fetch(`${API_BASE}${path}`, { ...options, headers });
+  if (token) Object.assign(headers, authHeaders());
+  const res = noteWrite(await fetch(`${API_BASE}${path}`, { ...options, headers }));
   if (!res.ok) throw new Error(await res.text());
   return res.json();
 }
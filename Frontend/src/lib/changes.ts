@@ -0,0 +1,57 @@
+import { api } from "./api";
+
+export type Change = {
+  table: string;
+  op: "insert" | "update" | "delete";
+  id: string;
+  row?: any;
+};
+
+type ChangesPage = { changes: Change[]; cursor: number; has_more: boolean };
+
+// Current change-log cursor. Take it before loading the full tables, then sync from it.
+export async function changeCursor(tables: string[]): Promise<number | null> {
+  try {
+    const page = await api<ChangesPage>(`/api/changes?tables=${tables.join(",")}`);
+    return page.cursor;
+  } catch {
+    return null;
+  }
+}
+
+// Every change since `cursor`, following has_more pages. Resolves to null when the cursor
+// expired (410) or the feed is unavailable; callers then reload the full tables.
+export async function fetchChanges(
+  tables: string[],
+  cursor: number | null
+): Promise<{ changes: Change[]; cursor: number } | null> {
+  if (cursor === null) return null;
+  const changes: Change[] = [];
+  try {
+    for (;;) {
+      const page = await api<ChangesPage>(`/api/changes?since=${cursor}&tables=${tables.join(",")}`);
+      changes.push(...page.changes);
+      cursor = page.cursor;
+      if (!page.has_more) return { changes, cursor };
+    }
+  } catch {
+    return null;
+  }
+}
+
+// Apply one table's changes to a row list: upserts replace or append, tombstones remove.
+// `decorate` re-attaches joined fields (e.g. patient names) to upserted rows.
+export function applyChanges<T extends { id: string }>(
+  rows: T[],
+  changes: Change[],
+  table: string,
+  decorate: (row: any) => T = (row) => row
+): T[] {
+  const byId = new Map(rows.map((r) => [r.id, r]));
+  for (const c of changes) {
+    if (c.table !== table) continue;
+    if (c.op === "delete") byId.delete(c.id);
+    else byId.set(c.id, decorate({ ...byId.get(c.id), ...c.row }));
+  }
+  return [...byId.values()];
+}
@@ -0,0 +1,60 @@
+import { API_BASE } from "./api";
+
+const MAX_BACKOFF_MS = 60000;
+
+type Handlers = Record<string, (data: any) => void>;
+
+// Open the server-sent event stream and keep it open. EventSource reconnects by itself after a
+// dropped connection, but gives up for good when the server answers with an error status (e.g.
+// 503 while every stream slot is taken). Then the stream is reopened with jittered exponential
+// backoff, and `poll` runs every `pollMs` until it is back so the page stays current.
+// Returns a function that closes the stream and stops polling.
+export function openEventStream(
+  handlers: Handlers,
+  { poll, pollMs = 30000 }: { poll?: () => void; pollMs?: number } = {}
+): () => void {
+  let source: EventSource | null = null;
+  let retryTimer: ReturnType<typeof setTimeout> | undefined;
+  let pollTimer: ReturnType<typeof setInterval> | undefined;
+  let attempt = 0;
+  let closed = false;
+
+  const startPolling = () => {
+    if (!poll || pollTimer) return;
+    poll();
+    pollTimer = setInterval(poll, pollMs);
+  };
+  const stopPolling = () => {
+    clearInterval(pollTimer);
+    pollTimer = undefined;
+  };
+
+  const connect = () => {
+    const token = encodeURIComponent(sessionStorage.getItem("jwt") || "");
+    const es = new EventSource(`${API_BASE}/api/events/stream?access_token=${token}`);
+    source = es;
+    Object.entries(handlers).forEach(([event, handle]) =>
+      es.addEventListener(event, (e) => handle(JSON.parse((e as MessageEvent).data)))
+    );
+    es.onopen = () => {
+      attempt = 0;
+      stopPolling();
+    };
+    es.onerror = () => {
+      // Still CONNECTING means the browser is retrying on its own
+      if (closed || es.readyState !== EventSource.CLOSED) return;
+      startPolling();
+      const delay = Math.min(MAX_BACKOFF_MS, 1000 * 2 ** attempt) * (0.5 + Math.random() / 2);
+      attempt += 1;
+      retryTimer = setTimeout(connect, delay);
+    };
+  };
+
+  connect();
+  return () => {
+    closed = true;
+    clearTimeout(retryTimer);
+    stopPolling();
+    source?.close();
+  };
+}
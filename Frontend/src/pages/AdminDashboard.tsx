@@ -6,12 +6,14 @@ import { Tabs, TabsContent, TabsList, TabsTrigger } from "@/components/ui/tabs";
 import { Activity, Users, Syringe, MapPin, FileText, BarChart3, LogOut } from "lucide-react";
 const API_BASE = import.meta.env.VITE_API_BASE || "http://localhost:5000";
 import { toast } from "sonner";
+import { openEventStream } from "@/lib/events";
 import PatientsManagement from "@/components/admin/PatientsManagement";
 import CaseRecordsManagement from "@/components/admin/CaseRecordsManagement";
 import VaccinationsManagement from "@/components/admin/VaccinationsManagement";
 import LocationsManagement from "@/components/admin/LocationsManagement";
 import PredictionsView from "@/components/admin/PredictionsView";
 import NotificationsView from "@/components/admin/NotificationsView";
+import { authHeaders } from "@/lib/api";
 
 const AdminDashboard = () => {
   const navigate = useNavigate();
@@ -36,10 +38,44 @@ const AdminDashboard = () => {
     }
   }, [navigate]);
 
+  // Live updates: the server pushes a snapshot and then per-write deltas over SSE (and a new
+  // snapshot whenever a write cannot be expressed as a delta)
+  useEffect(() => {
+    if (sessionStorage.getItem("userRole") !== "admin") return;
+    const keys: Record<string, keyof typeof stats> = {
+      patients: "totalPatients",
+      active: "activeCases",
+      recovered: "recovered",
+      deaths: "deaths",
+      vaccinations: "vaccinations",
+    };
+    // While the stream is unavailable the metrics are polled instead
+    const handleMetrics = (j: any) => {
+      if (j.snapshot) {
+        setStats({
+          totalPatients: j.snapshot.patients || 0,
+          activeCases: j.snapshot.active || 0,
+          recovered: j.snapshot.recovered || 0,
+          deaths: j.snapshot.deaths || 0,
+          vaccinations: j.snapshot.vaccinations || 0,
+        });
+      } else {
+        setStats((prev) => {
+          const next = { ...prev };
+          Object.entries(j.delta || {}).forEach(([k, v]) => {
+            if (keys[k]) next[keys[k]] += v as number;
+          });
+          return next;
+        });
+      }
+    };
+    return openEventStream({ metrics: handleMetrics }, { poll: () => loadStats() });
+  }, []);
+
   const loadStats = async () => {
     try {
       const res = await fetch(`${API_BASE}/api/admin/metrics`, {
-        headers: { Authorization: `Bearer ${sessionStorage.getItem("jwt") || ""}` },
+        headers: authHeaders(),
       });
       const j = await res.json();
       setStats({
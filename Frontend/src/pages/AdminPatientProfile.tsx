@@ -2,6 +2,8 @@ import { useEffect, useState } from "react";
 import { useNavigate, useParams } from "react-router-dom";
 import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/card";
 import { Button } from "@/components/ui/button";
+import { Table, TableBody, TableCell, TableHead, TableHeader, TableRow } from "@/components/ui/table";
+import { authHeaders } from "@/lib/api";
 const API_BASE = import.meta.env.VITE_API_BASE || "http://localhost:5000";
 
 const AdminPatientProfile = () => {
@@ -16,7 +18,7 @@ const AdminPatientProfile = () => {
   }, [id, navigate]);
 
   const load = async () => {
-    const res = await fetch(`${API_BASE}/api/patients/${id}`, { headers: { Authorization: `Bearer ${sessionStorage.getItem("jwt") || ""}` } });
+    const res = await fetch(`${API_BASE}/api/patients/${id}/profile`, { headers: authHeaders() });
     if (res.ok) setPatient(await res.json());
   };
 
@@ -41,6 +43,84 @@ const AdminPatientProfile = () => {
             )}
           </CardContent>
         </Card>
+        {patient && (
+          <>
+            <Card className="mt-6">
+              <CardHeader>
+                <CardTitle>Case Records</CardTitle>
+              </CardHeader>
+              <CardContent>
+                {patient.case_records.length === 0 ? (
+                  <p className="text-sm text-muted-foreground">No case records</p>
+                ) : (
+                  <Table>
+                    <TableHeader>
+                      <TableRow>
+                        <TableHead>Diagnosis Date</TableHead>
+                        <TableHead>Status</TableHead>
+                        <TableHead>Location</TableHead>
+                        <TableHead>State</TableHead>
+                      </TableRow>
+                    </TableHeader>
+                    <TableBody>
+                      {patient.case_records.map((r: any) => (
+                        <TableRow key={r.id}>
+                          <TableCell>{new Date(r.diag_date).toLocaleDateString()}</TableCell>
+                          <TableCell>{r.status}</TableCell>
+                          <TableCell>{r.location?.name}</TableCell>
+                          <TableCell>{r.location?.state}</TableCell>
+                        </TableRow>
+                      ))}
+                    </TableBody>
+                  </Table>
+                )}
+              </CardContent>
+            </Card>
+            <Card className="mt-6">
+              <CardHeader>
+                <CardTitle>Vaccinations</CardTitle>
+              </CardHeader>
+              <CardContent>
+                {patient.vaccinations.length === 0 ? (
+                  <p className="text-sm text-muted-foreground">No vaccinations</p>
+                ) : (
+                  <Table>
+                    <TableHeader>
+                      <TableRow>
+                        <TableHead>Dose</TableHead>
+                        <TableHead>Date</TableHead>
+                        <TableHead>Vaccine Type</TableHead>
+                      </TableRow>
+                    </TableHeader>
+                    <TableBody>
+                      {patient.vaccinations.map((v: any, i: number) => (
+                        <TableRow key={v.id}>
+                          <TableCell>{i + 1}</TableCell>
+                          <TableCell>{new Date(v.date).toLocaleDateString()}</TableCell>
+                          <TableCell>{v.vaccine_type}</TableCell>
+                        </TableRow>
+                      ))}
+                    </TableBody>
+                  </Table>
+                )}
+              </CardContent>
+            </Card>
+            {patient.reminders.length > 0 && (
+              <Card className="mt-6">
+                <CardHeader>
+                  <CardTitle>Reminders</CardTitle>
+                </CardHeader>
+                <CardContent className="space-y-2 text-sm">
+                  {patient.reminders.map((r: any) => (
+                    <div key={r.type} className="p-2 rounded bg-yellow-50 border-l-4 border-yellow-400">
+                      <strong>{r.title}</strong><br />{r.message}
+                    </div>
+                  ))}
+                </CardContent>
+              </Card>
+            )}
+          </>
+        )}
       </div>
     </div>
   );
@@ -7,6 +7,7 @@ import { Badge } from "@/components/ui/badge";
 import { Activity, Users, LogOut } from "lucide-react";
 import { toast } from "sonner";
 import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from "@/components/ui/select";
+import { authHeaders, noteWrite } from "@/lib/api";
 
 const API_BASE = import.meta.env.VITE_API_BASE || "http://localhost:5000";
 
@@ -39,7 +40,7 @@ const ManagerDashboard = () => {
     try {
       setLoading(true);
       const res = await fetch(`${API_BASE}/api/users`, {
-        headers: { Authorization: `Bearer ${sessionStorage.getItem("jwt") || ""}` },
+        headers: authHeaders(),
       });
       if (!res.ok) throw new Error("Failed to load users");
       const data = await res.json();
@@ -53,14 +54,14 @@ const ManagerDashboard = () => {
 
   const handleRoleChange = async (userId: string, newRole: "admin" | "user" | "manager") => {
     try {
-      const res = await fetch(`${API_BASE}/api/users/${userId}/promote`, {
+      const res = noteWrite(await fetch(`${API_BASE}/api/users/${userId}/promote`, {
         method: "POST",
         headers: {
           "Content-Type": "application/json",
-          Authorization: `Bearer ${sessionStorage.getItem("jwt") || ""}`,
+          ...authHeaders(),
         },
         body: JSON.stringify({ role: newRole }),
-      });
+      }));
 
       if (!res.ok) {
         const error = await res.json();
@@ -3,8 +3,9 @@ import { useNavigate } from "react-router-dom";
 import { Button } from "@/components/ui/button";
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from "@/components/ui/card";
 import { Activity, FileText, Syringe, LogOut, HelpCircle, Bell } from "lucide-react";
-import { supabase } from "@/integrations/supabase/client";
 import { toast } from "sonner";
+import { openEventStream } from "@/lib/events";
+import { authHeaders } from "@/lib/api";
 const API_BASE = import.meta.env.VITE_API_BASE || "http://localhost:5000";
 import {
   Table,
@@ -31,52 +32,52 @@ const PatientDashboard = () => {
       return;
     }
 
-    loadPatientData(patientId);
-    // fetch notifications for patient and toast them
-    fetch(`${API_BASE}/api/notifications/me`, {
-      headers: { Authorization: `Bearer ${sessionStorage.getItem("jwt") || ""}` }
-    })
-    .then((r) => r.json())
-    .then((json) => {
-      setNotifications(json.notifications || []);
-      (json.notifications || []).forEach((n: any) => {
-        toast(n.title + ": " + n.message);
-      });
-    })
-    .catch(() => setNotifications([]));
+    loadPatientData();
+    // fetch notifications for patient and toast the ones not shown yet
+    const seen = new Set<string>();
+    const loadNotifications = () =>
+      fetch(`${API_BASE}/api/notifications/me`, {
+        headers: authHeaders()
+      })
+      .then((r) => r.json())
+      .then((json) => {
+        setNotifications(json.notifications || []);
+        (json.notifications || []).forEach((n: any) => {
+          if (seen.has(n.id)) return;
+          seen.add(n.id);
+          toast(n.title + ": " + n.message);
+        });
+      })
+      .catch(() => {});
+    loadNotifications();
+
+    // New reminders are pushed over SSE as soon as the sweep creates them (polled while the
+    // stream is unavailable)
+    return openEventStream(
+      {
+        notification: (n) => {
+          if (seen.has(n.id)) return;
+          seen.add(n.id);
+          setNotifications((prev) => (prev.some((p) => p.id === n.id) ? prev : [n, ...prev]));
+          toast(n.title + ": " + n.message);
+        },
+      },
+      { poll: loadNotifications }
+    );
   }, [navigate]);
 
-  const loadPatientData = async (patientId: string) => {
+  const loadPatientData = async () => {
     try {
-      // Load patient info
-      const { data: patient } = await supabase
-        .from("patients")
-        .select("*")
-        .eq("id", patientId)
-        .single();
-
+      // Patient, case records with locations and vaccinations in one request
+      const res = await fetch(`${API_BASE}/api/patients/me/profile`, {
+        headers: authHeaders()
+      });
+      if (!res.ok) throw new Error(`HTTP ${res.status}`);
+      const { case_records, vaccinations: vax, reminders, ...patient } = await res.json();
       setPatientInfo(patient);
-
-      // Load case records with location info
-      const { data: cases } = await supabase
-        .from("case_records")
-        .select(`
-          *,
-          locations (name, address, state)
-        `)
-        .eq("patient_id", patientId)
-        .order("diag_date", { ascending: false });
-
-      setCaseRecords(cases || []);
-
-      // Load vaccinations
-      const { data: vax } = await supabase
-        .from("vaccinations")
-        .select("*")
-        .eq("patient_id", patientId)
-        .order("date", { ascending: false });
-
-      setVaccinations(vax || []);
+      setCaseRecords(case_records || []);
+      // Newest dose first
+      setVaccinations([...(vax || [])].reverse());
     } catch (error) {
       toast.error("Failed to load patient data");
     }
@@ -208,8 +209,8 @@ const PatientDashboard = () => {
                       <TableCell className={getStatusColor(record.status)}>
                         {record.status.charAt(0).toUpperCase() + record.status.slice(1)}
                       </TableCell>
-                      <TableCell>{record.locations?.name}</TableCell>
-                      <TableCell>{record.locations?.address}, {record.locations?.state}</TableCell>
+                      <TableCell>{record.location?.name}</TableCell>
+                      <TableCell>{record.location?.address}, {record.location?.state}</TableCell>
                     </TableRow>
                   ))}
                 </TableBody>